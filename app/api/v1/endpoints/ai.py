@@ -2,9 +2,20 @@
 AI & ML endpoints
 """
 
-from fastapi import APIRouter, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, HTTPException, status, UploadFile, File, Response, Depends, Security
+from fastapi.responses import ORJSONResponse
+from app.core.dependencies import security
 from pydantic import BaseModel
 from typing import List, Optional
+import asyncio
+import orjson
+
+from app.core.dependencies import get_current_user, CurrentUser
+from app.core.storage import get_storage_service
+from app.core.supabase import get_supabase_admin_client
+from app.ml.colors import pack_colors, palette_embedding
+from app.ml.recommendation import get_recommendation_engine, get_recommendation_batcher
+from app.ml.space_analysis import get_space_analysis_service
 
 router = APIRouter()
 
@@ -13,6 +24,10 @@ class SpaceAnalysisRequest(BaseModel):
     space_image_url: str
 
 
+# The response models below only document the API schema (via `responses=`).
+# Routes have no response_model, so FastAPI skips serialize_response and the
+# handlers return pre-encoded orjson bytes
+
 class SpaceAnalysisResponse(BaseModel):
     dominant_colors: List[str]
     lighting: str
@@ -31,27 +46,37 @@ class RecommendationResponse(BaseModel):
     recommendations: List[ArtworkRecommendation]
 
 
-@router.post("/analyze-space", response_model=SpaceAnalysisResponse)
+# The empty result is constant, so one response is built at import and
+# returned as-is by every request that has nothing to rank (Starlette never
+# mutates a response while sending it; middleware copies the headers)
+_EMPTY_RECOMMENDATIONS = Response(
+    content=orjson.dumps({"recommendations": []}),
+    media_type="application/json",
+)
+
+
+@router.post(
+    "/analyze-space",
+    response_class=ORJSONResponse,
+    responses={200: {"model": SpaceAnalysisResponse}},
+)
 async def analyze_space(request: SpaceAnalysisRequest):
     """
     Analyze space image using AI/ML models
     
-    TODO: Implement space analysis
-    - Color palette extraction
-    - Lighting detection
-    - Style classification
+    The image is fetched from Supabase Storage (see /upload-space-image).
+    Near-duplicate images are served from a similarity cache.
     """
-    # Placeholder implementation
-    return SpaceAnalysisResponse(
-        dominant_colors=["#FFFFFF", "#000000"],
-        lighting="bright",
-        style="modern",
-        mood="calm",
-        confidence=0.85
-    )
+    service = get_space_analysis_service()
+    body = await service.analyze_url(request.space_image_url)
+    return Response(content=body, media_type="application/json")
 
 
-@router.post("/recommend-artworks", response_model=RecommendationResponse)
+@router.post(
+    "/recommend-artworks",
+    response_class=ORJSONResponse,
+    responses={200: {"model": RecommendationResponse}},
+)
 async def recommend_artworks(
     space_id: Optional[str] = None,
     style: Optional[str] = None,
@@ -61,27 +86,102 @@ async def recommend_artworks(
     """
     Get AI-powered artwork recommendations
     
-    TODO: Implement recommendation algorithm
-    - Feature extraction
-    - Similarity matching
-    - Ranking
+    Ranks published artworks by cosine similarity between their dominant
+    color and the requested color palette. If no palette is given, the wall
+    color of the space identified by space_id is used instead.
+    
+    TODO: Use style once artworks carry style features
     """
-    # Placeholder implementation
-    return RecommendationResponse(
-        recommendations=[]
+    palette = color_palette
+    if not palette and space_id:
+        palette = await asyncio.to_thread(_get_space_palette, space_id)
+    
+    # Hex strings are parsed once here; the rest works on packed uint32 colors
+    query = palette_embedding(pack_colors(palette)) if palette else None
+    if query is None:
+        return _EMPTY_RECOMMENDATIONS
+    
+    engine = get_recommendation_engine()
+    try:
+        await engine.refresh()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to load artwork catalog: {str(e)}",
+        )
+    
+    # Concurrent requests are scored together in one batch
+    matches = await get_recommendation_batcher().recommend(query, limit)
+    body = orjson.dumps({
+        "recommendations": [
+            {
+                "artwork_id": artwork_id,
+                "score": score,
+                "reason": "Color palette similarity",
+            }
+            for artwork_id, score in matches
+        ]
+    })
+    return Response(content=body, media_type="application/json")
+
+
+def _get_space_palette(space_id: str) -> Optional[List[str]]:
+    """Look up the wall color of a space as a one-color palette (blocking)"""
+    admin_client = get_supabase_admin_client()
+    response = (
+        admin_client.table("corporate_spaces")
+        .select("wall_color")
+        .eq("id", space_id)
+        .execute()
     )
-
-
-@router.post("/upload-space-image")
-async def upload_space_image(file: UploadFile = File(...)):
+    if response.data and response.data[0].get("wall_color"):
+        return [response.data[0]["wall_color"]]
+    return None
+
+
+@router.post(
+    "/upload-space-image",
+    response_class=ORJSONResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def upload_space_image(
+    file: UploadFile = File(...),
+    credentials = Security(security),
+    current_user: CurrentUser = Depends(get_current_user),
+):
     """
     Upload space image for analysis
     
-    TODO: Implement image upload to Supabase Storage
+    Requires authentication. The image is stored in the spaces bucket
+    under the user's folder; the returned URL can be passed to /analyze-space.
+    Images are stored by content hash, so re-uploading the same photo returns
+    the existing URL.
     """
-    # Placeholder implementation
-    return {
-        "filename": file.filename,
-        "content_type": file.content_type,
-        "message": "Image uploaded successfully"
-    }
+    storage_service = get_storage_service()
+    
+    try:
+        result = await storage_service.upload_file_deduplicated(
+            file=file,
+            bucket="spaces",
+            user_id=current_user.id,
+        )
+        
+        return ORJSONResponse(
+            status_code=status.HTTP_201_CREATED,
+            content={
+                "filename": result["filename"],
+                "content_type": result["content_type"],
+                "path": result["path"],
+                "url": result["url"],
+                "size": result["size"],
+                "message": "Image uploaded successfully",
+            },
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to upload space image: {str(e)}",
+        )
@@ -4,20 +4,35 @@ Artwork management endpoints
 Complete CRUD operations for artworks with image upload, processing, and management.
 """
 
-from fastapi import APIRouter, HTTPException, status, Query, Depends, UploadFile, File, Form, Security
+from fastapi import APIRouter, HTTPException, status, Query, Depends, UploadFile, File, Form, Security, BackgroundTasks, Request, Response, Header
+from fastapi.responses import ORJSONResponse
 from app.core.dependencies import security
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from decimal import Decimal
+import asyncio
 import json
+import re
+from bisect import bisect_right
+import logging
 
-from app.core.dependencies import require_artist, CurrentUser, get_current_user
+import orjson
+
+from postgrest.exceptions import APIError
+from supabase import Client
+
+from app.core.dependencies import require_artist, CurrentUser, get_current_user, admin_client_dep, storage_service_dep, image_service_dep, publishing_batcher_dep
 from app.core.supabase import get_supabase_admin_client
-from app.core.storage import get_storage_service
-from app.core.image_processing import get_image_processing_service, ImageSize
+from app.core.redis_client import get_redis
+from app.core.artwork_cache import artwork_cache_key, get_artwork_cache
+from app.core.storage import BytesIOUploadFile, StorageService
+from app.core.image_processing import ImageProcessingService, ImageSize
+from app.core.publishing import PublishingBatcher
 from app.utils.id_generator import generate_custom_id
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+logger = logging.getLogger(__name__)
 
 
 # Request/Response Models
@@ -127,38 +142,327 @@ class ArtworkUpdateRequest(BaseModel):
     maintenance_info: Optional[str] = None
 
 
+class BulkPublishRequest(BaseModel):
+    """Request model for publishing many artworks at once"""
+    ids: List[str] = Field(..., min_length=1, max_length=500, description="Artwork IDs to publish")
+
+
+class BulkPublishResponse(BaseModel):
+    """Response model for bulk publishing (artwork IDs by outcome)"""
+    published: List[str]
+    skipped: List[str] = Field(..., description="Already published")
+    incomplete: Dict[str, str] = Field(..., description="Artwork ID -> fields required for publishing")
+    forbidden: List[str]
+    not_found: List[str]
+    failed: List[str] = Field(..., description="Unexpected errors; may be retried")
+
+
 # Helper Functions
-def artwork_to_response(artwork_data: dict, include_artist: bool = False, include_images: bool = False) -> ArtworkResponse:
-    """Convert database artwork to response model"""
+
+# Columns read by artist_to_info / images_to_info; select only these (not
+# "*") so related rows don't carry unused columns over the wire
+ARTIST_COLUMNS = "id, name, profile_image_url"
+IMAGE_COLUMNS = "id, image_url, image_order, is_main, alt_text"
+
+# PostgREST embeds for the artist and images of an artwork, so one request
+# returns the artwork together with its related rows
+ARTIST_EMBED = f"artists({ARTIST_COLUMNS})"
+IMAGES_EMBED = f"artwork_images({IMAGE_COLUMNS})"
+
+# Published artwork details are cached in Redis (and briefly in each worker,
+# see app.core.artwork_cache); writes invalidate the entry, the TTL only
+# bounds how stale view_count can get
+ARTWORK_CACHE_TTL_SECONDS = 300
+ARTWORK_CACHE_CONTROL = "public, max-age=60"
+
+# Auto size class by area (cm²): below 1000 is XS, below 5000 is S, ...
+SIZE_THRESHOLDS = (1000, 5000, 15000, 30000, 50000)
+SIZE_LABELS = ("XS", "S", "M", "L", "XL", "XXL")
+
+# Columns needed for ownership and status checks before a write
+OWNERSHIP_COLUMNS = "id, artist_id, status"
+
+# Object path within the artworks bucket of a Supabase storage URL
+# (https://[project].supabase.co/storage/v1/object/public/artworks/[path])
+STORAGE_PATH_RE = re.compile(r"/artworks/([^?]+)")
+
+
+def _to_decimal(value: Any) -> Optional[Decimal]:
+    """
+    Convert a numeric column value to Decimal
+    
+    PostgREST returns numeric columns as JSON numbers or strings; strings and
+    ints convert exactly, floats go through their shortest repr.
+    """
+    if value is None or isinstance(value, Decimal):
+        return value
+    if isinstance(value, (str, int)):
+        return Decimal(value)
+    return Decimal(repr(value))
+
+
+def artist_to_info(artist_data: Optional[dict]) -> Optional[ArtistInfo]:
+    """Convert an artist row to ArtistInfo"""
+    if not artist_data:
+        return None
+    return ArtistInfo.model_construct(
+        id=artist_data["id"],
+        name=artist_data["name"],
+        profile_image_url=artist_data.get("profile_image_url"),
+    )
+
+
+def images_to_info(images_data: Optional[List[dict]]) -> Optional[List[ArtworkImageInfo]]:
+    """Convert artwork_images rows to ArtworkImageInfo, ordered by image_order"""
+    if not images_data:
+        return None
+    return [
+        ArtworkImageInfo.model_construct(
+            id=img["id"],
+            image_url=img["image_url"],
+            image_order=img["image_order"],
+            is_main=img["is_main"],
+            alt_text=img.get("alt_text"),
+        )
+        for img in sorted(images_data, key=lambda img: img["image_order"])
+    ]
+
+
+def fetch_images_bulk(artwork_ids: List[str]) -> Dict[str, List[dict]]:
+    """
+    Fetch the images of many artworks with a single query
+    
+    Args:
+        artwork_ids: Artwork IDs
+        
+    Returns:
+        Dict of artwork ID -> artwork_images rows ordered by image_order
+        (artworks without images map to an empty list)
+    """
+    images_by_artwork: Dict[str, List[dict]] = {artwork_id: [] for artwork_id in artwork_ids}
+    if not artwork_ids:
+        return images_by_artwork
+    
     admin_client = get_supabase_admin_client()
+    response = (
+        admin_client.table("artwork_images")
+        .select(f"artwork_id, {IMAGE_COLUMNS}")
+        .in_("artwork_id", artwork_ids)
+        .order("image_order")
+        .execute()
+    )
+    for img in response.data or []:
+        images_by_artwork[img["artwork_id"]].append(img)
+    return images_by_artwork
+
+
+def increment_view_count(artwork_id: str) -> None:
+    """
+    Atomically increment an artwork's view_count (blocking)
+    
+    Runs as a background task after the response is sent; a failed
+    increment is logged and otherwise ignored.
+    """
+    try:
+        admin_client = get_supabase_admin_client()
+        admin_client.rpc("increment_artwork_views", {"p_id": artwork_id}).execute()
+    except Exception as e:
+        logger.warning(f"Failed to increment view count for artwork {artwork_id}: {e}")
+
+
+def fetch_artwork_for_delete(artwork_id: str) -> Optional[dict]:
+    """
+    Fetch the ownership columns and image URLs of an artwork (blocking)
+    
+    Returns:
+        Artwork row with "artwork_images" embedded, or None if not found
+    """
+    admin_client = get_supabase_admin_client()
+    response = (
+        admin_client.table("artworks")
+        .select(f"{OWNERSHIP_COLUMNS}, artwork_images(image_url)")
+        .eq("id", artwork_id)
+        .execute()
+    )
+    return response.data[0] if response.data else None
+
+
+async def prefetch_artwork_for_delete(
+    artwork_id: str,
+    current_user: CurrentUser = Depends(require_artist),
+) -> asyncio.Future:
+    """
+    Start fetching the artwork of a delete request
+    
+    Depends on the artist check, so only authenticated artists cause a
+    database read; the lookup then runs in a worker thread while the
+    remaining dependencies resolve, and the handler awaits the result.
+    """
+    future = asyncio.get_running_loop().run_in_executor(None, fetch_artwork_for_delete, artwork_id)
+    # Nobody awaits the result if a later dependency fails
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    return future
+
+
+def artwork_etag(artwork_data: dict) -> str:
+    """
+    Weak ETag of an artwork
+    
+    updated_at changes on every write to the row except view count
+    increments, so id + updated_at identifies a version of the artwork
+    (the view count of a revalidated response may be behind).
+    """
+    return f'W/"{artwork_data["id"]}-{artwork_data["updated_at"]}"'
+
+
+async def upload_artwork_size(
+    storage_service: StorageService,
+    user_id: str,
+    custom_id: str,
+    filename: Optional[str],
+    size_name: str,
+    size_data: dict,
+) -> str:
+    """Upload one processed size of an artwork image and return its URL"""
+    size_data["data"].seek(0)
+    
+    original_filename = filename or "image.jpg"
+    name, ext = original_filename.rsplit(".", 1) if "." in original_filename else (original_filename, "jpg")
+    size_filename = f"{name}_{size_name}.{ext}"
+    
+    temp_file = BytesIOUploadFile(
+        size_data["data"],
+        size_filename,
+        content_type="image/jpeg",
+    )
+    
+    upload_result = await storage_service.upload_file(
+        file=temp_file,
+        bucket="artworks",
+        user_id=user_id,
+        subfolder=custom_id,
+    )
+    return upload_result["url"]
+
+
+async def finalize_artwork(
+    artwork_id: str,
+    custom_id: str,
+    user_id: str,
+    filenames: List[Optional[str]],
+    processed_images: List[dict],
+    main_image_url: str,
+    admin_client: Client,
+    storage_service: StorageService,
+) -> None:
+    """
+    Upload the remaining image sizes of a new artwork and record them
+    
+    Runs as a background task after create_artwork has responded (the main
+    image's large size is already uploaded and stored). Uploads every other
+    size concurrently, inserts the artwork_images rows of the additional
+    images and fills in thumbnail_urls. Failures are logged; the artwork
+    stays a draft with its main image.
+    """
+    try:
+        pending = [
+            (idx, size_name, size_data)
+            for idx, processed in enumerate(processed_images)
+            for size_name, size_data in processed["images"].items()
+            if not (idx == 0 and size_name == "large")
+        ]
+        urls = await asyncio.gather(*(
+            upload_artwork_size(storage_service, user_id, custom_id, filenames[idx], size_name, size_data)
+            for idx, size_name, size_data in pending
+        ))
+        
+        urls_by_image: List[Dict[str, str]] = [{} for _ in processed_images]
+        urls_by_image[0]["large"] = main_image_url
+        for (idx, size_name, _), url in zip(pending, urls):
+            urls_by_image[idx][size_name] = url
+        
+        image_rows = [
+            {
+                "artwork_id": artwork_id,
+                # Use large size as the image URL
+                "image_url": image_urls.get("large") or image_urls.get("medium") or next(iter(image_urls.values())),
+                "image_order": idx,
+                "is_main": False,
+            }
+            for idx, image_urls in enumerate(urls_by_image)
+            if idx > 0 and image_urls
+        ]
+        thumbnail_urls = [image_urls["thumbnail"] for image_urls in urls_by_image if "thumbnail" in image_urls]
+        
+        def record() -> None:
+            if image_rows:
+                admin_client.table("artwork_images").insert(image_rows).execute()
+            admin_client.table("artworks").update({
+                "thumbnail_urls": json.dumps(thumbnail_urls),
+            }).eq("id", artwork_id).execute()
+        
+        await asyncio.to_thread(record)
+        await get_artwork_cache().invalidate(artwork_id)
+    except Exception:
+        logger.exception(f"Failed to finalize images for artwork {artwork_id}")
+
+
+def artwork_detail_response(body: Optional[bytes], etag: str, is_published: bool = True) -> Response:
+    """
+    Build the HTTP response for a serialized ArtworkResponse
+    
+    Args:
+        body: JSON body, or None for a 304 Not Modified response
+        etag: ETag of the artwork version
+        is_published: Published artworks may be cached by shared caches
+    """
+    headers = {"ETag": etag}
+    if is_published:
+        headers["Cache-Control"] = ARTWORK_CACHE_CONTROL
+    if body is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def artwork_to_response(
+    artwork_data: dict,
+    include_artist: bool = False,
+    include_images: bool = False,
+    embedded_artist: Optional[dict] = None,
+    embedded_images: Optional[List[dict]] = None,
+) -> ArtworkResponse:
+    """
+    Convert database artwork to response model
+    
+    Rows come from our own database with known column types, so the model
+    is built with model_construct, skipping validation.
+    
+    Args:
+        artwork_data: Artwork row
+        include_artist: Fetch the artist if it is not embedded
+        include_images: Fetch the images if they are not embedded
+        embedded_artist: Artist row already returned with the artwork
+        embedded_images: artwork_images rows already returned with the artwork
+        
+    Returns:
+        ArtworkResponse
+    """
+    # Related rows embedded in the artwork query need no extra round-trip
+    artist_info = artist_to_info(embedded_artist)
+    images = images_to_info(embedded_images)
     
     # Get artist info if requested
-    artist_info = None
-    if include_artist:
-        artist_response = admin_client.table("artists").select("id, name, profile_image_url").eq("id", artwork_data["artist_id"]).execute()
+    if include_artist and embedded_artist is None:
+        admin_client = get_supabase_admin_client()
+        artist_response = admin_client.table("artists").select(ARTIST_COLUMNS).eq("id", artwork_data["artist_id"]).execute()
         if artist_response.data:
-            artist_data = artist_response.data[0]
-            artist_info = ArtistInfo(
-                id=artist_data["id"],
-                name=artist_data["name"],
-                profile_image_url=artist_data.get("profile_image_url"),
-            )
+            artist_info = artist_to_info(artist_response.data[0])
     
     # Get images if requested
-    images = None
-    if include_images:
-        images_response = admin_client.table("artwork_images").select("*").eq("artwork_id", artwork_data["id"]).order("image_order").execute()
-        if images_response.data:
-            images = [
-                ArtworkImageInfo(
-                    id=img["id"],
-                    image_url=img["image_url"],
-                    image_order=img["image_order"],
-                    is_main=img["is_main"],
-                    alt_text=img.get("alt_text"),
-                )
-                for img in images_response.data
-            ]
+    if include_images and embedded_images is None:
+        admin_client = get_supabase_admin_client()
+        images_response = admin_client.table("artwork_images").select(IMAGE_COLUMNS).eq("artwork_id", artwork_data["id"]).order("image_order").execute()
+        images = images_to_info(images_response.data)
     
     # Parse dimensions JSONB
     dimensions = artwork_data.get("dimensions", {})
@@ -172,7 +476,7 @@ def artwork_to_response(artwork_data: dict, include_artist: bool = False, includ
     if isinstance(thumbnail_urls, list):
         thumbnail_urls = thumbnail_urls
     
-    return ArtworkResponse(
+    return ArtworkResponse.model_construct(
         id=artwork_data["id"],
         custom_id=artwork_data["custom_id"],
         artist_id=artwork_data["artist_id"],
@@ -180,14 +484,14 @@ def artwork_to_response(artwork_data: dict, include_artist: bool = False, includ
         title=artwork_data["title"],
         description=artwork_data.get("description"),
         story=artwork_data.get("story"),
-        price=Decimal(str(artwork_data["price"])),
-        lease_price=Decimal(str(artwork_data["lease_price"])) if artwork_data.get("lease_price") else None,
+        price=_to_decimal(artwork_data["price"]),
+        lease_price=_to_decimal(artwork_data.get("lease_price")),
         dimensions=dimensions,
         size_class=artwork_data.get("size_class"),
         year=artwork_data.get("year"),
         medium=artwork_data.get("medium"),
         support=artwork_data.get("support"),
-        weight=Decimal(str(artwork_data["weight"])) if artwork_data.get("weight") else None,
+        weight=_to_decimal(artwork_data.get("weight")),
         has_frame=artwork_data.get("has_frame", False),
         coating=artwork_data.get("coating"),
         status=artwork_data["status"],
@@ -211,6 +515,7 @@ def artwork_to_response(artwork_data: dict, include_artist: bool = False, includ
 # 4.1 Artwork Creation API
 @router.post("/", response_model=ArtworkResponse, status_code=status.HTTP_201_CREATED)
 async def create_artwork(
+    background_tasks: BackgroundTasks,
     title: str = Form(...),
     description: Optional[str] = Form(None),
     story: Optional[str] = Form(None),
@@ -231,6 +536,9 @@ async def create_artwork(
     images: List[UploadFile] = File(..., description="Artwork images (at least 1 required)"),
     credentials = Security(security),
     current_user: CurrentUser = Depends(require_artist),
+    admin_client: Client = Depends(admin_client_dep),
+    storage_service: StorageService = Depends(storage_service_dep),
+    image_service: ImageProcessingService = Depends(image_service_dep),
 ):
     """
     Create new artwork with image upload
@@ -241,10 +549,11 @@ async def create_artwork(
     - Stores artwork in database
     - Stores image URLs in artwork_images table
     - Extracts and stores dominant color
+    
+    The response is sent once the main image is stored; the other image
+    sizes, additional images and thumbnail_urls are uploaded and recorded
+    in the background right after.
     """
-    admin_client = get_supabase_admin_client()
-    storage_service = get_storage_service()
-    image_service = get_image_processing_service()
     
     if not images or len(images) == 0:
         raise HTTPException(
@@ -256,96 +565,36 @@ async def create_artwork(
         # Generate custom_id
         custom_id = generate_custom_id("WRK", "artworks")
         
-        # Process and upload images
-        processed_images = []
-        main_image_url = None
-        thumbnail_urls = []
-        dominant_color = None
-        
-        for idx, image_file in enumerate(images):
-            # Process image
-            processed = await image_service.process_and_save_image(
+        # Process every image up front (CPU work in worker threads); this
+        # also rejects invalid uploads before anything is stored
+        processed_images = await asyncio.gather(*(
+            image_service.process_and_save_image(
                 file=image_file,
                 output_format="JPEG",
                 sizes=[ImageSize.THUMBNAIL, ImageSize.MEDIUM, ImageSize.LARGE],
                 convert_heic=True,
             )
-            
-            # Get dominant color from first image
-            if idx == 0:
-                dominant_color = processed["dominant_color"]
-            
-            # Upload all sizes
-            uploaded_sizes = {}
-            for size_name, size_data in processed["images"].items():
-                size_data["data"].seek(0)
-                
-                # Create UploadFile-like object
-                class BytesIOUploadFile:
-                    def __init__(self, bytes_io, filename, content_type="image/jpeg"):
-                        self.bytes_io = bytes_io
-                        self.filename = filename
-                        self.content_type = content_type
-                        self.file = bytes_io
-                    
-                    async def read(self):
-                        return self.bytes_io.read()
-                    
-                    def seek(self, position):
-                        return self.bytes_io.seek(position)
-                
-                original_filename = image_file.filename or "image.jpg"
-                name, ext = original_filename.rsplit(".", 1) if "." in original_filename else (original_filename, "jpg")
-                size_filename = f"{name}_{size_name}.{ext}"
-                
-                temp_file = BytesIOUploadFile(
-                    size_data["data"],
-                    size_filename,
-                    content_type="image/jpeg",
-                )
-                
-                # Upload to storage
-                upload_result = await storage_service.upload_file(
-                    file=temp_file,
-                    bucket="artworks",
-                    user_id=current_user.id,
-                    subfolder=custom_id,
-                )
-                
-                uploaded_sizes[size_name] = upload_result["url"]
-                
-                # Set main image URL from first image's large size
-                if idx == 0 and size_name == "large":
-                    main_image_url = upload_result["url"]
-                
-                # Collect thumbnail URLs
-                if size_name == "thumbnail":
-                    thumbnail_urls.append(upload_result["url"])
-            
-            # Store image URLs in artwork_images table (after artwork is created)
-            processed_images.append({
-                "urls": uploaded_sizes,
-                "order": idx,
-                "is_main": idx == 0,
-            })
+            for image_file in images
+        ))
+        filenames = [image_file.filename for image_file in images]
+        
+        # Only the main image is uploaded before responding; dominant color
+        # also comes from the first image
+        main_image_url = await upload_artwork_size(
+            storage_service,
+            current_user.id,
+            custom_id,
+            filenames[0],
+            "large",
+            processed_images[0]["images"]["large"],
+        )
+        dominant_color = processed_images[0]["dominant_color"]
         
         # Calculate size_class if not provided
         calculated_size_class = size_class
         if not calculated_size_class:
             # Auto-calculate based on dimensions
-            area = width * height
-            if area < 1000:  # < 1000 cm²
-                calculated_size_class = "XS"
-            elif area < 5000:
-                calculated_size_class = "S"
-            elif area < 15000:
-                calculated_size_class = "M"
-            elif area < 30000:
-                calculated_size_class = "L"
-            elif area < 50000:
-                calculated_size_class = "XL"
-            else:
-                calculated_size_class = "XXL"
+            calculated_size_class = SIZE_LABELS[bisect_right(SIZE_THRESHOLDS, width * height)]
         
         # Create artwork in database
         artwork_data = {
@@ -370,39 +619,46 @@ async def create_artwork(
             "coating": coating,
             "status": "draft",
             "main_image_url": main_image_url,
-            "thumbnail_urls": json.dumps(thumbnail_urls),
+            "thumbnail_urls": json.dumps([]),
             "dominant_color": dominant_color,
             "packaging_info": packaging_info,
             "maintenance_info": maintenance_info,
-            "created_at": "now()",
-            "updated_at": "now()",
         }
         
-        artwork_response = admin_client.table("artworks").insert(artwork_data).execute()
+        main_image_row = {"image_url": main_image_url, "image_order": 0, "is_main": True}
+        
+        # Insert the artwork and its main image in one transaction (single round-trip)
+        create_response = admin_client.rpc(
+            "create_artwork_with_images",
+            {"p_artwork": artwork_data, "p_images": [main_image_row]},
+        ).execute()
         
-        if not artwork_response.data:
+        if not create_response.data:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create artwork",
             )
         
-        artwork = artwork_response.data[0]
-        artwork_id = artwork["id"]
-        
-        # Store images in artwork_images table
-        for img_data in processed_images:
-            # Use large size as main image URL
-            image_url = img_data["urls"].get("large") or img_data["urls"].get("medium") or list(img_data["urls"].values())[0]
-            
-            admin_client.table("artwork_images").insert({
-                "artwork_id": artwork_id,
-                "image_url": image_url,
-                "image_order": img_data["order"],
-                "is_main": img_data["is_main"],
-            }).execute()
+        artwork = create_response.data
+        
+        background_tasks.add_task(
+            finalize_artwork,
+            artwork["id"],
+            custom_id,
+            current_user.id,
+            filenames,
+            processed_images,
+            main_image_url,
+            admin_client,
+            storage_service,
+        )
         
-        # Return created artwork
-        return artwork_to_response(artwork, include_artist=True, include_images=True)
+        # Return created artwork (the inserted image row comes back embedded)
+        return artwork_to_response(
+            artwork,
+            include_artist=True,
+            embedded_images=artwork.pop("artwork_images", None) or [],
+        )
         
     except HTTPException:
         raise
@@ -414,7 +670,7 @@ async def create_artwork(
 
 
 # 4.2 Artwork Listing API
-@router.get("/", response_model=ArtworkListResponse)
+@router.get("/", responses={200: {"model": ArtworkListResponse}})
 async def get_artworks(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
@@ -427,8 +683,10 @@ async def get_artworks(
     search: Optional[str] = Query(None, description="Search in title, description, artist name"),
     sort_by: Optional[str] = Query("created_at", description="Sort by: price, created_at, view_count"),
     sort_order: Optional[str] = Query("desc", description="Sort order: asc, desc"),
+    include_images: bool = Query(False, description="Include all images of each artwork"),
     credentials = Security(security),
     current_user: Optional[CurrentUser] = Depends(get_current_user),
+    admin_client: Client = Depends(admin_client_dep),
 ):
     """
     Get list of artworks with pagination, filters, and search
@@ -440,86 +698,97 @@ async def get_artworks(
     - Returns total count for pagination
     - Includes artist information and image URLs
     """
-    admin_client = get_supabase_admin_client()
     
     try:
-        # Build query
-        query = admin_client.table("artworks").select("*, artists(id, name, profile_image_url)")
-        
-        # Apply filters
-        if status:
-            query = query.eq("status", status)
-        else:
-            # Default: show published artworks, or user's own artworks if authenticated
-            if current_user and current_user.user_type == "artist":
+        def build_query(columns: str):
+            """Artworks query with all filters applied (no sorting or paging)"""
+            query = admin_client.table("artworks").select(columns, count="exact")
+            
+            # Apply filters
+            if status:
+                query = query.eq("status", status)
+            elif current_user and current_user.user_type == "artist":
                 # Artists can see their own artworks (any status) + published artworks
-                # Use separate queries and combine results, or use a more complex filter
-                # For now, we'll fetch all and filter in Python (not ideal for large datasets)
-                # In production, you might want to use a database function or view
-                pass  # Will filter after query
+                query = query.or_(f"status.eq.published,artist_id.eq.{current_user.id}")
             else:
                 # Others only see published artworks
                 query = query.eq("status", "published")
-        
-        if artist_id:
-            query = query.eq("artist_id", artist_id)
-        
-        if min_price is not None:
-            query = query.gte("price", str(min_price))
-        
-        if max_price is not None:
-            query = query.lte("price", str(max_price))
-        
-        if size_class:
-            query = query.eq("size_class", size_class)
-        
-        if medium:
-            query = query.ilike("medium", f"%{medium}%")
-        
-        if search:
-            # Search in title, description
-            query = query.or_(f"title.ilike.%{search}%,description.ilike.%{search}%")
+            
+            if artist_id:
+                query = query.eq("artist_id", artist_id)
+            
+            if min_price is not None:
+                query = query.gte("price", str(min_price))
+            
+            if max_price is not None:
+                query = query.lte("price", str(max_price))
+            
+            if size_class:
+                query = query.eq("size_class", size_class)
+            
+            if medium:
+                query = query.ilike("medium", f"%{medium}%")
+            
+            if search:
+                # Search in title, description
+                query = query.or_(f"title.ilike.%{search}%,description.ilike.%{search}%")
+            
+            return query
         
         # Apply sorting
         sort_column = sort_by if sort_by in ["price", "created_at", "view_count"] else "created_at"
         sort_desc = sort_order.lower() == "desc"
-        query = query.order(sort_column, desc=sort_desc)
-        
-        # Execute query to get all matching results (for filtering)
-        response = query.execute()
-        
-        # Filter results if needed (for artist's own artworks + published)
-        filtered_data = []
-        if response.data:
-            if current_user and current_user.user_type == "artist" and not status:
-                # Filter: own artworks (any status) OR published artworks
-                for artwork_data in response.data:
-                    if artwork_data["artist_id"] == current_user.id or artwork_data["status"] == "published":
-                        filtered_data.append(artwork_data)
-            else:
-                filtered_data = response.data
-        
-        # Calculate total
-        total = len(filtered_data)
         
-        # Apply pagination
+        # Paginate in the database; the total comes from the exact count
         offset = (page - 1) * page_size
-        paginated_data = filtered_data[offset:offset + page_size]
+        try:
+            response = (
+                build_query(f"*, {ARTIST_EMBED}")
+                .order(sort_column, desc=sort_desc)
+                .limit(page_size)
+                .offset(offset)
+                .execute()
+            )
+            paginated_data = response.data or []
+            total = response.count or 0
+        except APIError as e:
+            # PostgREST rejects offsets past the last row; that page is empty
+            if e.code != "PGRST103":
+                raise
+            paginated_data = []
+            total = build_query("id").limit(1).execute().count or 0
+        
+        # The artist is embedded in each row and images are fetched for the
+        # whole page at once, so there are no per-artwork lookups
+        images_by_artwork = None
+        if include_images:
+            images_by_artwork = fetch_images_bulk([a["id"] for a in paginated_data])
         
         artworks = []
         for artwork_data in paginated_data:
-            artworks.append(artwork_to_response(artwork_data, include_artist=True, include_images=False))
+            artworks.append(artwork_to_response(
+                artwork_data,
+                embedded_artist=artwork_data.pop("artists", None),
+                embedded_images=images_by_artwork[artwork_data["id"]] if images_by_artwork is not None else None,
+            ))
         
         total_pages = (total + page_size - 1) // page_size
         
-        return ArtworkListResponse(
+        list_response = ArtworkListResponse(
             items=artworks,
             total=total,
-        page=page,
+            page=page,
             page_size=page_size,
             total_pages=total_pages,
         )
         
+        # Encode directly instead of letting FastAPI re-validate every item
+        # against response_model; Decimal fields are encoded as strings
+        return Response(
+            content=orjson.dumps(list_response.model_dump(), default=str),
+            media_type="application/json",
+        )
+        
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -531,8 +800,11 @@ async def get_artworks(
 @router.get("/{artwork_id}", response_model=ArtworkResponse)
 async def get_artwork(
     artwork_id: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
     credentials = Security(security),
     current_user: Optional[CurrentUser] = Depends(get_current_user),
+    admin_client: Client = Depends(admin_client_dep),
 ):
     """
     Get artwork by ID
@@ -542,12 +814,64 @@ async def get_artwork(
     - Artist profile
     - Increments view_count
     - Handles published vs draft visibility
+    - Answers 304 Not Modified when If-None-Match matches the current ETag
     """
-    admin_client = get_supabase_admin_client()
+    if_none_match = request.headers.get("if-none-match")
+    redis_client = get_redis()
+    cache_key = artwork_cache_key(artwork_id)
+    
+    async def load_cached() -> Optional[dict]:
+        return await redis_client.hgetall(cache_key) or None
+    
+    # Published artworks are served from the cache when possible (this
+    # worker's local copy first, then Redis)
+    try:
+        cached = await get_artwork_cache().get_or_load(artwork_id, load_cached)
+    except Exception as e:
+        logger.warning(f"Failed to read cache for artwork {artwork_id}: {e}")
+        cached = None
+    
+    if cached:
+        etag = cached[b"etag"].decode()
+        if if_none_match == etag:
+            return artwork_detail_response(None, etag)
+        is_owner = (
+            current_user is not None
+            and current_user.user_type == "artist"
+            and current_user.id == cached[b"artist_id"].decode()
+        )
+        if not is_owner:
+            background_tasks.add_task(increment_view_count, artwork_id)
+        return artwork_detail_response(cached[b"body"], etag)
     
     try:
-        # Get artwork
-        response = admin_client.table("artworks").select("*").eq("id", artwork_id).execute()
+        # Revalidation only needs the version columns, not the joins
+        if if_none_match:
+            version_response = await asyncio.to_thread(
+                admin_client.table("artworks")
+                .select("id, artist_id, status, updated_at")
+                .eq("id", artwork_id)
+                .execute
+            )
+            if version_response.data:
+                version = version_response.data[0]
+                is_owner = current_user and current_user.user_type == "artist" and current_user.id == version["artist_id"]
+                is_published = version["status"] == "published"
+                etag = artwork_etag(version)
+                if (is_published or is_owner) and if_none_match == etag:
+                    return artwork_detail_response(None, etag, is_published)
+        
+        # Taken before the read: the entry is only cached if no write
+        # invalidated the artwork in between
+        cache_generation = await get_artwork_cache().generation(artwork_id)
+        
+        # Get artwork together with its artist and images
+        response = await asyncio.to_thread(
+            admin_client.table("artworks")
+            .select(f"*, {ARTIST_EMBED}, {IMAGES_EMBED}")
+            .eq("id", artwork_id)
+            .execute
+        )
         
         if not response.data:
             raise HTTPException(
@@ -568,13 +892,32 @@ async def get_artwork(
             )
         
         # Increment view_count (only for published artworks viewed by non-owners)
+        # after the response is sent; the returned count includes this view
         if is_published and not is_owner:
-            admin_client.table("artworks").update({
-                "view_count": artwork.get("view_count", 0) + 1,
-            }).eq("id", artwork_id).execute()
-            artwork["view_count"] = artwork.get("view_count", 0) + 1
+            background_tasks.add_task(increment_view_count, artwork_id)
+            artwork["view_count"] = (artwork.get("view_count") or 0) + 1
+        
+        artwork_response = artwork_to_response(
+            artwork,
+            embedded_artist=artwork.pop("artists", None),
+            embedded_images=artwork.pop("artwork_images", None) or [],
+        )
+        
+        body = artwork_response.model_dump_json().encode()
+        etag = artwork_etag(artwork)
         
-        return artwork_to_response(artwork, include_artist=True, include_images=True)
+        # Drafts are only visible to their owner and are never cached
+        if not is_published:
+            return artwork_detail_response(body, etag, is_published=False)
+        
+        await get_artwork_cache().fill(
+            artwork_id,
+            cache_generation,
+            {"body": body, "etag": etag, "artist_id": artwork["artist_id"]},
+            ARTWORK_CACHE_TTL_SECONDS,
+        )
+        
+        return artwork_detail_response(body, etag)
         
     except HTTPException:
         raise
@@ -586,12 +929,21 @@ async def get_artwork(
 
 
 # 4.4 Artwork Update API
+
+# Messages raised by the update_artwork_with_relations database function
+UPDATE_ERRORS = {
+    "NOT_FOUND": (status.HTTP_404_NOT_FOUND, "Artwork not found"),
+    "FORBIDDEN": (status.HTTP_403_FORBIDDEN, "You can only update your own artworks"),
+}
+
+
 @router.put("/{artwork_id}", response_model=ArtworkResponse)
 async def update_artwork(
     artwork_id: str,
     request: ArtworkUpdateRequest,
     credentials = Security(security),
     current_user: CurrentUser = Depends(require_artist),
+    admin_client: Client = Depends(admin_client_dep),
 ):
     """
     Update artwork
@@ -600,27 +952,8 @@ async def update_artwork(
     - Updates artwork fields
     - Handles status changes (draft → published requires validation)
     """
-    admin_client = get_supabase_admin_client()
     
     try:
-        # Get artwork and verify ownership
-        artwork_response = admin_client.table("artworks").select("*").eq("id", artwork_id).execute()
-        
-        if not artwork_response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Artwork not found",
-            )
-        
-        artwork = artwork_response.data[0]
-        
-        # Verify ownership
-        if artwork["artist_id"] != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You can only update your own artworks",
-            )
-        
         # Build update data
         updates = {}
         
@@ -635,11 +968,11 @@ async def update_artwork(
         if request.lease_price is not None:
             updates["lease_price"] = str(request.lease_price)
         if request.dimensions is not None:
-            updates["dimensions"] = json.dumps({
+            updates["dimensions"] = {
                 "width": request.dimensions.width,
                 "height": request.dimensions.height,
                 "depth": request.dimensions.depth,
-            })
+            }
         if request.size_class is not None:
             updates["size_class"] = request.size_class
         if request.year is not None:
@@ -665,20 +998,27 @@ async def update_artwork(
                 detail="No fields specified for update",
             )
         
-        updates["updated_at"] = "now()"
-        
-        # Update artwork
-        update_response = admin_client.table("artworks").update(updates).eq("id", artwork_id).execute()
-        
-        if not update_response.data:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to update artwork",
-            )
-        
-        updated_artwork = update_response.data[0]
-        
-        return artwork_to_response(updated_artwork, include_artist=True, include_images=True)
+        # Ownership check, update and the artist/images lookup run in one
+        # database call; updated_at is set by the artworks trigger
+        try:
+            update_response = admin_client.rpc(
+                "update_artwork_with_relations",
+                {"p_id": artwork_id, "p_user": current_user.id, "p_changes": updates},
+            ).execute()
+        except APIError as e:
+            if e.code != "P0001" or e.message not in UPDATE_ERRORS:
+                raise
+            status_code, detail = UPDATE_ERRORS[e.message]
+            raise HTTPException(status_code=status_code, detail=detail)
+        
+        updated_artwork = update_response.data
+        await get_artwork_cache().invalidate(artwork_id)
+        
+        return artwork_to_response(
+            updated_artwork,
+            embedded_artist=updated_artwork.pop("artists", None),
+            embedded_images=updated_artwork.pop("artwork_images", None) or [],
+        )
         
     except HTTPException:
         raise
@@ -696,6 +1036,9 @@ async def delete_artwork(
     hard_delete: bool = Query(False, description="Permanently delete (default: soft delete/recall)"),
     credentials = Security(security),
     current_user: CurrentUser = Depends(require_artist),
+    prefetched_artwork: asyncio.Future = Depends(prefetch_artwork_for_delete),
+    admin_client: Client = Depends(admin_client_dep),
+    storage_service: StorageService = Depends(storage_service_dep),
 ):
     """
     Delete or recall artwork
@@ -706,21 +1049,17 @@ async def delete_artwork(
     - Handles related data (favorites, assignments, orders via CASCADE)
     - Deletes associated images from storage (for hard delete)
     """
-    admin_client = get_supabase_admin_client()
-    storage_service = get_storage_service()
     
     try:
-        # Get artwork and verify ownership
-        artwork_response = admin_client.table("artworks").select("*").eq("id", artwork_id).execute()
+        # Artwork and its image URLs were fetched while resolving dependencies
+        artwork = await prefetched_artwork
         
-        if not artwork_response.data:
+        if not artwork:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Artwork not found",
             )
         
-        artwork = artwork_response.data[0]
-        
         # Verify ownership
         if artwork["artist_id"] != current_user.id:
             raise HTTPException(
@@ -729,26 +1068,20 @@ async def delete_artwork(
             )
         
         if hard_delete:
-            # Hard delete: Get image URLs before deletion
-            images_response = admin_client.table("artwork_images").select("image_url").eq("artwork_id", artwork_id).execute()
-            
             # Delete artwork (CASCADE will handle artwork_images)
             admin_client.table("artworks").delete().eq("id", artwork_id).execute()
+            await get_artwork_cache().invalidate(artwork_id)
             
-            # Delete images from storage
-            if images_response.data:
-                for img in images_response.data:
-                    image_url = img["image_url"]
-                    # Extract path from URL and delete
-                    # Note: This is a simplified approach - you may need to parse the URL properly
-                    try:
-                        # Extract path from Supabase storage URL
-                        # URL format: https://[project].supabase.co/storage/v1/object/public/artworks/[path]
-                        if "/artworks/" in image_url:
-                            path = image_url.split("/artworks/")[1].split("?")[0]
-                            await storage_service.delete_file("artworks", path)
-                    except Exception:
-                        pass  # Ignore storage deletion errors
+            # Delete images from storage in one batch request
+            paths = [
+                match.group(1)
+                for img in artwork.get("artwork_images") or []
+                if (match := STORAGE_PATH_RE.search(img["image_url"]))
+            ]
+            try:
+                await storage_service.delete_files("artworks", paths)
+            except Exception:
+                pass  # Ignore storage deletion errors
             
             return {
                 "message": "Artwork permanently deleted",
@@ -756,10 +1089,11 @@ async def delete_artwork(
             }
         else:
             # Soft delete: Set status to 'recalled'
+            # updated_at is set by the artworks trigger
             admin_client.table("artworks").update({
                 "status": "recalled",
-                "updated_at": "now()",
             }).eq("id", artwork_id).execute()
+            await get_artwork_cache().invalidate(artwork_id)
             
             return {
                 "message": "Artwork recalled",
@@ -776,81 +1110,171 @@ async def delete_artwork(
 
 
 # 4.6 Artwork Publishing Status API
-@router.post("/{artwork_id}/publish", response_model=ArtworkResponse)
-async def publish_artwork(
+
+# Messages raised by the publish_artwork/unpublish_artwork database functions
+# (reported per request by change_artworks_publishing)
+PUBLISHING_ERRORS = {
+    "NOT_FOUND": (status.HTTP_404_NOT_FOUND, "Artwork not found"),
+    "FORBIDDEN": (status.HTTP_403_FORBIDDEN, "You can only {action} your own artworks"),
+    "MISSING_FIELDS": (status.HTTP_400_BAD_REQUEST, "The following fields are required for publishing: {details}"),
+    "ALREADY_PUBLISHED": (status.HTTP_400_BAD_REQUEST, "This artwork is already published"),
+    "ALREADY_DRAFT": (status.HTTP_400_BAD_REQUEST, "This artwork is already a draft"),
+}
+
+
+# Publish/unpublish responses are kept for replay when the client sends an
+# Idempotency-Key, so a retried request gets the original response instead
+# of "already published"
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+# How long a key stays claimed by a request that is still running
+IDEMPOTENCY_LOCK_SECONDS = 60
+IDEMPOTENCY_PENDING = b"pending"
+
+
+async def claim_idempotency_key(replay_key: str) -> Optional[bytes]:
+    """
+    Claim an idempotency key for a new request
+    
+    Args:
+        replay_key: Redis key of the request's stored response
+        
+    Returns:
+        None if the key was claimed (the request should run), or the stored
+        response body of the earlier request
+        
+    Raises:
+        HTTPException: If a request with the same key is still running
+    """
+    redis_client = get_redis()
+    if await redis_client.set(replay_key, IDEMPOTENCY_PENDING, nx=True, ex=IDEMPOTENCY_LOCK_SECONDS):
+        return None
+    stored = await redis_client.get(replay_key)
+    if stored is None:
+        # Released by a failed request in the meantime; claim it again
+        return await claim_idempotency_key(replay_key)
+    if stored == IDEMPOTENCY_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is already in progress",
+        )
+    return stored
+
+
+async def change_publishing_status(
+    publishing_batcher: PublishingBatcher,
+    action: str,
     artwork_id: str,
-    credentials = Security(security),
-    current_user: CurrentUser = Depends(require_artist),
-):
+    user_id: str,
+    idempotency_key: Optional[str] = None,
+) -> Union[ArtworkResponse, Response]:
     """
-    Publish artwork
+    Publish or unpublish an artwork
     
-    Changes status from 'draft' to 'published'
-    Sets published_at timestamp
-    Validates artwork completeness before publishing
+    The change is sent together with any other concurrent publishing
+    requests; the database checks ownership, completeness and current status
+    on the locked row, applies the change and returns the updated artwork
+    with its artist and images embedded.
+    
+    Args:
+        publishing_batcher: Shared publishing batcher
+        action: "publish" or "unpublish"
+        artwork_id: Artwork ID
+        user_id: ID of the artist making the change
+        idempotency_key: Client-chosen key; repeating a key within
+            IDEMPOTENCY_TTL_SECONDS replays the first successful response
+        
+    Returns:
+        Updated artwork (or the serialized response when an idempotency key
+        is given)
+        
+    Raises:
+        HTTPException: If a check or the change fails
     """
-    admin_client = get_supabase_admin_client()
+    replay_key = None
+    if idempotency_key:
+        replay_key = f"idempotency:{action}:{user_id}:{artwork_id}:{idempotency_key}"
+        try:
+            stored = await claim_idempotency_key(replay_key)
+        except HTTPException:
+            raise
+        except Exception as e:
+            # Without Redis the request still runs, just without replay
+            logger.warning(f"Failed to claim idempotency key for artwork {artwork_id}: {e}")
+            replay_key = None
+            stored = None
+        if stored is not None:
+            return Response(content=stored, media_type="application/json")
     
     try:
-        # Get artwork and verify ownership
-        artwork_response = admin_client.table("artworks").select("*").eq("id", artwork_id).execute()
-        
-        if not artwork_response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Artwork not found",
-            )
-        
-        artwork = artwork_response.data[0]
-        
-        # Verify ownership
-        if artwork["artist_id"] != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You can only publish your own artworks",
-            )
-        
-        # Validate artwork completeness
-        required_fields = ["title", "price", "main_image_url"]
-        missing_fields = [field for field in required_fields if not artwork.get(field)]
-        
-        if missing_fields:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"The following fields are required for publishing: {', '.join(missing_fields)}",
-            )
-        
-        # Check if already published
-        if artwork["status"] == "published":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="This artwork is already published",
-            )
-        
-        # Publish artwork
-        update_response = admin_client.table("artworks").update({
-            "status": "published",
-            "published_at": "now()",
-            "updated_at": "now()",
-        }).eq("id", artwork_id).execute()
-        
-        if not update_response.data:
+        result = await publishing_batcher.change(action, artwork_id, user_id)
+        updated_artwork = result.get("artwork")
+        if not updated_artwork:
+            error = PUBLISHING_ERRORS.get(result.get("message")) if result.get("code") == "P0001" else None
+            if error is None:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to {action} artwork: {result.get('message')}",
+                )
+            status_code, detail = error
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to publish artwork",
+                status_code=status_code,
+                detail=detail.format(action=action, details=result.get("details") or ""),
             )
         
-        updated_artwork = update_response.data[0]
+        await get_artwork_cache().invalidate(artwork_id)
         
-        return artwork_to_response(updated_artwork, include_artist=True, include_images=True)
+        artwork_response = artwork_to_response(
+            updated_artwork,
+            embedded_artist=updated_artwork.pop("artists", None),
+            embedded_images=updated_artwork.pop("artwork_images", None) or [],
+        )
+        if replay_key is None:
+            return artwork_response
+        
+        body = artwork_response.model_dump_json().encode()
+        try:
+            await get_redis().set(replay_key, body, ex=IDEMPOTENCY_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Failed to store idempotent response for artwork {artwork_id}: {e}")
+        # Keep the stored response (or let the pending claim expire)
+        replay_key = None
+        return Response(content=body, media_type="application/json")
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to publish artwork: {str(e)}",
+            detail=f"Failed to {action} artwork: {str(e)}",
         )
+    finally:
+        # Release the key of a failed request so the client can retry
+        if replay_key is not None:
+            try:
+                await get_redis().delete(replay_key)
+            except Exception as e:
+                logger.warning(f"Failed to release idempotency key for artwork {artwork_id}: {e}")
+
+
+@router.post("/{artwork_id}/publish", response_model=ArtworkResponse)
+async def publish_artwork(
+    artwork_id: str,
+    credentials = Security(security),
+    current_user: CurrentUser = Depends(require_artist),
+    publishing_batcher: PublishingBatcher = Depends(publishing_batcher_dep),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """
+    Publish artwork
+    
+    Changes status from 'draft' to 'published'
+    Sets published_at timestamp
+    Validates artwork completeness before publishing
+    Retries with the same Idempotency-Key header replay the first response
+    """
+    return await change_publishing_status(
+        publishing_batcher, "publish", artwork_id, current_user.id, idempotency_key
+    )
 
 
 @router.post("/{artwork_id}/unpublish", response_model=ArtworkResponse)
@@ -858,60 +1282,67 @@ async def unpublish_artwork(
     artwork_id: str,
     credentials = Security(security),
     current_user: CurrentUser = Depends(require_artist),
+    publishing_batcher: PublishingBatcher = Depends(publishing_batcher_dep),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ):
     """
     Unpublish artwork
     
     Changes status from 'published' back to 'draft'
+    Retries with the same Idempotency-Key header replay the first response
     """
-    admin_client = get_supabase_admin_client()
+    return await change_publishing_status(
+        publishing_batcher, "unpublish", artwork_id, current_user.id, idempotency_key
+    )
+
+
+@router.post("/bulk_publish", response_model=BulkPublishResponse)
+async def bulk_publish_artworks(
+    request: BulkPublishRequest,
+    credentials = Security(security),
+    current_user: CurrentUser = Depends(require_artist),
+    publishing_batcher: PublishingBatcher = Depends(publishing_batcher_dep),
+):
+    """
+    Publish many artworks at once
     
+    Publishes up to 500 artworks with a single database call (e.g. a whole
+    collection). Every artwork is checked like a single publish and gets its
+    own outcome; one failing artwork does not affect the others.
+    """
     try:
-        # Get artwork and verify ownership
-        artwork_response = admin_client.table("artworks").select("*").eq("id", artwork_id).execute()
-        
-        if not artwork_response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Artwork not found",
-            )
-        
-        artwork = artwork_response.data[0]
+        artwork_ids = list(dict.fromkeys(request.ids))
+        results = await publishing_batcher.change_many("publish", artwork_ids, current_user.id)
         
-        # Verify ownership
-        if artwork["artist_id"] != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You can only unpublish your own artworks",
-            )
-        
-        # Check if already draft
-        if artwork["status"] == "draft":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="This artwork is already a draft",
-            )
-        
-        # Unpublish artwork
-        update_response = admin_client.table("artworks").update({
-            "status": "draft",
-            "updated_at": "now()",
-        }).eq("id", artwork_id).execute()
-        
-        if not update_response.data:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to unpublish artwork",
-            )
+        outcome = BulkPublishResponse(
+            published=[], skipped=[], incomplete={}, forbidden=[], not_found=[], failed=[]
+        )
+        for artwork_id, result in zip(artwork_ids, results):
+            message = result.get("message") if result.get("code") == "P0001" else None
+            if result.get("artwork"):
+                outcome.published.append(artwork_id)
+            elif message == "ALREADY_PUBLISHED":
+                outcome.skipped.append(artwork_id)
+            elif message == "MISSING_FIELDS":
+                outcome.incomplete[artwork_id] = result.get("details") or ""
+            elif message == "FORBIDDEN":
+                outcome.forbidden.append(artwork_id)
+            elif message == "NOT_FOUND" or result.get("code") == "22P02":
+                # 22P02: not a valid UUID, so no such artwork
+                outcome.not_found.append(artwork_id)
+            else:
+                logger.error(f"Failed to publish artwork {artwork_id}: {result.get('message')}")
+                outcome.failed.append(artwork_id)
         
-        updated_artwork = update_response.data[0]
+        artwork_cache = get_artwork_cache()
+        await asyncio.gather(*(artwork_cache.invalidate(artwork_id) for artwork_id in outcome.published))
         
-        return artwork_to_response(updated_artwork, include_artist=True, include_images=True)
+        return outcome
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to unpublish artwork: {str(e)}",
+            detail=f"Failed to publish artworks: {str(e)}",
         )
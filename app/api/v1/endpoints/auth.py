@@ -2,31 +2,65 @@
 Authentication endpoints
 """
 
-from fastapi import APIRouter, HTTPException, status, Depends, Security
+import asyncio
+import functools
+import hashlib
+import re
+
+from fastapi import APIRouter, HTTPException, Request, status, Depends, Security
 from app.core.dependencies import security
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from pydantic import AfterValidator, BaseModel, ConfigDict, EmailStr, Field
+from typing import Annotated, Any, Awaitable, Callable, Optional
 
 from app.core.supabase import get_supabase_client, get_supabase_admin_client
+
+try:
+    from supabase_auth.errors import AuthApiError
+except ImportError:
+    # supabase releases before the gotrue package was renamed
+    from gotrue.errors import AuthApiError
 from app.core.config import settings
-from app.core.dependencies import get_current_user, CurrentUser
+from app.core.dependencies import get_current_user, CurrentUser, PROFILE_TABLES
+from app.core.profile_cache import get_profile_cache
+from app.core.rate_limit import get_rate_limiter
+from app.core.single_flight import SingleFlight
+from app.core.token_cache import get_token_cache
 
 router = APIRouter()
 
+# Upper bounds for request fields, so oversized input is rejected during
+# validation instead of being sent on to Supabase
+MAX_FIELD_LENGTH = 1024
+MAX_PASSWORD_LENGTH = 128
+MAX_TOKEN_LENGTH = 4096
+
+
+# Email address of an auth request, lowercased like Supabase Auth stores it,
+# so profile rows and lookups by email agree on one spelling
+AuthEmail = Annotated[EmailStr, AfterValidator(str.lower)]
+
+
+class AuthRequest(BaseModel):
+    """Base model of auth request bodies (immutable, bounded strings)"""
+    model_config = ConfigDict(frozen=True, str_max_length=MAX_FIELD_LENGTH)
+
 
 # Artist Signup Models
-class ArtistAgreements(BaseModel):
+class ArtistAgreements(AuthRequest):
     copyright: bool
     ai: bool
     commercial: bool
     report: bool
 
 
-class ArtistSignupRequest(BaseModel):
+class ArtistSignupRequest(AuthRequest):
     name: str = Field(..., min_length=1, description="Artist name")
-    email: EmailStr
+    email: AuthEmail
     password: str = Field(
-        ..., min_length=8, description="Password (minimum 8 characters)"
+        ...,
+        min_length=8,
+        max_length=MAX_PASSWORD_LENGTH,
+        description="Password (minimum 8 characters)",
     )
     birth_date: Optional[str] = Field(None, description="Birth date (YYYY-MM-DD)")
     phone: Optional[str] = Field(None, description="Phone number")
@@ -34,22 +68,28 @@ class ArtistSignupRequest(BaseModel):
 
 
 # Customer Signup Models
-class CustomerSignupRequest(BaseModel):
+class CustomerSignupRequest(AuthRequest):
     name: str = Field(..., min_length=1, description="Customer name")
-    email: EmailStr
+    email: AuthEmail
     password: str = Field(
-        ..., min_length=8, description="Password (minimum 8 characters)"
+        ...,
+        min_length=8,
+        max_length=MAX_PASSWORD_LENGTH,
+        description="Password (minimum 8 characters)",
     )
     agree_to_terms: bool = Field(..., description="Agreement to terms of service")
 
 
 # Corporate Signup Models
-class CorporateSignupRequest(BaseModel):
+class CorporateSignupRequest(AuthRequest):
     company_name: str = Field(..., min_length=1, description="Company name")
     contact_name: str = Field(..., min_length=1, description="Contact person name")
-    email: EmailStr
+    email: AuthEmail
     password: str = Field(
-        ..., min_length=8, description="Password (minimum 8 characters)"
+        ...,
+        min_length=8,
+        max_length=MAX_PASSWORD_LENGTH,
+        description="Password (minimum 8 characters)",
     )
     postal_code: Optional[str] = Field(None, description="Postal code")
     company_address: Optional[str] = Field(None, description="Company address")
@@ -57,15 +97,15 @@ class CorporateSignupRequest(BaseModel):
 
 
 # Legacy signup (keeping for backward compatibility)
-class SignupRequest(BaseModel):
-    email: EmailStr
+class SignupRequest(AuthRequest):
+    email: AuthEmail
     password: str
     user_type: str  # 'artist', 'corporate', 'customer'
     name: str
 
 
-class LoginRequest(BaseModel):
-    email: EmailStr
+class LoginRequest(AuthRequest):
+    email: AuthEmail
     password: str
 
 
@@ -75,114 +115,362 @@ class AuthResponse(BaseModel):
     user: dict
 
 
-@router.post(
-    "/signup/artist", response_model=AuthResponse, status_code=status.HTTP_201_CREATED
+def _make_auth_response(
+    user_type: str,
+    user_id: str,
+    email: str,
+    name: str,
+    extras: Optional[dict] = None,
+    token: str = "",
+) -> AuthResponse:
+    """
+    Build the response of a signup or login
+
+    The values come from Supabase and validated requests, so the model is
+    constructed without validation (FastAPI does not re-validate a returned
+    instance of the response model).
+
+    Args:
+        user_type: "artist", "corporate" or "customer"
+        user_id: Auth user ID
+        email: Email address
+        name: Display name
+        extras: Additional user fields (e.g. status, company_name)
+        token: Access token ("" until the email is confirmed)
+
+    Returns:
+        AuthResponse
+    """
+    user = {"id": user_id, "email": email, "user_type": user_type, "name": name}
+    if extras:
+        user.update(extras)
+    return AuthResponse.model_construct(access_token=token, user=user)
+
+
+# Profile columns returned by each role's login endpoint
+LOGIN_PROFILE_COLUMNS = {
+    "artist": "name, status",
+    "corporate": "contact_name, company_name, status",
+    "customer": "name",
+}
+
+
+def _fetch_login_profile(admin_client, user_type: str, column: str, value: str) -> Optional[dict]:
+    """Fetch the login profile columns of a user by ID or email (blocking)"""
+    profile_response = (
+        admin_client.table(PROFILE_TABLES[user_type])
+        .select(f"id, {LOGIN_PROFILE_COLUMNS[user_type]}")
+        .eq(column, value)
+        .execute()
+    )
+    return profile_response.data[0] if profile_response.data else None
+
+
+async def _prefetch_login_profile(admin_client, user_type: str, email: str) -> Optional[dict]:
+    """
+    Look up the profile of a login email while the password is checked
+
+    Profiles rarely change, so they are cached between logins (see
+    app.core.profile_cache); on a miss the profile is fetched by email.
+
+    Returns:
+        Profile row, or None if not found or the lookup failed (the profile
+        is then fetched by user ID after sign-in)
+    """
+    profile = get_profile_cache().get(email)
+    if profile is None:
+        try:
+            profile = await asyncio.to_thread(_fetch_login_profile, admin_client, user_type, "email", email)
+        except Exception:
+            profile = None
+    return profile
+
+
+async def _get_login_profile(
+    admin_client,
+    user_type: str,
+    email: str,
+    user_id: str,
+    prefetched: Optional[dict],
+) -> Optional[dict]:
+    """
+    Get the profile columns a login response needs
+
+    Args:
+        admin_client: Supabase admin client
+        user_type: "artist", "corporate" or "customer"
+        email: Login email
+        user_id: Authenticated user ID
+        prefetched: Result of _prefetch_login_profile
+
+    Returns:
+        Profile row, or None if the user has no profile of this type
+    """
+    profile = prefetched
+    # The prefetched row is only trusted if it is the authenticated user's
+    if not profile or profile["id"] != user_id:
+        profile = await asyncio.to_thread(_fetch_login_profile, admin_client, user_type, "id", user_id)
+    if profile:
+        get_profile_cache().put(email, profile)
+    return profile
+
+
+# Supabase Auth error codes handled by the auth endpoints
+EMAIL_NOT_CONFIRMED = "email_not_confirmed"
+INVALID_CREDENTIALS = "invalid_credentials"
+RATE_LIMIT_CODES = frozenset({"over_email_send_rate_limit", "over_request_rate_limit"})
+USER_EXISTS_CODES = frozenset({"user_already_exists", "email_exists"})
+
+# Messages of Supabase Auth servers that predate error codes, and of errors
+# that do not come from the Auth API
+LEGACY_AUTH_ERRORS = (
+    ("email not confirmed", EMAIL_NOT_CONFIRMED),
+    ("invalid login credentials", INVALID_CREDENTIALS),
+    ("rate limit", "over_email_send_rate_limit"),
+    ("too many requests", "over_request_rate_limit"),
 )
-async def signup_artist(request: ArtistSignupRequest):
+
+
+def _auth_error_code(error: Exception) -> Optional[str]:
     """
-    Artist registration endpoint
+    Supabase Auth error code of an exception
 
-    Creates a new artist account in Supabase Auth and artist profile in database
+    Args:
+        error: Exception raised by a Supabase Auth call
+
+    Returns:
+        The code sent by Supabase Auth (e.g. "email_not_confirmed"),
+        "over_request_rate_limit" for an uncoded 429, a code matched from the
+        message of errors without one, or None
     """
+    if isinstance(error, AuthApiError):
+        if error.code:
+            return error.code
+        if error.status == status.HTTP_429_TOO_MANY_REQUESTS:
+            return "over_request_rate_limit"
+
+    message = str(error).lower()
+    for text, code in LEGACY_AUTH_ERRORS:
+        if text in message:
+            return code
+    return None
+
+
+# Login failures by Supabase Auth error code: (status code, detail)
+LOGIN_ERRORS = {
+    EMAIL_NOT_CONFIRMED: (
+        status.HTTP_403_FORBIDDEN,
+        "Email address is not confirmed. Please complete verification from the confirmation email in your inbox.",
+    ),
+    INVALID_CREDENTIALS: (
+        status.HTTP_401_UNAUTHORIZED,
+        "Email address or password is incorrect",
+    ),
+}
+
+
+def _map_supabase_auth_error(error: Exception) -> Optional[HTTPException]:
+    """
+    HTTP error of a failed Supabase Auth sign-in
+
+    Args:
+        error: Exception raised by sign_in_with_password
+
+    Returns:
+        HTTPException for a known login failure, or None
+    """
+    mapped = LOGIN_ERRORS.get(_auth_error_code(error))
+    if mapped is None:
+        return None
+    status_code, detail = mapped
+    return HTTPException(status_code=status_code, detail=detail)
+
+# 409 messages for an email already registered under a role
+EXISTING_USER_MESSAGES = {
+    "artist": "This email address is already registered as an artist. Please log in from the artist login page.",
+    "corporate": "This email address is already registered as a corporate. Please log in from the corporate login page.",
+    "customer": "This email address is already registered as a customer. Please log in from the customer login page.",
+}
+EXISTING_USER_MESSAGE = "このメールアドレスは既に登録されています。ログインページからログインしてください。"
+DIFFERENT_ROLE_MESSAGE = "このメールアドレスは既に登録されています。別のロールで登録されている可能性があります。ログインページからログインしてください。"
+
+
+# Supabase errors of a signup whose user already exists / whose profile
+# violates the auth user foreign key
+DUPLICATE_ERROR_RE = re.compile(r"user already registered|already exists|duplicate", re.IGNORECASE)
+FOREIGN_KEY_ERROR_RE = re.compile(r"foreign key constraint|violates foreign key", re.IGNORECASE)
+
+
+def _is_duplicate_error(error_message: str) -> bool:
+    """Whether a Supabase error reports an already registered user"""
+    return DUPLICATE_ERROR_RE.search(error_message) is not None
+
+
+def _is_foreign_key_error(error_message: str) -> bool:
+    """Whether a database error is a foreign key violation"""
+    return FOREIGN_KEY_ERROR_RE.search(error_message) is not None
+
+
+async def _conflict_for_existing_user(email: str) -> HTTPException:
+    """
+    Build the 409 response for a signup whose email is already registered
+
+    Only runs after sign_up reported a duplicate, so the role lookup costs
+    nothing on the (common) new-user path.
+
+    Args:
+        email: Email address of the signup request
+
+    Returns:
+        HTTPException pointing the user to the login page of their role
+    """
+    existing_user_type = ""
     try:
-        client = get_supabase_client()
         admin_client = get_supabase_admin_client()
+        for user_type, table in PROFILE_TABLES.items():
+            query = admin_client.table(table).select("id").eq("email", email).limit(1)
+            if (await asyncio.to_thread(query.execute)).data:
+                existing_user_type = user_type
+                break
+    except Exception:
+        pass  # Fall back to the generic message
+
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=EXISTING_USER_MESSAGES.get(existing_user_type, EXISTING_USER_MESSAGE),
+    )
 
-        # Step 0: Check if user already exists
-        try:
-            existing_user = admin_client.auth.admin.get_user_by_email(request.email)
-            if existing_user.user:
-                # User already exists, check their current role
-                user_metadata = existing_user.user.user_metadata or {}
-                existing_user_type = user_metadata.get("user_type", "")
 
-                if existing_user_type == "artist":
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail="This email address is already registered as an artist. Please log in from the artist login page.",
-                    )
-                elif existing_user_type == "corporate":
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail="This email address is already registered as a corporate. Please log in from the corporate login page.",
-                    )
-                elif existing_user_type == "customer":
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail="This email address is already registered as a customer. Please log in from the customer login page.",
-                    )
-                else:
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail="This email address is already registered. Please log in from the login page.",
-                    )
-        except Exception as check_error:
-            # If get_user_by_email fails, user doesn't exist - continue with signup
-            # But if it's an HTTPException we raised, re-raise it
-            if isinstance(check_error, HTTPException):
-                raise
-            # Otherwise, user doesn't exist, continue with signup
-            pass
+async def _sign_up(email: str, password: str, metadata: dict):
+    """
+    Create a Supabase Auth user
 
-        # Step 1: Create user in Supabase Auth
-        auth_response = client.auth.sign_up(
-            {
-                "email": request.email,
-                "password": request.password,
-                "options": {
-                    "data": {
-                        "user_type": "artist",
-                        "name": request.name,
-                    }
-                },
-            }
+    When metadata contains a "profile", the create_profile_on_signup trigger
+    creates the role profile in the same transaction (see migration
+    20260119000032), so a failing profile insert fails the signup.
+
+    Args:
+        email: Email address
+        password: Password
+        metadata: User metadata (user_type, name and optionally profile)
+
+    Returns:
+        Supabase auth response
+
+    Raises:
+        HTTPException: If no user was created or the email is already registered
+    """
+    client = get_supabase_client()
+    auth_response = await asyncio.to_thread(
+        client.auth.sign_up,
+        {
+            "email": email,
+            "password": password,
+            "options": {"data": metadata},
+        },
+    )
+
+    if auth_response.user is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Failed to create user account",
         )
 
-        if auth_response.user is None:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to create user account",
-            )
+    # With email confirmation enabled, signing up an existing email returns
+    # an obfuscated user without identities instead of an error
+    if auth_response.user.identities == []:
+        raise await _conflict_for_existing_user(email)
 
-        user_id = auth_response.user.id
+    return auth_response
 
-        # Step 2: Create artist profile in database
-        artist_profile = {
-            "id": user_id,  # Use auth user ID as primary key
-            "name": request.name,
-            "email": request.email,
-            "birth_date": request.birth_date,
-            "phone": request.phone,
-            "agreement_copyright": request.agreements.copyright,
-            "agreement_ai": request.agreements.ai,
-            "agreement_commercial": request.agreements.commercial,
-            "agreement_report": request.agreements.report,
-            "status": "pending",  # Initial status
-            "created_at": "now()",
-            "updated_at": "now()",
-        }
 
-        # Use admin client to insert (bypasses RLS if needed)
-        try:
-            profile_response = (
-                admin_client.table("artists").insert(artist_profile).execute()
-            )
+async def _signup_error(error: Exception, email: str) -> HTTPException:
+    """
+    Map an unexpected signup error to an HTTP error
 
-            if not profile_response.data:
-                print(f"Warning: Failed to create artist profile for user {user_id}")
-        except Exception as profile_error:
-            error_str = str(profile_error)
-            # Check for foreign key constraint violation (user already has different profile)
-            if (
-                "foreign key constraint" in error_str.lower()
-                or "violates foreign key" in error_str.lower()
-            ):
-                # User exists but has different role profile
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail="This email address is already registered. It may be registered with a different role. Please log in from the login page.",
-                )
-            raise
+    Args:
+        error: Error raised by Supabase
+        email: Email address of the signup request
+
+    Returns:
+        HTTPException to raise
+    """
+    error_message = str(error)
+    if _auth_error_code(error) in USER_EXISTS_CODES or _is_duplicate_error(error_message):
+        return await _conflict_for_existing_user(email)
+    if _is_foreign_key_error(error_message):
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=DIFFERENT_ROLE_MESSAGE,
+        )
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Registration failed: {error_message}",
+    )
+
+
+# Signups in progress, keyed by request body (see _single_flight)
+_signups_in_flight: SingleFlight[AuthRequest, AuthResponse] = SingleFlight()
+
+
+def _single_flight(
+    signup: Callable[[AuthRequest], Awaitable[AuthResponse]],
+) -> Callable[[AuthRequest], Awaitable[AuthResponse]]:
+    """
+    Coalesce identical concurrent signup requests (double submits, client
+    retries) onto one Supabase call
+
+    Requests are keyed by their whole (frozen) body, so only a repeat of the
+    same email and password shares the result; any other request for the
+    email still goes to Supabase and gets its own answer.
+    """
+
+    @functools.wraps(signup)
+    async def wrapper(request: AuthRequest) -> AuthResponse:
+        return await _signups_in_flight.run(request, lambda: signup(request))
+
+    return wrapper
+
+
+@router.post(
+    "/signup/artist", response_model=AuthResponse, status_code=status.HTTP_201_CREATED
+)
+@_single_flight
+async def signup_artist(request: ArtistSignupRequest):
+    """
+    Artist registration endpoint
+
+    Creates a new artist account in Supabase Auth and artist profile in database
+    """
+    # The signup trigger rejects artists without every agreement as well
+    agreements = request.agreements
+    if not (agreements.copyright and agreements.ai and agreements.commercial and agreements.report):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="All agreements must be accepted",
+        )
+
+    try:
+        # Create the user in Supabase Auth; the artist profile is created
+        # in the same transaction
+        auth_response = await _sign_up(
+            request.email,
+            request.password,
+            {
+                "user_type": "artist",
+                "name": request.name,
+                "profile": {
+                    "name": request.name,
+                    "birth_date": request.birth_date,
+                    "phone": request.phone,
+                    "agreement_copyright": request.agreements.copyright,
+                    "agreement_ai": request.agreements.ai,
+                    "agreement_commercial": request.agreements.commercial,
+                    "agreement_report": request.agreements.report,
+                },
+            },
+        )
+        user_id = auth_response.user.id
 
         # Handle case where email confirmation is required (session might be None)
         access_token = ""
@@ -193,48 +481,20 @@ async def signup_artist(request: ArtistSignupRequest):
             # Frontend should handle email confirmation flow
             pass
 
-        return AuthResponse(
-            access_token=access_token,
-            user={
-                "id": user_id,
-                "email": auth_response.user.email,
-                "user_type": "artist",
-                "name": request.name,
-            },
+        return _make_auth_response(
+            "artist", user_id, auth_response.user.email, request.name, token=access_token
         )
 
     except HTTPException:
         raise
     except Exception as e:
-        error_message = str(e)
-        # Handle Supabase-specific errors
-        if (
-            "User already registered" in error_message
-            or "already exists" in error_message.lower()
-            or "duplicate" in error_message.lower()
-        ):
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="このメールアドレスは既に登録されています。ログインページからログインしてください。",
-            )
-        # Check for foreign key constraint errors
-        if (
-            "foreign key constraint" in error_message.lower()
-            or "violates foreign key" in error_message.lower()
-        ):
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="このメールアドレスは既に登録されています。別のロールで登録されている可能性があります。ログインページからログインしてください。",
-            )
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Registration failed: {error_message}",
-        )
+        raise await _signup_error(e, request.email)
 
 
 @router.post(
     "/signup/customer", response_model=AuthResponse, status_code=status.HTTP_201_CREATED
 )
+@_single_flight
 async def signup_customer(request: CustomerSignupRequest):
     """
     Customer registration endpoint
@@ -248,139 +508,32 @@ async def signup_customer(request: CustomerSignupRequest):
                 detail="You must agree to the terms of service",
             )
 
-        client = get_supabase_client()
-        admin_client = get_supabase_admin_client()
-
-        # Step 0: Check if user already exists
-        try:
-            existing_user = admin_client.auth.admin.get_user_by_email(request.email)
-            if existing_user.user:
-                # User already exists, check their current role
-                user_metadata = existing_user.user.user_metadata or {}
-                existing_user_type = user_metadata.get("user_type", "")
-
-                if existing_user_type == "artist":
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail="This email address is already registered as an artist. Please log in from the artist login page.",
-                    )
-                elif existing_user_type == "corporate":
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail="This email address is already registered as a corporate. Please log in from the corporate login page.",
-                    )
-                elif existing_user_type == "customer":
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail="This email address is already registered as a customer. Please log in from the customer login page.",
-                    )
-                else:
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail="This email address is already registered. Please log in from the login page.",
-                    )
-        except Exception as check_error:
-            # If get_user_by_email fails, user doesn't exist - continue with signup
-            # But if it's an HTTPException we raised, re-raise it
-            if isinstance(check_error, HTTPException):
-                raise
-            # Otherwise, user doesn't exist, continue with signup
-            pass
-
-        # Step 1: Create user in Supabase Auth
-        auth_response = client.auth.sign_up(
+        # Create the user in Supabase Auth; the customer profile is created
+        # in the same transaction
+        auth_response = await _sign_up(
+            request.email,
+            request.password,
             {
-                "email": request.email,
-                "password": request.password,
-                "options": {
-                    "data": {
-                        "user_type": "customer",
-                        "name": request.name,
-                    }
-                },
-            }
+                "user_type": "customer",
+                "name": request.name,
+                "profile": {"name": request.name},
+            },
         )
-
-        if auth_response.user is None:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to create user account",
-            )
-
         user_id = auth_response.user.id
 
-        # Step 2: Create customer profile in database
-        customer_profile = {
-            "id": user_id,
-            "name": request.name,
-            "email": request.email,
-            "created_at": "now()",
-            "updated_at": "now()",
-        }
-
-        # Use admin client to insert (bypasses RLS if needed)
-        try:
-            profile_response = (
-                admin_client.table("customers").insert(customer_profile).execute()
-            )
-
-            if not profile_response.data:
-                print(f"Warning: Failed to create customer profile for user {user_id}")
-        except Exception as profile_error:
-            error_str = str(profile_error)
-            # Check for foreign key constraint violation (user already has different profile)
-            if (
-                "foreign key constraint" in error_str.lower()
-                or "violates foreign key" in error_str.lower()
-            ):
-                # User exists but has different role profile
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail="This email address is already registered. It may be registered with a different role. Please log in from the login page.",
-                )
-            raise
-
         # Handle case where email confirmation is required
         access_token = ""
         if auth_response.session:
             access_token = auth_response.session.access_token
 
-        return AuthResponse(
-            access_token=access_token,
-            user={
-                "id": user_id,
-                "email": auth_response.user.email,
-                "user_type": "customer",
-                "name": request.name,
-            },
+        return _make_auth_response(
+            "customer", user_id, auth_response.user.email, request.name, token=access_token
         )
 
     except HTTPException:
         raise
     except Exception as e:
-        error_message = str(e)
-        if (
-            "User already registered" in error_message
-            or "already exists" in error_message.lower()
-            or "duplicate" in error_message.lower()
-        ):
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="このメールアドレスは既に登録されています。ログインページからログインしてください。",
-            )
-        # Check for foreign key constraint errors
-        if (
-            "foreign key constraint" in error_message.lower()
-            or "violates foreign key" in error_message.lower()
-        ):
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="このメールアドレスは既に登録されています。別のロールで登録されている可能性があります。ログインページからログインしてください。",
-            )
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Registration failed: {error_message}",
-        )
+        raise await _signup_error(e, request.email)
 
 
 @router.post(
@@ -388,6 +541,7 @@ async def signup_customer(request: CustomerSignupRequest):
     response_model=AuthResponse,
     status_code=status.HTTP_201_CREATED,
 )
+@_single_flight
 async def signup_corporate(request: CorporateSignupRequest):
     """
     Corporate registration endpoint
@@ -395,146 +549,44 @@ async def signup_corporate(request: CorporateSignupRequest):
     Creates a new corporate account in Supabase Auth and corporate profile in database
     """
     try:
-        client = get_supabase_client()
-        admin_client = get_supabase_admin_client()
-
-        # Step 0: Check if user already exists
-        try:
-            existing_user = admin_client.auth.admin.get_user_by_email(request.email)
-            if existing_user.user:
-                # User already exists, check their current role
-                user_metadata = existing_user.user.user_metadata or {}
-                existing_user_type = user_metadata.get("user_type", "")
-
-                if existing_user_type == "artist":
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail="This email address is already registered as an artist. Please log in from the artist login page.",
-                    )
-                elif existing_user_type == "corporate":
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail="This email address is already registered as a corporate. Please log in from the corporate login page.",
-                    )
-                elif existing_user_type == "customer":
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail="This email address is already registered as a customer. Please log in from the customer login page.",
-                    )
-                else:
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail="This email address is already registered. Please log in from the login page.",
-                    )
-        except Exception as check_error:
-            # If get_user_by_email fails, user doesn't exist - continue with signup
-            # But if it's an HTTPException we raised, re-raise it
-            if isinstance(check_error, HTTPException):
-                raise
-            # Otherwise, user doesn't exist, continue with signup
-            pass
-
-        # Step 1: Create user in Supabase Auth
-        auth_response = client.auth.sign_up(
+        # Create the user in Supabase Auth; the corporate profile is created
+        # in the same transaction
+        auth_response = await _sign_up(
+            request.email,
+            request.password,
             {
-                "email": request.email,
-                "password": request.password,
-                "options": {
-                    "data": {
-                        "user_type": "corporate",
-                        "name": request.contact_name,
-                        "company_name": request.company_name,
-                    }
+                "user_type": "corporate",
+                "name": request.contact_name,
+                "company_name": request.company_name,
+                "profile": {
+                    "company_name": request.company_name,
+                    "contact_name": request.contact_name,
+                    "postal_code": request.postal_code,
+                    "address": request.company_address,  # Map company_address to address field in DB
+                    "phone": request.phone,
                 },
-            }
+            },
         )
-
-        if auth_response.user is None:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to create user account",
-            )
-
         user_id = auth_response.user.id
 
-        # Step 2: Create corporate profile in database
-        corporate_profile = {
-            "id": user_id,
-            "company_name": request.company_name,
-            "contact_name": request.contact_name,
-            "email": request.email,
-            "postal_code": request.postal_code,
-            "address": request.company_address,  # Map company_address to address field in DB
-            "phone": request.phone,
-            "status": "pending",
-            "created_at": "now()",
-            "updated_at": "now()",
-        }
-
-        # Use admin client to insert (bypasses RLS if needed)
-        try:
-            profile_response = (
-                admin_client.table("corporates").insert(corporate_profile).execute()
-            )
-
-            if not profile_response.data:
-                print(f"Warning: Failed to create corporate profile for user {user_id}")
-        except Exception as profile_error:
-            error_str = str(profile_error)
-            # Check for foreign key constraint violation (user already has different profile)
-            if (
-                "foreign key constraint" in error_str.lower()
-                or "violates foreign key" in error_str.lower()
-            ):
-                # User exists but has different role profile
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail="This email address is already registered. It may be registered with a different role. Please log in from the login page.",
-                )
-            raise
-
         # Handle case where email confirmation is required
         access_token = ""
         if auth_response.session:
             access_token = auth_response.session.access_token
 
-        return AuthResponse(
-            access_token=access_token,
-            user={
-                "id": user_id,
-                "email": auth_response.user.email,
-                "user_type": "corporate",
-                "name": request.contact_name,
-                "company_name": request.company_name,
-            },
+        return _make_auth_response(
+            "corporate",
+            user_id,
+            auth_response.user.email,
+            request.contact_name,
+            extras={"company_name": request.company_name},
+            token=access_token,
         )
 
     except HTTPException:
         raise
     except Exception as e:
-        error_message = str(e)
-        if (
-            "User already registered" in error_message
-            or "already exists" in error_message.lower()
-            or "duplicate" in error_message.lower()
-        ):
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="このメールアドレスは既に登録されています。ログインページからログインしてください。",
-            )
-        # Check for foreign key constraint errors
-        if (
-            "foreign key constraint" in error_message.lower()
-            or "violates foreign key" in error_message.lower()
-        ):
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="このメールアドレスは既に登録されています。別のロールで登録されている可能性があります。ログインページからログインしてください。",
-            )
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Registration failed: {error_message}",
-        )
+        raise await _signup_error(e, request.email)
 
 
 @router.post(
@@ -549,7 +601,8 @@ async def signup(request: SignupRequest):
     try:
         # Create user in Supabase Auth
         client = get_supabase_client()
-        response = client.auth.sign_up(
+        response = await asyncio.to_thread(
+            client.auth.sign_up,
             {
                 "email": request.email,
                 "password": request.password,
@@ -559,7 +612,7 @@ async def signup(request: SignupRequest):
                         "name": request.name,
                     }
                 },
-            }
+            },
         )
 
         if response.user is None:
@@ -568,14 +621,12 @@ async def signup(request: SignupRequest):
                 detail="Failed to create user account",
             )
 
-        return AuthResponse(
-            access_token=response.session.access_token,
-            user={
-                "id": response.user.id,
-                "email": response.user.email,
-                "user_type": request.user_type,
-                "name": request.name,
-            },
+        return _make_auth_response(
+            request.user_type,
+            response.user.id,
+            response.user.email,
+            request.name,
+            token=response.session.access_token,
         )
 
     except Exception as e:
@@ -593,12 +644,16 @@ async def login_artist(request: LoginRequest):
         client = get_supabase_client()
         admin_client = get_supabase_admin_client()
 
-        # Authenticate user
-        auth_response = client.auth.sign_in_with_password(
-            {
-                "email": request.email,
-                "password": request.password,
-            }
+        # Authenticate user; the profile is looked up in the meantime
+        auth_response, prefetched_profile = await asyncio.gather(
+            asyncio.to_thread(
+                client.auth.sign_in_with_password,
+                {
+                    "email": request.email,
+                    "password": request.password,
+                },
+            ),
+            _prefetch_login_profile(admin_client, "artist", request.email),
         )
 
         if auth_response.user is None or auth_response.session is None:
@@ -618,47 +673,32 @@ async def login_artist(request: LoginRequest):
                 detail="This account is not registered as an artist. Please log in from the artist login page.",
             )
 
-        # Fetch artist profile from database
-        profile_response = (
-            admin_client.table("artists").select("*").eq("id", user_id).execute()
+        # Get artist profile
+        artist_profile = await _get_login_profile(
+            admin_client, "artist", request.email, user_id, prefetched_profile
         )
 
-        if not profile_response.data:
+        if not artist_profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Artist profile not found",
             )
 
-        artist_profile = profile_response.data[0]
-
-        return AuthResponse(
-            access_token=auth_response.session.access_token,
-            user={
-                "id": user_id,
-                "email": auth_response.user.email,
-                "user_type": "artist",
-                "name": artist_profile.get("name", user_metadata.get("name", "")),
-                "status": artist_profile.get("status", "pending"),
-            },
+        return _make_auth_response(
+            "artist",
+            user_id,
+            auth_response.user.email,
+            artist_profile.get("name", user_metadata.get("name", "")),
+            extras={"status": artist_profile.get("status", "pending")},
+            token=auth_response.session.access_token,
         )
 
     except HTTPException:
         raise
     except Exception as e:
-        error_message = str(e)
-        if "email not confirmed" in error_message.lower():
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Email address is not confirmed. Please complete verification from the confirmation email in your inbox.",
-            )
-        if "invalid login credentials" in error_message.lower():
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Email address or password is incorrect",
-            )
-        raise HTTPException(
+        raise _map_supabase_auth_error(e) or HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Login failed: {error_message}",
+            detail=f"Login failed: {str(e)}",
         )
 
 
@@ -673,12 +713,16 @@ async def login_customer(request: LoginRequest):
         client = get_supabase_client()
         admin_client = get_supabase_admin_client()
 
-        # Authenticate user
-        auth_response = client.auth.sign_in_with_password(
-            {
-                "email": request.email,
-                "password": request.password,
-            }
+        # Authenticate user; the profile is looked up in the meantime
+        auth_response, prefetched_profile = await asyncio.gather(
+            asyncio.to_thread(
+                client.auth.sign_in_with_password,
+                {
+                    "email": request.email,
+                    "password": request.password,
+                },
+            ),
+            _prefetch_login_profile(admin_client, "customer", request.email),
         )
 
         if auth_response.user is None or auth_response.session is None:
@@ -698,46 +742,31 @@ async def login_customer(request: LoginRequest):
                 detail="This account is not registered as a customer. Please log in from the customer login page.",
             )
 
-        # Fetch customer profile from database
-        profile_response = (
-            admin_client.table("customers").select("*").eq("id", user_id).execute()
+        # Get customer profile
+        customer_profile = await _get_login_profile(
+            admin_client, "customer", request.email, user_id, prefetched_profile
         )
 
-        if not profile_response.data:
+        if not customer_profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Customer profile not found",
             )
 
-        customer_profile = profile_response.data[0]
-
-        return AuthResponse(
-            access_token=auth_response.session.access_token,
-            user={
-                "id": user_id,
-                "email": auth_response.user.email,
-                "user_type": "customer",
-                "name": customer_profile.get("name", user_metadata.get("name", "")),
-            },
+        return _make_auth_response(
+            "customer",
+            user_id,
+            auth_response.user.email,
+            customer_profile.get("name", user_metadata.get("name", "")),
+            token=auth_response.session.access_token,
         )
 
     except HTTPException:
         raise
     except Exception as e:
-        error_message = str(e)
-        if "email not confirmed" in error_message.lower():
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Email address is not confirmed. Please complete verification from the confirmation email in your inbox.",
-            )
-        if "invalid login credentials" in error_message.lower():
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Email address or password is incorrect",
-            )
-        raise HTTPException(
+        raise _map_supabase_auth_error(e) or HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Login failed: {error_message}",
+            detail=f"Login failed: {str(e)}",
         )
 
 
@@ -752,12 +781,16 @@ async def login_corporate(request: LoginRequest):
         client = get_supabase_client()
         admin_client = get_supabase_admin_client()
 
-        # Authenticate user
-        auth_response = client.auth.sign_in_with_password(
-            {
-                "email": request.email,
-                "password": request.password,
-            }
+        # Authenticate user; the profile is looked up in the meantime
+        auth_response, prefetched_profile = await asyncio.gather(
+            asyncio.to_thread(
+                client.auth.sign_in_with_password,
+                {
+                    "email": request.email,
+                    "password": request.password,
+                },
+            ),
+            _prefetch_login_profile(admin_client, "corporate", request.email),
         )
 
         if auth_response.user is None or auth_response.session is None:
@@ -777,52 +810,37 @@ async def login_corporate(request: LoginRequest):
                 detail="This account is not registered as a corporate. Please log in from the corporate login page.",
             )
 
-        # Fetch corporate profile from database
-        profile_response = (
-            admin_client.table("corporates").select("*").eq("id", user_id).execute()
+        # Get corporate profile
+        corporate_profile = await _get_login_profile(
+            admin_client, "corporate", request.email, user_id, prefetched_profile
         )
 
-        if not profile_response.data:
+        if not corporate_profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Corporate profile not found",
             )
 
-        corporate_profile = profile_response.data[0]
-
-        return AuthResponse(
-            access_token=auth_response.session.access_token,
-            user={
-                "id": user_id,
-                "email": auth_response.user.email,
-                "user_type": "corporate",
-                "name": corporate_profile.get(
-                    "contact_name", user_metadata.get("name", "")
-                ),
+        return _make_auth_response(
+            "corporate",
+            user_id,
+            auth_response.user.email,
+            corporate_profile.get("contact_name", user_metadata.get("name", "")),
+            extras={
                 "company_name": corporate_profile.get(
                     "company_name", user_metadata.get("company_name", "")
                 ),
                 "status": corporate_profile.get("status", "pending"),
             },
+            token=auth_response.session.access_token,
         )
 
     except HTTPException:
         raise
     except Exception as e:
-        error_message = str(e)
-        if "email not confirmed" in error_message.lower():
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Email address is not confirmed. Please complete verification from the confirmation email in your inbox.",
-            )
-        if "invalid login credentials" in error_message.lower():
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Email address or password is incorrect",
-            )
-        raise HTTPException(
+        raise _map_supabase_auth_error(e) or HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Login failed: {error_message}",
+            detail=f"Login failed: {str(e)}",
         )
 
 
@@ -835,11 +853,12 @@ async def login(request: LoginRequest):
     """
     try:
         client = get_supabase_client()
-        response = client.auth.sign_in_with_password(
+        response = await asyncio.to_thread(
+            client.auth.sign_in_with_password,
             {
                 "email": request.email,
                 "password": request.password,
-            }
+            },
         )
 
         if response.user is None:
@@ -848,7 +867,7 @@ async def login(request: LoginRequest):
                 detail="Email address or password is incorrect",
             )
 
-        return AuthResponse(
+        return AuthResponse.model_construct(
             access_token=response.session.access_token if response.session else "",
             user={
                 "id": response.user.id,
@@ -858,13 +877,7 @@ async def login(request: LoginRequest):
         )
 
     except Exception as e:
-        error_message = str(e)
-        if "email not confirmed" in error_message.lower():
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Email address is not confirmed. Please complete verification from the confirmation email in your inbox.",
-            )
-        raise HTTPException(
+        raise _map_supabase_auth_error(e) or HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="メールアドレスまたはパスワードが正しくありません",
         )
@@ -882,11 +895,17 @@ async def logout(
     Note: Supabase handles token invalidation automatically when sign_out() is called.
     """
     try:
-        client = get_supabase_client()
+        admin_client = get_supabase_admin_client()
 
         # Sign out - this invalidates the session on Supabase side
-        # The token will become invalid for future requests
-        client.auth.sign_out()
+        # The token will become invalid for future requests. The session is
+        # identified by the request's token: the shared client's own session
+        # belongs to whoever signed in last.
+        if credentials:
+            get_token_cache().drop(credentials.credentials)
+            await asyncio.to_thread(
+                admin_client.auth.admin.sign_out, credentials.credentials, "local"
+            )
 
         return {
             "message": "Logged out successfully",
@@ -902,32 +921,75 @@ async def logout(
 
 
 # Password Reset Models
-class ForgotPasswordRequest(BaseModel):
-    email: EmailStr
+class ForgotPasswordRequest(AuthRequest):
+    email: AuthEmail
 
 
-class ResetPasswordRequest(BaseModel):
-    token: str = Field(..., description="Password reset token from email")
+class ResetPasswordRequest(AuthRequest):
+    token: str = Field(..., max_length=MAX_TOKEN_LENGTH, description="Password reset token from email")
     password: str = Field(
-        ..., min_length=8, description="New password (minimum 8 characters)"
+        ...,
+        min_length=8,
+        max_length=MAX_PASSWORD_LENGTH,
+        description="New password (minimum 8 characters)",
     )
 
 
-class ChangePasswordRequest(BaseModel):
+class ChangePasswordRequest(AuthRequest):
     current_password: str = Field(..., description="Current password")
     new_password: str = Field(
-        ..., min_length=8, description="New password (minimum 8 characters)"
+        ...,
+        min_length=8,
+        max_length=MAX_PASSWORD_LENGTH,
+        description="New password (minimum 8 characters)",
     )
 
 
+# Emails sent by forgot-password and resend-verification, per recipient and
+# per client IP, so floods are rejected before they reach Supabase
+EMAIL_SEND_LIMIT_PER_EMAIL = 2
+EMAIL_SEND_LIMIT_PER_IP = 10
+EMAIL_SEND_WINDOW_SECONDS = 3600
+EMAIL_RATE_LIMIT_MESSAGE = "Email sending limit reached. You can send up to 2 emails per hour. Please wait a while before trying again."
+
+
+async def _check_email_rate_limit(email: str, http_request: Request) -> None:
+    """
+    Count an auth email request against the per-email and per-IP limits
+
+    Raises:
+        HTTPException: 429 if a limit is exceeded
+    """
+    email_hash = hashlib.sha256(email.encode()).hexdigest()
+    # The real client behind the load balancer: uvicorn rewrites the client
+    # from X-Forwarded-For of trusted proxies (see FORWARDED_ALLOW_IPS in the
+    # Dockerfile)
+    client_ip = http_request.client.host if http_request.client else "unknown"
+    allowed = await get_rate_limiter().allow([
+        (f"ratelimit:auth-email:email:{email_hash}", EMAIL_SEND_LIMIT_PER_EMAIL, EMAIL_SEND_WINDOW_SECONDS),
+        (f"ratelimit:auth-email:ip:{client_ip}", EMAIL_SEND_LIMIT_PER_IP, EMAIL_SEND_WINDOW_SECONDS),
+    ])
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=EMAIL_RATE_LIMIT_MESSAGE,
+        )
+
+
+# Options of the password reset emails (read-only, shared by all requests)
+RESET_PASSWORD_OPTIONS = {"redirect_to": settings.FRONTEND_URL or "http://localhost:3000"}
+
+
 @router.post("/forgot-password")
-async def forgot_password(request: ForgotPasswordRequest):
+async def forgot_password(request: ForgotPasswordRequest, http_request: Request):
     """
     Send password reset email
 
     Sends a password reset email to the user's email address.
     The email contains a link with a token to reset the password.
     """
+    await _check_email_rate_limit(request.email, http_request)
+
     try:
         client = get_supabase_client()
 
@@ -935,9 +997,10 @@ async def forgot_password(request: ForgotPasswordRequest):
         # Note: Supabase doesn't return an error if email doesn't exist (security best practice)
         # redirect_to should be base URL - Supabase will append #access_token=...&type=recovery
         # Then SupabaseAuthRedirectHandler will intercept and navigate to /reset-password
-        response = client.auth.reset_password_for_email(
+        response = await asyncio.to_thread(
+            client.auth.reset_password_for_email,
             request.email,
-            {"redirect_to": settings.FRONTEND_URL or "http://localhost:3000"},
+            RESET_PASSWORD_OPTIONS,
         )
 
         # Always return success message (don't reveal if email exists)
@@ -947,14 +1010,8 @@ async def forgot_password(request: ForgotPasswordRequest):
         }
 
     except Exception as e:
-        error_message = str(e).lower()
-
         # Check for rate limit errors
-        if (
-            "rate limit" in error_message
-            or "too many requests" in error_message
-            or "email_sent" in error_message
-        ):
+        if _auth_error_code(e) in RATE_LIMIT_CODES or "email_sent" in str(e).lower():
             # Rate limit hit - Supabase free tier allows only 2 emails per hour
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -983,8 +1040,6 @@ async def reset_password(request: ResetPasswordRequest):
     For API-based reset, we verify the token and update password using admin API.
     """
     try:
-        from app.core.supabase import get_supabase_admin_client
-
         admin_client = get_supabase_admin_client()
 
         # Verify token by attempting to exchange it for a session
@@ -1012,6 +1067,40 @@ async def reset_password(request: ResetPasswordRequest):
         )
 
 
+async def _verify_current_password(email: str, password: str) -> None:
+    """
+    Verify a user's current password by signing in with it
+
+    Args:
+        email: Email address of the user
+        password: Password to check
+
+    Raises:
+        HTTPException: 401 if the password is incorrect
+    """
+    try:
+        verify_response = await asyncio.to_thread(
+            get_supabase_client().auth.sign_in_with_password,
+            {
+                "email": email,
+                "password": password,
+            },
+        )
+    except Exception as e:
+        if _auth_error_code(e) == INVALID_CREDENTIALS:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Current password is incorrect",
+            )
+        raise
+
+    if verify_response.user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Current password is incorrect",
+        )
+
+
 @router.post("/change-password")
 async def change_password(
     request: ChangePasswordRequest,
@@ -1025,56 +1114,23 @@ async def change_password(
     User must provide current password and new password.
     """
     try:
-        from app.core.supabase import get_supabase_client, get_supabase_admin_client
-
-        client = get_supabase_client()
-
-        # Verify current password by attempting to sign in
-        try:
-            verify_response = client.auth.sign_in_with_password(
-                {
-                    "email": current_user.email,
-                    "password": request.current_password,
-                }
-            )
-
-            if verify_response.user is None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Current password is incorrect",
-                )
-        except Exception as e:
-            error_msg = str(e)
-            if "invalid" in error_msg.lower() or "credentials" in error_msg.lower():
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Current password is incorrect",
-                )
-            raise
-
-        # Update password using the verified session
-        # Set the verified session and update password
-        if verify_response.session:
-            client.auth.set_session(
-                {
-                    "access_token": verify_response.session.access_token,
-                    "refresh_token": verify_response.session.refresh_token,
-                }
-            )
-
-            update_response = client.auth.update_user(
-                {"password": request.new_password}
-            )
+        # A bearer token alone must not be enough to take over the account,
+        # so the current password is always verified by signing in with it
+        await _verify_current_password(current_user.email, request.current_password)
+
+        # Update password of the verified user. The admin API is used
+        # rather than set_session + update_user: the client is shared with
+        # concurrent logins, so its current session may belong to another user
+        update_response = await asyncio.to_thread(
+            get_supabase_admin_client().auth.admin.update_user_by_id,
+            current_user.id,
+            {"password": request.new_password},
+        )
 
-            if not update_response.user:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Failed to update password",
-                )
-        else:
+        if not update_response.user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to get session",
+                detail="Failed to update password",
             )
 
         return {
@@ -1093,12 +1149,12 @@ async def change_password(
 
 
 # Email Verification Models
-class VerifyEmailRequest(BaseModel):
-    token: str = Field(..., description="Email verification token from email link")
+class VerifyEmailRequest(AuthRequest):
+    token: str = Field(..., max_length=MAX_TOKEN_LENGTH, description="Email verification token from email link")
 
 
-class ResendVerificationRequest(BaseModel):
-    email: EmailStr
+class ResendVerificationRequest(AuthRequest):
+    email: AuthEmail
 
 
 @router.post("/verify-email")
@@ -1110,9 +1166,6 @@ async def verify_email(request: VerifyEmailRequest):
     This endpoint allows API-based verification if needed.
     """
     try:
-        client = get_supabase_client()
-        admin_client = get_supabase_admin_client()
-
         # Supabase email verification tokens are typically handled via redirect
         # For API-based verification, we need to extract user info from token
         # or use the admin API to verify the email
@@ -1141,19 +1194,20 @@ async def verify_email(request: VerifyEmailRequest):
 
 
 @router.post("/resend-verification")
-async def resend_verification_email(request: ResendVerificationRequest):
+async def resend_verification_email(request: ResendVerificationRequest, http_request: Request):
     """
     Resend email verification email
 
     Sends a new verification email to the user's email address.
     """
+    await _check_email_rate_limit(request.email, http_request)
+
     try:
-        client = get_supabase_client()
         admin_client = get_supabase_admin_client()
 
         # Check if user exists
         try:
-            user_response = admin_client.auth.admin.get_user_by_email(request.email)
+            user_response = await asyncio.to_thread(admin_client.auth.admin.get_user_by_email, request.email)
             if not user_response.user:
                 # User doesn't exist, but don't reveal this (security best practice)
                 return {
@@ -1173,11 +1227,12 @@ async def resend_verification_email(request: ResendVerificationRequest):
             # Resend verification email using admin API
             # Supabase admin API can resend verification emails
             try:
-                admin_client.auth.admin.generate_link(
+                await asyncio.to_thread(
+                    admin_client.auth.admin.generate_link,
                     {
                         "type": "signup",
                         "email": request.email,
-                    }
+                    },
                 )
 
                 # Note: generate_link doesn't send email, it just generates a link
@@ -1193,14 +1248,15 @@ async def resend_verification_email(request: ResendVerificationRequest):
                 }
 
             except Exception as e:
-                error_msg = str(e).lower()
-                if "rate limit" in error_msg or "too many requests" in error_msg:
+                if _auth_error_code(e) in RATE_LIMIT_CODES:
                     raise HTTPException(
                         status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                         detail="Email sending limit reached. You can send up to 2 emails per hour. Please wait a while before trying again.",
                     )
                 raise
 
+        except HTTPException:
+            raise
         except Exception as e:
             # If user lookup fails, still return success (security best practice)
             pass
@@ -1214,9 +1270,7 @@ async def resend_verification_email(request: ResendVerificationRequest):
     except HTTPException:
         raise
     except Exception as e:
-        error_message = str(e).lower()
-
-        if "rate limit" in error_message or "too many requests" in error_message:
+        if _auth_error_code(e) in RATE_LIMIT_CODES:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail="Email sending limit reached. You can send up to 2 emails per hour. Please wait a while before trying again.",
@@ -1229,6 +1283,30 @@ async def resend_verification_email(request: ResendVerificationRequest):
         }
 
 
+# Admin lookups of auth users in progress, keyed by user ID (see _get_auth_user)
+_auth_user_lookups: SingleFlight[str, Any] = SingleFlight()
+
+
+async def _get_auth_user(user_id: str):
+    """
+    Get an auth user from the admin API
+
+    Concurrent lookups of the same user (e.g. several tabs polling the
+    verification status) share one admin API call.
+
+    Args:
+        user_id: Auth user ID
+
+    Returns:
+        UserResponse of the admin API
+    """
+    admin_client = get_supabase_admin_client()
+    return await _auth_user_lookups.run(
+        user_id,
+        lambda: asyncio.to_thread(admin_client.auth.admin.get_user_by_id, user_id),
+    )
+
+
 @router.get("/verification-status")
 async def get_verification_status(
     credentials=Security(security),
@@ -1240,11 +1318,17 @@ async def get_verification_status(
     Returns whether the user's email is verified.
     """
     try:
-        client = get_supabase_client()
-        admin_client = get_supabase_admin_client()
+        # Confirmation never goes back, so a confirmation seen while
+        # authenticating the request is final
+        if current_user.email_confirmed_at is not None:
+            return {
+                "email": current_user.email,
+                "email_verified": True,
+                "email_confirmed_at": current_user.email_confirmed_at,
+            }
 
         # Get user from admin API to check verification status
-        user_response = admin_client.auth.admin.get_user_by_id(current_user.id)
+        user_response = await _get_auth_user(current_user.id)
 
         if not user_response.user:
             raise HTTPException(
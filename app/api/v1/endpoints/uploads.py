@@ -4,21 +4,27 @@ File upload endpoints
 Handles file uploads for artworks, profiles, spaces, and documents.
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, status, Depends, Form, Security
+import asyncio
+import hashlib
+
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request, Response, status, Depends, Form, Security
 from app.core.dependencies import security
 from pydantic import BaseModel
 from typing import Optional, List
 
-from app.core.storage import get_storage_service, StorageService
-from app.core.dependencies import get_current_user, CurrentUser
-from app.core.image_processing import (
-    get_image_processing_service,
-    ImageProcessingService,
-    ImageSize,
-)
+from app.core.storage import BytesIOUploadFile, StorageService
+from app.core.dependencies import get_current_user, CurrentUser, storage_service_dep, image_service_dep
+from app.core.image_processing import ImageProcessingService, ImageSize
+from app.core.signed_url_cache import get_signed_url_cache
 
 router = APIRouter()
 
+# Files of one multi-file upload sent to storage at the same time
+MAX_CONCURRENT_UPLOADS = 8
+
+# Image sizes by name accepted in generate_sizes
+IMAGE_SIZES = {size.value: size for size in ImageSize}
+
 
 class UploadResponse(BaseModel):
     """Response model for file upload"""
@@ -53,6 +59,7 @@ async def upload_file(
     subfolder: Optional[str] = Form(default=None, description="Optional subfolder (e.g., artwork_id, space_id)"),
     credentials = Security(security),
     current_user: CurrentUser = Depends(get_current_user),
+    storage_service: StorageService = Depends(storage_service_dep),
 ):
     """
     Upload a file to Supabase Storage
@@ -65,8 +72,6 @@ async def upload_file(
     - spaces: Space photos (10MB max, JPEG/PNG/WebP)
     - documents: Private documents (10MB max, PDF/JPEG/PNG)
     """
-    storage_service = get_storage_service()
-    
     try:
         result = await storage_service.upload_file(
             file=file,
@@ -93,27 +98,35 @@ async def upload_multiple_files(
     subfolder: Optional[str] = Form(default=None, description="Optional subfolder"),
     credentials = Security(security),
     current_user: CurrentUser = Depends(get_current_user),
+    storage_service: StorageService = Depends(storage_service_dep),
 ):
     """
     Upload multiple files to Supabase Storage
     
     Requires authentication. All files are uploaded to the same bucket and subfolder.
     """
-    storage_service = get_storage_service()
-    results = []
-    errors = []
+    # Upload the files concurrently, a few at a time so one request does not
+    # take over the storage connection pool and worker threads
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
     
-    for file in files:
-        try:
-            result = await storage_service.upload_file(
+    async def upload(file: UploadFile) -> dict:
+        async with semaphore:
+            return await storage_service.upload_file(
                 file=file,
                 bucket=bucket,
                 user_id=current_user.id,
                 subfolder=subfolder,
             )
-            results.append(UploadResponse(**result))
-        except Exception as e:
-            errors.append(f"{file.filename}: {str(e)}")
+    
+    outcomes = await asyncio.gather(*(upload(file) for file in files), return_exceptions=True)
+    
+    results = []
+    errors = []
+    for file, outcome in zip(files, outcomes):
+        if isinstance(outcome, Exception):
+            errors.append(f"{file.filename}: {str(outcome)}")
+        else:
+            results.append(UploadResponse(**outcome))
     
     if errors and not results:
         # All uploads failed
@@ -136,6 +149,7 @@ async def delete_file(
     file_path: str,
     credentials = Security(security),
     current_user: CurrentUser = Depends(get_current_user),
+    storage_service: StorageService = Depends(storage_service_dep),
 ):
     """
     Delete a file from Supabase Storage
@@ -143,10 +157,10 @@ async def delete_file(
     Requires authentication. Users can only delete their own files.
     File path should be URL-encoded if it contains special characters.
     """
-    storage_service = get_storage_service()
-    
-    # Security check: ensure user can only delete their own files
-    if not file_path.startswith(current_user.id):
+    # Security check: ensure user can only delete their own files. Files
+    # live under "{user_id}/", so the separator is part of the prefix (user
+    # "abc" must not match the files of user "abcd")
+    if not file_path.startswith(f"{current_user.id}/") or ".." in file_path.split("/"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only delete your own files",
@@ -168,30 +182,57 @@ async def delete_file(
         )
 
 
+def file_url_etag(url: str) -> str:
+    """ETag of a file URL response (changes whenever the URL does)"""
+    return f'"{hashlib.sha1(url.encode()).hexdigest()[:16]}"'
+
+
 @router.get("/url/{bucket}/{file_path:path}")
 async def get_file_url(
     bucket: str,
     file_path: str,
+    request: Request,
+    response: Response,
     signed: bool = False,
     expires_in: int = 3600,
     credentials = Security(security),
     current_user: CurrentUser = Depends(get_current_user),
+    storage_service: StorageService = Depends(storage_service_dep),
 ):
     """
     Get file URL (public or signed)
     
     For private buckets (documents), signed URLs are required.
+    Signed URLs are reused while they stay valid for at least a minute, and
+    the response answers 304 Not Modified when If-None-Match matches its ETag.
     """
-    storage_service = get_storage_service()
-    
     try:
-        url = storage_service.get_file_url(
-            bucket=bucket,
-            file_path=file_path,
-            signed=signed or bucket == "documents",
-            expires_in=expires_in,
-        )
+        signed = signed or bucket == "documents"
+        if signed:
+            url_cache = get_signed_url_cache()
+            cache_key = (bucket, file_path, expires_in)
+            cached = url_cache.get(cache_key)
+            if cached is not None:
+                url, etag = cached
+            else:
+                url = await asyncio.to_thread(
+                    storage_service.get_file_url,
+                    bucket=bucket,
+                    file_path=file_path,
+                    signed=True,
+                    expires_in=expires_in,
+                )
+                etag = file_url_etag(url)
+                if url:
+                    url_cache.put(cache_key, url, etag)
+        else:
+            url = storage_service.get_file_url(bucket=bucket, file_path=file_path)
+            etag = file_url_etag(url)
         
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        
+        response.headers["ETag"] = etag
         return {"url": url, "bucket": bucket, "path": file_path}
     except Exception as e:
         raise HTTPException(
@@ -216,6 +257,8 @@ async def upload_processed_image(
     convert_heic: bool = Form(default=True, description="Convert HEIC to JPEG"),
     credentials = Security(security),
     current_user: CurrentUser = Depends(get_current_user),
+    storage_service: StorageService = Depends(storage_service_dep),
+    image_service: ImageProcessingService = Depends(image_service_dep),
 ):
     """
     Upload and process image: resize, optimize, convert HEIC, extract metadata
@@ -231,22 +274,10 @@ async def upload_processed_image(
     
     Requires authentication.
     """
-    storage_service = get_storage_service()
-    image_service = get_image_processing_service()
-    
     try:
-        # Parse sizes
+        # Parse sizes (unknown names are ignored)
         size_names = [s.strip().lower() for s in generate_sizes.split(",")]
-        sizes = []
-        for name in size_names:
-            if name == "thumbnail":
-                sizes.append(ImageSize.THUMBNAIL)
-            elif name == "medium":
-                sizes.append(ImageSize.MEDIUM)
-            elif name == "large":
-                sizes.append(ImageSize.LARGE)
-            elif name == "original":
-                sizes.append(ImageSize.ORIGINAL)
+        sizes = [IMAGE_SIZES[name] for name in size_names if name in IMAGE_SIZES]
         
         if not sizes:
             sizes = [ImageSize.THUMBNAIL, ImageSize.MEDIUM, ImageSize.LARGE]
@@ -259,47 +290,33 @@ async def upload_processed_image(
             convert_heic=convert_heic,
         )
         
-        # Upload each size to storage
-        uploaded_images = {}
-        for size_name, size_data in processed["images"].items():
+        # Name each size after the original file
+        original_filename = file.filename or "image.jpg"
+        name, ext = original_filename.rsplit(".", 1) if "." in original_filename else (original_filename, "jpg")
+        size_items = list(processed["images"].items())
+        temp_files = []
+        for size_name, size_data in size_items:
             # Reset BytesIO to beginning
             size_data["data"].seek(0)
-            
-            # Create filename with size suffix
-            original_filename = file.filename or "image.jpg"
-            name, ext = original_filename.rsplit(".", 1) if "." in original_filename else (original_filename, "jpg")
-            size_filename = f"{name}_{size_name}.{ext}"
-            
-            # Create temporary UploadFile-like object for storage service
-            class BytesIOUploadFile:
-                """Wrapper to make BytesIO work like UploadFile"""
-                def __init__(self, bytes_io, filename, content_type="image/jpeg"):
-                    self.bytes_io = bytes_io
-                    self.filename = filename
-                    self.content_type = content_type
-                    self.file = bytes_io  # Storage service may access .file attribute
-                
-                async def read(self):
-                    return self.bytes_io.read()
-                
-                def seek(self, position):
-                    return self.bytes_io.seek(position)
-            
-            temp_file = BytesIOUploadFile(
+            temp_files.append(BytesIOUploadFile(
                 size_data["data"],
-                size_filename,
+                f"{name}_{size_name}.{ext}",
                 content_type=f"image/{size_data['format'].lower()}",
-            )
-            
-            # Upload to storage
-            upload_result = await storage_service.upload_file(
+            ))
+        
+        # Upload all sizes to storage concurrently
+        upload_results = await asyncio.gather(*(
+            storage_service.upload_file(
                 file=temp_file,
                 bucket=bucket,
                 user_id=current_user.id,
                 subfolder=subfolder,
             )
-            
-            uploaded_images[size_name] = {
+            for temp_file in temp_files
+        ))
+        
+        uploaded_images = {
+            size_name: {
                 "path": upload_result["path"],
                 "url": upload_result["url"],
                 "width": size_data["width"],
@@ -307,6 +324,8 @@ async def upload_processed_image(
                 "format": size_data["format"],
                 "size_bytes": size_data["size_bytes"],
             }
+            for (size_name, size_data), upload_result in zip(size_items, upload_results)
+        }
         
         return ProcessedImageUploadResponse(
             success=True,
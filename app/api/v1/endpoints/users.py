@@ -2,15 +2,23 @@
 User management endpoints
 """
 
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Form, Request, Security
+import asyncio
+import hashlib
+import logging
+
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Form, Request, Response, Security
 from app.core.dependencies import security
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel
 from typing import Optional
-from app.core.dependencies import get_current_user, CurrentUser
-from app.core.storage import get_storage_service
-from app.core.image_processing import get_image_processing_service
+from app.core.dependencies import get_current_user, CurrentUser, PROFILE_TABLES
+from app.core.storage import BytesIOUploadFile, get_storage_service
+from app.core.image_processing import ImageSize, get_image_processing_service
+from app.core.profile_cache import get_profile_cache
+from app.core.supabase import get_supabase_admin_client
+from app.core.token_cache import get_token_cache
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 class UserProfile(BaseModel):
@@ -38,6 +46,116 @@ class UpdateProfileRequest(BaseModel):
     company_name: Optional[str] = None  # For corporates
 
 
+def _profile_table(user_type: str) -> str:
+    """
+    Profile table of a user type
+    
+    Args:
+        user_type: User type (artist, customer, corporate)
+        
+    Returns:
+        Table name
+        
+    Raises:
+        HTTPException: 400 if the user type has no profile table
+    """
+    table_name = PROFILE_TABLES.get(user_type)
+    if table_name is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid user type",
+        )
+    return table_name
+
+async def _update_profile(current_user: CurrentUser, updates: dict) -> dict:
+    """
+    Update the profile row of a user
+    
+    Sets updated_at and drops the user's cached profile and tokens.
+    
+    Args:
+        current_user: Authenticated user
+        updates: Columns to update
+        
+    Returns:
+        Updated profile row
+        
+    Raises:
+        HTTPException: 400 for an invalid user type, 404 if the user has no profile
+    """
+    table_name = _profile_table(current_user.user_type)
+    admin_client = get_supabase_admin_client()
+    response = await asyncio.to_thread(
+        admin_client.table(table_name)
+        .update({**updates, "updated_at": "now()"})
+        .eq("id", current_user.id)
+        .execute
+    )
+    get_profile_cache().drop(current_user.email)
+    get_token_cache().drop_user(current_user.id)
+    
+    if not response.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found",
+        )
+    return response.data[0]
+
+def _build_user_profile(
+    current_user: CurrentUser,
+    profile: dict,
+    image_url: Optional[str] = None,
+) -> UserProfile:
+    """
+    Build the profile response of a user
+
+    The values come from the user's profile row, so the model is constructed
+    without validation (FastAPI does not re-validate a returned instance of
+    the response model).
+
+    Args:
+        current_user: Authenticated user
+        profile: Profile row of the user
+        image_url: Profile image URL overriding the row's
+
+    Returns:
+        UserProfile of the user
+    """
+    return UserProfile.model_construct(
+        id=current_user.id,
+        email=current_user.email,
+        name=profile.get("name") or profile.get("contact_name", ""),
+        user_type=current_user.user_type,
+        created_at=profile.get("created_at"),
+        status=profile.get("status"),
+        # Only corporate users have a company
+        company_name=profile.get("company_name") if current_user.user_type == "corporate" else None,
+        profile_image_url=image_url or profile.get("profile_image_url"),
+        profile_completion=calculate_profile_completion(profile, current_user.user_type),
+    )
+
+# Browsers keep /users/me for the signed-in user only, and revalidate it
+# with its ETag on every use
+USER_PROFILE_CACHE_CONTROL = "private, no-cache"
+
+
+def user_profile_etag(current_user: CurrentUser) -> Optional[str]:
+    """
+    Weak ETag of a user's profile response
+    
+    updated_at changes on every write to the profile row; the user ID and
+    email cover the fields that do not come from the row.
+    
+    Returns:
+        ETag, or None if the profile has no updated_at (e.g. no profile row)
+    """
+    updated_at = current_user.profile.get("updated_at")
+    if not updated_at:
+        return None
+    version = f"{current_user.id}:{current_user.email}:{current_user.user_type}:{updated_at}"
+    return f'W/"{hashlib.blake2b(version.encode(), digest_size=16).hexdigest()}"'
+
+
 @router.get(
     "/me",
     response_model=UserProfile,
@@ -45,6 +163,7 @@ class UpdateProfileRequest(BaseModel):
 )
 async def get_current_user_profile(
     request: Request,
+    response: Response,
     credentials = Security(security),
     current_user: CurrentUser = Depends(get_current_user)
 ):
@@ -53,43 +172,19 @@ async def get_current_user_profile(
     
     Requires authentication via JWT token.
     Includes profile completion percentage and profile image URL.
+    Answers 304 Not Modified when If-None-Match matches the profile's ETag.
     """
-    # Debug: Log request headers and authentication
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    logger.info("=" * 50)
-    logger.info("DEBUG: /users/me endpoint called")
-    logger.info(f"DEBUG: Authorization header: {request.headers.get('authorization', 'NOT FOUND')}")
-    logger.info(f"DEBUG: All headers: {dict(request.headers)}")
-    logger.info(f"DEBUG: User authenticated: {current_user.id}, type: {current_user.user_type}")
-    logger.info("=" * 50)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("/users/me called by user %s (type: %s)", current_user.id, current_user.user_type)
     
-    profile = current_user.profile
+    etag = user_profile_etag(current_user)
+    if etag is not None:
+        headers = {"ETag": etag, "Cache-Control": USER_PROFILE_CACHE_CONTROL}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
     
-    # Extract name based on user type
-    name = profile.get("name") or profile.get("contact_name", "")
-    
-    # Calculate profile completion
-    completion = calculate_profile_completion(profile, current_user.user_type)
-    
-    # Extract additional fields based on user type
-    user_profile = UserProfile(
-        id=current_user.id,
-        email=current_user.email,
-        name=name,
-        user_type=current_user.user_type,
-        created_at=profile.get("created_at"),
-        status=profile.get("status"),
-        profile_image_url=profile.get("profile_image_url"),
-        profile_completion=completion,
-    )
-    
-    # Add company_name for corporate users
-    if current_user.user_type == "corporate":
-        user_profile.company_name = profile.get("company_name")
-    
-    return user_profile
+    return _build_user_profile(current_user, current_user.profile)
 
 
 @router.put("/me", response_model=UserProfile)
@@ -105,9 +200,6 @@ async def update_user_profile(
     Only updates fields that are provided.
     Supports role-specific fields.
     """
-    from app.core.supabase import get_supabase_admin_client
-    
-    admin_client = get_supabase_admin_client()
     updates = {}
     
     # Common fields
@@ -144,52 +236,7 @@ async def update_user_profile(
         )
     
     # Update profile in appropriate table
-    table_name = None
-    if current_user.user_type == "artist":
-        table_name = "artists"
-    elif current_user.user_type == "customer":
-        table_name = "customers"
-    elif current_user.user_type == "corporate":
-        table_name = "corporates"
-    
-    if table_name:
-        updates["updated_at"] = "now()"
-        response = admin_client.table(table_name).update(updates).eq("id", current_user.id).execute()
-        
-        if not response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Profile not found",
-            )
-        
-        updated_profile = response.data[0]
-        
-        # Calculate profile completion
-        completion = calculate_profile_completion(updated_profile, current_user.user_type)
-        
-        # Return updated profile
-        display_name = updated_profile.get("name") or updated_profile.get("contact_name", "")
-        
-        user_profile = UserProfile(
-            id=current_user.id,
-            email=current_user.email,
-            name=display_name,
-            user_type=current_user.user_type,
-            created_at=updated_profile.get("created_at"),
-            status=updated_profile.get("status"),
-            profile_image_url=updated_profile.get("profile_image_url"),
-            profile_completion=completion,
-        )
-        
-        if current_user.user_type == "corporate":
-            user_profile.company_name = updated_profile.get("company_name")
-        
-        return user_profile
-    
-    raise HTTPException(
-        status_code=status.HTTP_400_BAD_REQUEST,
-        detail="Invalid user type",
-    )
+    return _build_user_profile(current_user, await _update_profile(current_user, updates))
 
 
 @router.post("/me/profile-image", response_model=UserProfile)
@@ -203,17 +250,17 @@ async def upload_profile_image(
     
     Requires authentication. Image will be processed and optimized.
     """
-    from app.core.supabase import get_supabase_admin_client
-    
     storage_service = get_storage_service()
     image_service = get_image_processing_service()
     
     try:
+        # Fail before processing the image if the user has no profile
+        _profile_table(current_user.user_type)
+        
         # Validate image
         validation = image_service.validate_image(file)
         
         # Process image (resize to medium size for profile)
-        from app.core.image_processing import ImageSize
         processed = await image_service.process_and_save_image(
             file=file,
             output_format="JPEG",
@@ -223,21 +270,6 @@ async def upload_profile_image(
         
         # Upload processed image
         medium_image = processed["images"]["medium"]
-        medium_image["data"].seek(0)
-        
-        # Create UploadFile-like object
-        class BytesIOUploadFile:
-            def __init__(self, bytes_io, filename, content_type="image/jpeg"):
-                self.bytes_io = bytes_io
-                self.filename = filename
-                self.content_type = content_type
-                self.file = bytes_io
-            
-            async def read(self):
-                return self.bytes_io.read()
-            
-            def seek(self, position):
-                return self.bytes_io.seek(position)
         
         original_filename = file.filename or "profile.jpg"
         name, ext = original_filename.rsplit(".", 1) if "." in original_filename else (original_filename, "jpg")
@@ -258,52 +290,8 @@ async def upload_profile_image(
         )
         
         # Update profile with image URL
-        admin_client = get_supabase_admin_client()
-        table_name = None
-        if current_user.user_type == "artist":
-            table_name = "artists"
-        elif current_user.user_type == "customer":
-            table_name = "customers"
-        elif current_user.user_type == "corporate":
-            table_name = "corporates"
-        
-        if table_name:
-            response = admin_client.table(table_name).update({
-                "profile_image_url": upload_result["url"],
-                "updated_at": "now()",
-            }).eq("id", current_user.id).execute()
-            
-            if not response.data:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Profile not found",
-                )
-            
-            updated_profile = response.data[0]
-            completion = calculate_profile_completion(updated_profile, current_user.user_type)
-            
-            display_name = updated_profile.get("name") or updated_profile.get("contact_name", "")
-            
-            user_profile = UserProfile(
-                id=current_user.id,
-                email=current_user.email,
-                name=display_name,
-                user_type=current_user.user_type,
-                created_at=updated_profile.get("created_at"),
-                status=updated_profile.get("status"),
-                profile_image_url=upload_result["url"],
-                profile_completion=completion,
-            )
-            
-            if current_user.user_type == "corporate":
-                user_profile.company_name = updated_profile.get("company_name")
-            
-            return user_profile
-        
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid user type",
-        )
+        updated_profile = await _update_profile(current_user, {"profile_image_url": upload_result["url"]})
+        return _build_user_profile(current_user, updated_profile, image_url=upload_result["url"])
         
     except HTTPException:
         raise
@@ -325,45 +313,20 @@ async def deactivate_account(
     Sets account status to 'suspended' but keeps data for potential reactivation.
     User cannot login but data is preserved.
     """
-    from app.core.supabase import get_supabase_admin_client
-    
-    admin_client = get_supabase_admin_client()
-    
-    # Determine table name
-    table_name = None
-    if current_user.user_type == "artist":
-        table_name = "artists"
-    elif current_user.user_type == "customer":
-        table_name = "customers"
-    elif current_user.user_type == "corporate":
-        table_name = "corporates"
-    
-    if not table_name:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid user type",
-        )
-    
     try:
         # Update status to suspended
-        response = admin_client.table(table_name).update({
-            "status": "suspended",
-            "updated_at": "now()",
-        }).eq("id", current_user.id).execute()
-        
-        if not response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Profile not found",
-            )
+        await _update_profile(current_user, {"status": "suspended"})
         
-        # Sign out the user
-        from app.core.supabase import get_supabase_client
-        client = get_supabase_client()
-        try:
-            client.auth.sign_out()
-        except Exception:
-            pass  # Ignore sign out errors
+        # Sign out the user. The sessions are revoked with the request's
+        # token: the shared client's own session belongs to whoever signed
+        # in last
+        if credentials:
+            try:
+                await asyncio.to_thread(
+                    get_supabase_admin_client().auth.admin.sign_out, credentials.credentials, "global"
+                )
+            except Exception:
+                pass  # Ignore sign out errors
         
         return {
             "message": "Account deactivated",
@@ -396,24 +359,10 @@ async def delete_account(
     
     For GDPR compliance, this performs a complete data deletion.
     """
-    from app.core.supabase import get_supabase_admin_client
-    
     admin_client = get_supabase_admin_client()
     
     # Determine table name
-    table_name = None
-    if current_user.user_type == "artist":
-        table_name = "artists"
-    elif current_user.user_type == "customer":
-        table_name = "customers"
-    elif current_user.user_type == "corporate":
-        table_name = "corporates"
-    
-    if not table_name:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid user type",
-        )
+    table_name = _profile_table(current_user.user_type)
     
     try:
         # Note: Due to foreign key constraints, we may need to handle related data
@@ -426,22 +375,24 @@ async def delete_account(
         # 5. Delete auth user (via admin API)
         
         # Delete profile (CASCADE will handle related data if configured)
-        response = admin_client.table(table_name).delete().eq("id", current_user.id).execute()
-        
-        # Delete auth user
-        try:
-            admin_client.auth.admin.delete_user(current_user.id)
-        except Exception as e:
-            # Log error but continue
-            print(f"Warning: Failed to delete auth user: {str(e)}")
+        response = await asyncio.to_thread(
+            admin_client.table(table_name).delete().eq("id", current_user.id).execute
+        )
+        get_profile_cache().drop(current_user.email)
+        get_token_cache().drop_user(current_user.id)
         
-        # Sign out
-        from app.core.supabase import get_supabase_client
-        client = get_supabase_client()
-        try:
-            client.auth.sign_out()
-        except Exception:
-            pass
+        # Delete auth user and sign out at the same time. The sessions are
+        # revoked with the request's token: the shared client's own session
+        # belongs to whoever signed in last
+        cleanup = [asyncio.to_thread(admin_client.auth.admin.delete_user, current_user.id)]
+        if credentials:
+            cleanup.append(
+                asyncio.to_thread(admin_client.auth.admin.sign_out, credentials.credentials, "global")
+            )
+        results = await asyncio.gather(*cleanup, return_exceptions=True)
+        if isinstance(results[0], Exception):
+            # Log error but continue; sign out errors are ignored
+            logger.warning("Failed to delete auth user %s: %s", current_user.id, results[0])
         
         return {
             "message": "Account permanently deleted",
@@ -457,6 +408,24 @@ async def delete_account(
         )
 
 
+# Fields counted by calculate_profile_completion, by user type
+REQUIRED_PROFILE_FIELDS = {
+    "artist": ("name", "email", "phone", "bio"),
+    "customer": ("name", "email", "phone", "address"),
+    "corporate": ("company_name", "contact_name", "email", "phone", "address"),
+}
+OPTIONAL_PROFILE_FIELDS = {
+    "artist": ("website", "instagram", "profile_image_url", "portfolio_url"),
+    "customer": ("postal_code", "profile_image_url"),
+    "corporate": ("postal_code", "profile_image_url"),
+}
+
+# Percentage points of one filled field: required fields share 70%,
+# optional fields 30%
+REQUIRED_FIELD_WEIGHTS = {user_type: 70 / len(fields) for user_type, fields in REQUIRED_PROFILE_FIELDS.items()}
+OPTIONAL_FIELD_WEIGHTS = {user_type: 30 / len(fields) for user_type, fields in OPTIONAL_PROFILE_FIELDS.items()}
+
+
 def calculate_profile_completion(profile: dict, user_type: str) -> int:
     """
     Calculate profile completion percentage (0-100)
@@ -468,32 +437,22 @@ def calculate_profile_completion(profile: dict, user_type: str) -> int:
     Returns:
         Completion percentage (0-100)
     """
-    required_fields = {
-        "artist": ["name", "email", "phone", "bio"],
-        "customer": ["name", "email", "phone", "address"],
-        "corporate": ["company_name", "contact_name", "email", "phone", "address"],
-    }
-    
-    optional_fields = {
-        "artist": ["website", "instagram", "profile_image_url", "portfolio_url"],
-        "customer": ["postal_code", "profile_image_url"],
-        "corporate": ["postal_code", "profile_image_url"],
-    }
-    
-    required = required_fields.get(user_type, [])
-    optional = optional_fields.get(user_type, [])
-    
-    # Count filled required fields
-    filled_required = sum(1 for field in required if profile.get(field))
-    
-    # Count filled optional fields
-    filled_optional = sum(1 for field in optional if profile.get(field))
-    
-    # Calculate completion
-    # Required fields: 70% weight
-    # Optional fields: 30% weight
-    required_score = (filled_required / len(required)) * 70 if required else 0
-    optional_score = (filled_optional / len(optional)) * 30 if optional else 0
-    
-    completion = int(required_score + optional_score)
-    return min(100, max(0, completion))
+    required = REQUIRED_PROFILE_FIELDS.get(user_type)
+    if required is None:
+        return 0
+    
+    # Count filled fields
+    filled_required = 0
+    for field in required:
+        if profile.get(field):
+            filled_required += 1
+    filled_optional = 0
+    for field in OPTIONAL_PROFILE_FIELDS[user_type]:
+        if profile.get(field):
+            filled_optional += 1
+    
+    completion = int(
+        filled_required * REQUIRED_FIELD_WEIGHTS[user_type]
+        + filled_optional * OPTIONAL_FIELD_WEIGHTS[user_type]
+    )
+    return min(100, completion)
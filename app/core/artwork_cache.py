@@ -0,0 +1,273 @@
+"""
+Artwork detail cache
+
+Two-level cache for serialized artwork detail responses:
+
+- Redis (shared by all workers) holds the entry at artwork:{id}; the artwork
+  endpoints write it and give it its TTL.
+- A small in-process TTL LRU in each worker sits in front of Redis, so hot
+  artworks are served without a network hop. Concurrent misses for the same
+  artwork share one Redis read (single-flight).
+
+Invalidation drops the entry from Redis and from the local cache, and is
+broadcast on a Redis pub/sub channel so sibling workers drop their local
+copy too; the short local TTL bounds staleness if a message is missed.
+
+Each invalidation also bumps the artwork's generation in Redis. Readers
+take the generation before loading an artwork from the database and
+store the entry only if it has not changed since (fill()), so a load that
+raced with a write cannot put the old artwork back into the cache.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.redis_client import get_redis
+from app.core.single_flight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+LOCAL_CACHE_SIZE = 10000
+# Generations only have to outlive the loads in flight when they are bumped
+GENERATION_TTL_SECONDS = 24 * 60 * 60
+LOCAL_CACHE_TTL_SECONDS = 60
+INVALIDATION_CHANNEL = "artwork-cache-invalidations"
+
+# Backoff while the invalidation listener cannot reach Redis
+LISTENER_RETRY_SECONDS = 1.0
+LISTENER_MAX_RETRY_SECONDS = 30.0
+
+
+def artwork_cache_key(artwork_id: str) -> str:
+    """Redis key of a cached artwork detail response"""
+    return f"artwork:{artwork_id}"
+
+
+def artwork_generation_key(artwork_id: str) -> str:
+    """Redis key of an artwork's invalidation counter"""
+    return f"artwork-generation:{artwork_id}"
+
+
+# KEYS: entry, generation; ARGV: expected generation, TTL, then field/value
+# pairs. Stores the entry only if no invalidation happened since the
+# generation was read; returns 1 if it was stored
+FILL_SCRIPT = """
+if tonumber(redis.call('GET', KEYS[2]) or '0') ~= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]))
+return 1
+"""
+
+
+class ArtworkCache:
+    """In-process TTL LRU in front of the Redis artwork cache"""
+
+    def __init__(self, maxsize: int = LOCAL_CACHE_SIZE, ttl: float = LOCAL_CACHE_TTL_SECONDS):
+        """
+        Initialize cache
+
+        Args:
+            maxsize: Maximum number of artworks kept in this worker
+            ttl: Seconds a local entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # artwork_id -> (expires_at, entry), in LRU order
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # In-flight loads, so concurrent misses share one load
+        self._loading: SingleFlight[str, Optional[Any]] = SingleFlight()
+        # Local drops so far; a load that overlapped one is not kept
+        self._drops = 0
+        self._listener: Optional[asyncio.Task] = None
+        self._fill_script = None
+        self._fill_script_client = None
+
+    def get_local(self, artwork_id: str) -> Optional[Any]:
+        """Return the local entry of an artwork if it has not expired"""
+        item = self._entries.get(artwork_id)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at <= time.monotonic():
+            del self._entries[artwork_id]
+            return None
+        self._entries.move_to_end(artwork_id)
+        return entry
+
+    def put_local(self, artwork_id: str, entry: Any) -> None:
+        """Store an entry in the local cache"""
+        self._entries[artwork_id] = (time.monotonic() + self.ttl, entry)
+        self._entries.move_to_end(artwork_id)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def drop_local(self, artwork_id: str) -> None:
+        """Remove an artwork from the local cache"""
+        self._drops += 1
+        self._entries.pop(artwork_id, None)
+
+    async def get_or_load(
+        self,
+        artwork_id: str,
+        loader: Callable[[], Awaitable[Optional[Any]]],
+    ) -> Optional[Any]:
+        """
+        Get an artwork's entry, loading it on a local miss
+
+        Only one load per artwork runs at a time; concurrent callers await
+        the same result. Empty results (None) are not cached locally.
+
+        Args:
+            artwork_id: Artwork ID
+            loader: Coroutine function returning the entry, or None
+
+        Returns:
+            The entry, or None if the loader found nothing
+        """
+        entry = self.get_local(artwork_id)
+        if entry is not None:
+            return entry
+
+        async def load() -> Optional[Any]:
+            drops = self._drops
+            entry = await loader()
+            # The entry may predate an invalidation received meanwhile
+            if entry is not None and self._drops == drops:
+                self.put_local(artwork_id, entry)
+            return entry
+
+        return await self._loading.run(artwork_id, load)
+
+    async def generation(self, artwork_id: str) -> Optional[int]:
+        """
+        Current generation of an artwork, to pass to fill()
+
+        Returns:
+            The generation, or None if Redis is unavailable (nothing is
+            cached then)
+        """
+        try:
+            return int(await get_redis().get(artwork_generation_key(artwork_id)) or 0)
+        except Exception as e:
+            logger.warning(f"Failed to read cache generation of artwork {artwork_id}: {e}")
+            return None
+
+    async def fill(self, artwork_id: str, generation: Optional[int], entry: Dict[str, Any], ttl: int) -> bool:
+        """
+        Store an artwork's entry in Redis unless it was invalidated meanwhile
+
+        Redis errors are logged and otherwise ignored.
+
+        Args:
+            artwork_id: Artwork ID
+            generation: Generation read before the entry was loaded
+            entry: Hash fields of the entry
+            ttl: Seconds the entry stays in Redis
+
+        Returns:
+            True if the entry was stored
+        """
+        if generation is None:
+            return False
+        args = [generation, ttl]
+        for field, value in entry.items():
+            args.extend((field, value))
+        try:
+            stored = await self._get_fill_script()(
+                keys=[artwork_cache_key(artwork_id), artwork_generation_key(artwork_id)],
+                args=args,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to cache artwork {artwork_id}: {e}")
+            return False
+        return stored == 1
+
+    async def invalidate(self, artwork_id: str) -> None:
+        """
+        Drop an artwork from Redis and from every worker's local cache
+
+        Also bumps the artwork's generation, so loads that started before
+        the invalidation are not cached. Redis errors are logged and
+        otherwise ignored (entries then expire with their TTL).
+        """
+        self.drop_local(artwork_id)
+        try:
+            redis_client = get_redis()
+            generation_key = artwork_generation_key(artwork_id)
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.incr(generation_key)
+                pipe.expire(generation_key, GENERATION_TTL_SECONDS)
+                pipe.delete(artwork_cache_key(artwork_id))
+                pipe.publish(INVALIDATION_CHANNEL, artwork_id)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to invalidate cache for artwork {artwork_id}: {e}")
+
+    def _get_fill_script(self):
+        """Fill script registered on the shared Redis client"""
+        redis_client = get_redis()
+        if self._fill_script is None or self._fill_script_client is not redis_client:
+            self._fill_script = redis_client.register_script(FILL_SCRIPT)
+            self._fill_script_client = redis_client
+        return self._fill_script
+
+    def start(self) -> None:
+        """Start listening for invalidations from other workers"""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def close(self) -> None:
+        """Stop the invalidation listener"""
+        if self._listener is not None and not self._listener.done():
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        self._listener = None
+
+    async def _listen(self) -> None:
+        """Drop local entries invalidated by other workers"""
+        retry = LISTENER_RETRY_SECONDS
+        while True:
+            try:
+                async with get_redis().pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    # Messages may have been missed while disconnected
+                    self._drops += 1
+                    self._entries.clear()
+                    retry = LISTENER_RETRY_SECONDS
+                    while True:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is not None:
+                            self.drop_local(message["data"].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Artwork cache invalidation listener failed: {e}")
+                await asyncio.sleep(retry)
+                retry = min(retry * 2, LISTENER_MAX_RETRY_SECONDS)
+
+
+# Create singleton instance
+_artwork_cache: Optional[ArtworkCache] = None
+
+
+def get_artwork_cache() -> ArtworkCache:
+    """
+    Get artwork cache instance (singleton)
+
+    Returns:
+        ArtworkCache instance
+    """
+    global _artwork_cache
+    if _artwork_cache is None:
+        _artwork_cache = ArtworkCache()
+    return _artwork_cache
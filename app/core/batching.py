@@ -0,0 +1,130 @@
+"""
+Request micro-batching
+
+Base class for services that coalesce concurrent requests into one batched
+call: each request enqueues its item and awaits a future, and a background
+task collects the items arriving within a short window and executes them
+together (see PublishingBatcher and RecommendationBatcher).
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Generic, List, Optional, Tuple, TypeVar
+
+
+ItemT = TypeVar("ItemT")
+ResultT = TypeVar("ResultT")
+
+
+class MicroBatcher(ABC, Generic[ItemT, ResultT]):
+    """
+    Coalesces concurrent requests into batches
+
+    A background task collects up to max_batch_size items within
+    window_seconds of the first one and passes them to execute_batch(), which
+    subclasses implement. Every request gets the result at its position in
+    the batch; if the batch fails, every request gets the exception. Requests
+    still pending when the batcher is closed fail with RuntimeError.
+    """
+
+    def __init__(self, max_batch_size: int, window_seconds: float):
+        """
+        Initialize batcher
+
+        Args:
+            max_batch_size: Maximum number of items executed together
+            window_seconds: Seconds to wait for more items after the first
+        """
+        self.max_batch_size = max_batch_size
+        self.window_seconds = window_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def submit(self, item: ItemT) -> ResultT:
+        """
+        Execute an item as part of the next batch
+
+        Args:
+            item: Request item
+
+        Returns:
+            Result of the item
+        """
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._queue = asyncio.Queue()
+            self._loop = loop
+            self._worker = loop.create_task(self._run(self._queue))
+
+        future = loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    @abstractmethod
+    async def execute_batch(self, items: List[ItemT]) -> List[ResultT]:
+        """
+        Execute a batch of items
+
+        Args:
+            items: Items of the batch, in arrival order
+
+        Returns:
+            One result per item, in order
+        """
+
+    async def close(self) -> None:
+        """Stop the background worker and fail the requests it still had"""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+        if self._queue is not None:
+            pending = []
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            _fail(pending, RuntimeError("Batcher closed"))
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        """Drain the queue batch by batch"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = []
+            try:
+                batch.append(await queue.get())
+                deadline = loop.time() + self.window_seconds
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                results = await self.execute_batch([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError("Unexpected number of batch results")
+            except asyncio.CancelledError:
+                # Closed while collecting or executing this batch
+                _fail(batch, RuntimeError("Batcher closed"))
+                raise
+            except Exception as e:
+                _fail(batch, e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                # The request may have been cancelled while waiting
+                if not future.done():
+                    future.set_result(result)
+
+
+def _fail(batch: List[Tuple[object, asyncio.Future]], error: Exception) -> None:
+    """Fail the requests of a batch that are still waiting"""
+    for _, future in batch:
+        if not future.done():
+            future.set_exception(error)
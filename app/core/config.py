@@ -24,7 +24,8 @@ class Settings(BaseSettings):
     SUPABASE_KEY: str
     SUPABASE_SERVICE_ROLE_KEY: str
 
-    # Database (Optional - only needed for Alembic migrations or direct SQL queries)
+    # Database (Optional - only needed for Alembic migrations or direct SQL queries;
+    # when set, artwork publishing talks to Postgres directly instead of PostgREST)
     DATABASE_URL: str = ""
 
     # Redis
@@ -62,6 +63,7 @@ class Settings(BaseSettings):
     IMAGE_QUALITY_JPEG: int = 85  # JPEG quality (1-100)
     IMAGE_QUALITY_WEBP: int = 85  # WebP quality (1-100)
     IMAGE_OPTIMIZE: bool = True  # Enable image optimization
+    IMAGE_PROCESS_WORKERS: int = 0  # Worker processes for image processing (0 = threads in the API process)
 
     # External APIs
     YAMATO_API_KEY: str = ""
@@ -71,6 +73,8 @@ class Settings(BaseSettings):
     # AI/ML Settings
     ML_MODEL_PATH: str = "./app/ml/models"
     ENABLE_GPU: bool = False
+    GPU_CATALOG_THRESHOLD: int = 100000  # Score on GPU once the catalog has this many artworks
+    ANN_CATALOG_THRESHOLD: int = 100000  # Use the FAISS HNSW index (CPU) from this catalog size
     BATCH_SIZE: int = 32
 
     # Monitoring
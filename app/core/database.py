@@ -0,0 +1,69 @@
+"""
+Direct PostgreSQL connection pool
+
+Optional asyncpg pool for hot paths that benefit from skipping the PostgREST
+HTTP hop. It is only created when DATABASE_URL is set and asyncpg is
+installed; callers fall back to the Supabase client otherwise.
+"""
+
+import re
+from typing import Optional
+
+from app.core.config import settings
+
+try:
+    import asyncpg
+    ASYNCPG_AVAILABLE = True
+except ImportError:
+    asyncpg = None
+    ASYNCPG_AVAILABLE = False
+
+
+POOL_MIN_SIZE = 5
+POOL_MAX_SIZE = 20
+COMMAND_TIMEOUT_SECONDS = 10
+
+# Pool shared by the whole process (created on startup)
+_db_pool: Optional["asyncpg.Pool"] = None
+
+
+def get_db_pool() -> Optional["asyncpg.Pool"]:
+    """
+    Get the direct database pool
+
+    Returns:
+        asyncpg Pool, or None if direct database access is not configured
+    """
+    return _db_pool
+
+
+async def init_db_pool() -> Optional["asyncpg.Pool"]:
+    """
+    Create the direct database pool if DATABASE_URL is configured
+
+    Returns:
+        asyncpg Pool, or None if direct database access is not configured
+    """
+    global _db_pool
+    if _db_pool is None and settings.DATABASE_URL and ASYNCPG_AVAILABLE:
+        # asyncpg takes plain postgresql:// URLs (no SQLAlchemy "+driver" suffix)
+        dsn = re.sub(r"^postgres(?:ql)?\+\w+://", "postgresql://", settings.DATABASE_URL)
+        _db_pool = await asyncpg.create_pool(
+            dsn,
+            min_size=POOL_MIN_SIZE,
+            max_size=POOL_MAX_SIZE,
+            command_timeout=COMMAND_TIMEOUT_SECONDS,
+            # Supabase's DATABASE_URL usually points at the transaction-mode
+            # pooler, which may run each statement on a different server
+            # connection, so prepared statements must not be reused
+            statement_cache_size=0,
+        )
+    return _db_pool
+
+
+async def close_db_pool() -> None:
+    """Close the direct database pool"""
+    global _db_pool
+    if _db_pool is not None:
+        await _db_pool.close()
+        _db_pool = None
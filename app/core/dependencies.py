@@ -5,58 +5,65 @@ Provides dependencies for protecting routes with JWT authentication
 and role-based access control (RBAC).
 """
 
+import asyncio
+import logging
+
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional, Dict, Any
+from jose import jwt
+from supabase import Client
 from app.core.supabase import get_supabase_client, get_supabase_admin_client
+from app.core.storage import StorageService, get_storage_service
+from app.core.image_processing import ImageProcessingService, get_image_processing_service
+from app.core.publishing import PublishingBatcher, get_publishing_batcher
+from app.core.token_cache import get_token_cache
+
+logger = logging.getLogger(__name__)
 
 # HTTP Bearer token security scheme
 # auto_error=False allows us to handle errors manually
 # scheme_name="BearerAuth" makes it work better with Swagger UI
 security = HTTPBearer(auto_error=False, scheme_name="BearerAuth")
 
+# Profile table of each user type
+PROFILE_TABLES = {
+    "artist": "artists",
+    "customer": "customers",
+    "corporate": "corporates",
+}
+
 
 async def extract_token_from_request(request: Request) -> Optional[str]:
     """
     Fallback method to manually extract token from Authorization header
     """
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    # Log all headers for debugging
-    logger.info(f"DEBUG: All request headers: {dict(request.headers)}")
-    
-    auth_header = request.headers.get("authorization") or request.headers.get("Authorization")
-    logger.info(f"DEBUG: Manual header extraction - auth_header: {auth_header[:50] if auth_header else 'None'}...")
-    logger.info(f"DEBUG: auth_header type: {type(auth_header)}")
-    logger.info(f"DEBUG: auth_header length: {len(auth_header) if auth_header else 0}")
-    
+    auth_header = request.headers.get("authorization")
     if not auth_header:
-        logger.error("DEBUG: No Authorization header found in request!")
         return None
     
     # Handle "Bearer <token>" format
-    if auth_header.startswith("Bearer "):
-        token = auth_header[7:].strip()
-        logger.info(f"DEBUG: Extracted token from 'Bearer ' prefix: {token[:30]}... (length: {len(token)})")
-        return token
-    elif auth_header.startswith("bearer "):
-        token = auth_header[7:].strip()
-        logger.info(f"DEBUG: Extracted token from 'bearer ' prefix: {token[:30]}... (length: {len(token)})")
-        return token
-    else:
-        # Maybe token is provided without "Bearer" prefix
-        logger.info(f"DEBUG: Token provided without 'Bearer' prefix, using as-is: {auth_header[:30]}... (length: {len(auth_header)})")
-        return auth_header.strip()
+    if auth_header.startswith("Bearer ") or auth_header.startswith("bearer "):
+        return auth_header[7:].strip()
+    # Maybe token is provided without "Bearer" prefix
+    return auth_header.strip()
 
 
 class CurrentUser:
     """Current authenticated user data"""
-    def __init__(self, user_id: str, email: str, user_type: str, profile: Dict[str, Any]):
+    def __init__(
+        self,
+        user_id: str,
+        email: str,
+        user_type: str,
+        profile: Dict[str, Any],
+        email_confirmed_at: Optional[Any] = None,
+    ):
         self.id = user_id
         self.email = email
         self.user_type = user_type
         self.profile = profile
+        self.email_confirmed_at = email_confirmed_at
 
 
 async def get_current_user(
@@ -67,6 +74,7 @@ async def get_current_user(
     Dependency to get the current authenticated user from JWT token
     
     Validates the JWT token using Supabase Auth and returns user information.
+    Validated tokens are cached for a few minutes (see app.core.token_cache).
     
     Args:
         credentials: HTTP Bearer token from Authorization header
@@ -78,96 +86,64 @@ async def get_current_user(
     Raises:
         HTTPException: If token is invalid, expired, or user not found
     """
-    import logging
-    
-    logger = logging.getLogger(__name__)
-    
-    # DEBUG: Log what we received
-    logger.info("=" * 50)
-    logger.info("DEBUG: get_current_user called")
-    logger.info(f"DEBUG: credentials is None? {credentials is None}")
-    logger.info(f"DEBUG: credentials type: {type(credentials)}")
-    
     # If credentials is None, try to extract token manually from headers
     token = None
     if credentials:
         token = credentials.credentials
-        logger.info(f"DEBUG: Token extracted from HTTPBearer: {token[:20] if token else 'None'}...")
-        logger.info(f"DEBUG: Token scheme: {credentials.scheme}")
     else:
-        logger.warning("DEBUG: HTTPBearer returned None, trying manual extraction")
-        # Try manual extraction as fallback
         token = await extract_token_from_request(request)
-        if token:
-            logger.info(f"DEBUG: Successfully extracted token manually: {token[:30]}...")
-        
         if not token:
-            logger.error("DEBUG: HTTPBearer returned None AND manual extraction failed!")
-            logger.error("DEBUG: This usually means:")
-            logger.error("DEBUG: 1. Authorization header is missing")
-            logger.error("DEBUG: 2. Header format is wrong (should be 'Bearer <token>')")
-            logger.error("DEBUG: 3. HTTPBearer security scheme is not working")
-            logger.error("DEBUG: 4. Token might be expired or invalid format")
+            logger.debug("No bearer token in request")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication token required (DEBUG: HTTPBearer returned None - check Authorization header)",
+                detail="Authentication token required",
                 headers={"WWW-Authenticate": "Bearer"},
             )
     
     if not token:
-        logger.error("DEBUG: Token is empty string!")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication token is empty",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    logger.info(f"DEBUG: Token received: {token[:30]}... (length: {len(token)})")
-    
+    # Tokens validated recently by this worker skip the Supabase round-trips
+    token_cache = get_token_cache()
+    cached_user = token_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
     try:
-        from jose import jwt
-        from app.core.config import settings
-        
         admin_client = get_supabase_admin_client()
-        logger.info("DEBUG: Starting token validation")
         
-        # Method: Decode JWT token to get user ID, then fetch user via admin API
-        # This is the most reliable method for token validation
+        # Validate the token with Supabase Auth (signature, expiry and
+        # session), which also returns the user it belongs to
         try:
-            # Decode JWT token without verification (to extract user ID)
-            # We'll verify by fetching the user from Supabase
-            # Use get_unverified_claims() to decode without needing a key
-            decoded = jwt.get_unverified_claims(token)
-            
-            user_id = decoded.get("sub")  # Subject (user ID) in JWT
-            if not user_id:
-                logger.error(f"Token missing user ID: {decoded}")
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Authentication token does not contain user ID",
-                )
-            
-            # Get user from admin API (this validates the user exists)
             try:
-                user_response = admin_client.auth.admin.get_user_by_id(user_id)
-            except Exception as admin_error:
-                logger.error(f"Admin API error: {str(admin_error)}")
+                user_response = await asyncio.to_thread(admin_client.auth.get_user, token)
+            except Exception as auth_error:
+                logger.error(f"Auth API error: {str(auth_error)}")
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail=f"Failed to get user: {str(admin_error)}",
+                    detail=f"Failed to get user: {str(auth_error)}",
                 )
             
-            if not user_response.user:
-                logger.error(f"User not found for ID: {user_id}")
+            if not user_response or not user_response.user:
+                logger.error("User not found for token")
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="User not found",
                 )
             
             user = user_response.user
+            user_id = user.id
             user_metadata = user.user_metadata or {}
             user_type = user_metadata.get("user_type", "")
             
+            # The token is valid, so its claims can be trusted
+            claims = jwt.get_unverified_claims(token)
+            expires_at = claims.get("exp")
+            
             logger.debug(f"Authenticated user: {user_id}, type: {user_type}")
             
         except jwt.JWTError as jwt_error:
@@ -187,20 +163,14 @@ async def get_current_user(
         
         # Fetch user profile from appropriate table based on user_type
         profile = {}
-        if user_type:
+        table_name = PROFILE_TABLES.get(user_type)
+        if table_name:
             try:
-                if user_type == "artist":
-                    profile_response = admin_client.table("artists").select("*").eq("id", user_id).execute()
-                    if profile_response.data:
-                        profile = profile_response.data[0]
-                elif user_type == "customer":
-                    profile_response = admin_client.table("customers").select("*").eq("id", user_id).execute()
-                    if profile_response.data:
-                        profile = profile_response.data[0]
-                elif user_type == "corporate":
-                    profile_response = admin_client.table("corporates").select("*").eq("id", user_id).execute()
-                    if profile_response.data:
-                        profile = profile_response.data[0]
+                profile_response = await asyncio.to_thread(
+                    admin_client.table(table_name).select("*").eq("id", user_id).execute
+                )
+                if profile_response.data:
+                    profile = profile_response.data[0]
             except Exception as profile_error:
                 # Log error but continue - profile might not exist yet
                 logger.warning(f"Failed to fetch profile for user {user_id}: {str(profile_error)}")
@@ -215,12 +185,15 @@ async def get_current_user(
                 "status": "active",
             }
         
-        return CurrentUser(
+        current_user = CurrentUser(
             user_id=user_id,
             email=user.email or "",
             user_type=user_type,
-            profile=profile
+            profile=profile,
+            email_confirmed_at=user.email_confirmed_at,
         )
+        token_cache.put(token, user_id, current_user, expires_at)
+        return current_user
         
     except HTTPException:
         raise
@@ -304,3 +277,29 @@ async def require_corporate(
             detail="This endpoint requires corporate permissions",
         )
     return current_user
+
+
+# Shared service dependencies
+# The services are process-wide singletons; these async providers let routes
+# receive them as parameters (and tests override them via
+# app.dependency_overrides) without running a sync dependency in the
+# threadpool on every request.
+
+async def admin_client_dep() -> Client:
+    """Supabase admin client dependency"""
+    return get_supabase_admin_client()
+
+
+async def storage_service_dep() -> StorageService:
+    """Storage service dependency"""
+    return get_storage_service()
+
+
+async def image_service_dep() -> ImageProcessingService:
+    """Image processing service dependency"""
+    return get_image_processing_service()
+
+
+async def publishing_batcher_dep() -> PublishingBatcher:
+    """Artwork publishing batcher dependency"""
+    return get_publishing_batcher()
@@ -10,18 +10,22 @@ This module provides comprehensive image processing functionality including:
 - Dominant color extraction
 """
 
+import asyncio
 import io
-from typing import Dict, Any, Optional, Tuple, List
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, BinaryIO, Optional, Tuple, List, Union
 from pathlib import Path
 from enum import Enum
 
 from PIL import Image, ImageOps, ExifTags
 from PIL.ExifTags import TAGS
 import numpy as np
-from colorthief import ColorThief
 from fastapi import UploadFile, HTTPException, status
 
 from app.core.config import settings
+from app.ml.colors import extract_palette
 
 
 class ImageSize(Enum):
@@ -42,6 +46,9 @@ class ImageProcessingService:
         ImageSize.LARGE: settings.IMAGE_LARGE_SIZE,
     }
 
+    # Dominant color is computed on a downscaled copy (max width or height)
+    COLOR_SAMPLE_SIZE = 256
+
     # Supported image formats
     SUPPORTED_FORMATS = ["JPEG", "PNG", "WEBP", "HEIC", "HEIF"]
     
@@ -79,24 +86,27 @@ class ImageProcessingService:
             HTTPException: If validation fails
         """
         try:
-            # Read file content
-            file_content = file.file.read()
+            # Get file size without reading the content
+            file.file.seek(0, io.SEEK_END)
+            file_size = file.file.tell()
             file.file.seek(0)  # Reset to beginning
             
-            if len(file_content) == 0:
+            if file_size == 0:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Image file is empty",
                 )
             
-            # Try to open image
+            # Try to open image (only the header is parsed here)
             try:
-                image = Image.open(io.BytesIO(file_content))
+                image = Image.open(file.file)
             except Exception as e:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Invalid image file: {str(e)}",
                 )
+            finally:
+                file.file.seek(0)
             
             # Check format
             image_format = image.format
@@ -130,7 +140,7 @@ class ImageProcessingService:
                 "width": width,
                 "height": height,
                 "mode": image.mode,
-                "size_bytes": len(file_content),
+                "size_bytes": file_size,
             }
             
         except HTTPException:
@@ -201,35 +211,38 @@ class ImageProcessingService:
             )
         
         try:
-            # Read file content
-            file_content = await file.read()
+            # Decoding and encoding are CPU-bound, so run them in a worker
+            # thread to keep the event loop free
             file.file.seek(0)
-            
-            # Open HEIC image
-            image = Image.open(io.BytesIO(file_content))
-            
-            # Convert to RGB if necessary (HEIC might be in different color space)
-            if image.mode != "RGB":
-                image = image.convert("RGB")
-            
-            # Save as JPEG
-            output = io.BytesIO()
-            image.save(
-                output,
-                format="JPEG",
-                quality=quality,
-                optimize=settings.IMAGE_OPTIMIZE,
-            )
-            output.seek(0)
-            
-            return output
-            
+            return await asyncio.to_thread(self._heic_to_jpeg, file.file, quality)
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"HEIC to JPEG conversion failed: {str(e)}",
             )
 
+    def _heic_to_jpeg(self, source: BinaryIO, quality: int = settings.IMAGE_QUALITY_JPEG) -> io.BytesIO:
+        """Convert a HEIC/HEIF file to JPEG (blocking)"""
+        # Open HEIC image
+        source.seek(0)
+        image = Image.open(source)
+        
+        # Convert to RGB if necessary (HEIC might be in different color space)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        
+        # Save as JPEG
+        output = io.BytesIO()
+        image.save(
+            output,
+            format="JPEG",
+            quality=quality,
+            optimize=settings.IMAGE_OPTIMIZE,
+        )
+        output.seek(0)
+        
+        return output
+
     def resize_image(
         self,
         image: Image.Image,
@@ -293,9 +306,9 @@ class ImageProcessingService:
         # Validate image
         validation = self.validate_image(file)
         
-        # Read file content
-        file_content = await file.read()
-        file.file.seek(0)
+        # The image is decoded straight from the upload's spooled file, so
+        # the upload is never copied into a bytes object
+        source = file.file
         
         # Convert HEIC to JPEG if needed
         is_heic = self.is_heic_file(file)
@@ -305,13 +318,50 @@ class ImageProcessingService:
                     status_code=status.HTTP_501_NOT_IMPLEMENTED,
                     detail="HEIC conversion not supported. Please install pillow-heif.",
                 )
-            jpeg_content = await self.convert_heic_to_jpeg(file)
-            file_content = jpeg_content.read()
+            source = await self.convert_heic_to_jpeg(file)
             validation["format"] = "JPEG"
             validation["converted_from"] = "HEIC"
         
+        # Decoding, resizing and color extraction are CPU-bound, so run them
+        # in a worker thread to keep the event loop free
+        processed_images, metadata, dominant_color = await asyncio.to_thread(
+            self._process_content,
+            source,
+            sizes,
+            extract_metadata,
+            extract_color,
+        )
+        
+        return {
+            "original": {
+                "format": validation["format"],
+                "width": validation["width"],
+                "height": validation["height"],
+                "mode": validation["mode"],
+                "size_bytes": validation["size_bytes"],
+            },
+            "processed": processed_images,
+            "metadata": metadata,
+            "dominant_color": dominant_color,
+            "converted_from_heic": is_heic and convert_heic,
+        }
+
+    def _process_content(
+        self,
+        source: BinaryIO,
+        sizes: List[ImageSize],
+        extract_metadata: bool,
+        extract_color: bool,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Optional[str]]:
+        """
+        Decode an image file, resize to each size and extract metadata (blocking)
+        
+        Returns:
+            Tuple of (processed images by size, EXIF metadata, dominant color)
+        """
         # Open image
-        image = Image.open(io.BytesIO(file_content))
+        source.seek(0)
+        image = Image.open(source)
         
         # Auto-rotate based on EXIF orientation
         image = ImageOps.exif_transpose(image)
@@ -344,19 +394,7 @@ class ImageProcessingService:
         if extract_color:
             dominant_color = self.extract_dominant_color(image)
         
-        return {
-            "original": {
-                "format": validation["format"],
-                "width": validation["width"],
-                "height": validation["height"],
-                "mode": validation["mode"],
-                "size_bytes": validation["size_bytes"],
-            },
-            "processed": processed_images,
-            "metadata": metadata,
-            "dominant_color": dominant_color,
-            "converted_from_heic": is_heic and convert_heic,
-        }
+        return processed_images, metadata, dominant_color
 
     def optimize_image(
         self,
@@ -465,6 +503,10 @@ class ImageProcessingService:
         """
         Extract dominant color from image (hex format)
         
+        The image is downscaled and its pixels binned into a color histogram
+        in one vectorized pass (see app.ml.colors.extract_palette); the most
+        populated bin is the dominant color.
+        
         Args:
             image: PIL Image object
             
@@ -472,60 +514,27 @@ class ImageProcessingService:
             Hex color code (e.g., "#FF5733") or None if extraction fails
         """
         try:
-            # Convert to RGB if necessary
-            if image.mode != "RGB":
-                image = image.convert("RGB")
+            sample = image.copy()
+            sample.thumbnail((self.COLOR_SAMPLE_SIZE, self.COLOR_SAMPLE_SIZE))
             
-            # Save image to BytesIO for ColorThief
-            img_bytes = io.BytesIO()
-            image.save(img_bytes, format="JPEG")
-            img_bytes.seek(0)
-            
-            # Extract dominant color using ColorThief
-            color_thief = ColorThief(img_bytes)
-            dominant_color = color_thief.get_color(quality=1)
-            
-            # Convert RGB tuple to hex
-            hex_color = "#{:02x}{:02x}{:02x}".format(
-                dominant_color[0],
-                dominant_color[1],
-                dominant_color[2],
-            )
+            # Convert to RGB if necessary
+            if sample.mode != "RGB":
+                sample = sample.convert("RGB")
             
-            return hex_color.upper()
+            palette = extract_palette(np.asarray(sample, dtype=np.uint8), count=1)
+            return palette[0] if palette else None
             
         except Exception as e:
             # If color extraction fails, return None
             return None
 
-    async def process_and_save_image(
-        self,
-        file: UploadFile,
-        output_format: str = "JPEG",
-        sizes: Optional[List[ImageSize]] = None,
-        convert_heic: bool = True,
-    ) -> Dict[str, Any]:
+    def _optimize_sizes(self, processed: Dict[str, Any], output_format: str) -> Dict[str, Any]:
         """
-        Process image and return optimized versions ready for storage
+        Encode every processed size in the output format (blocking)
         
-        Args:
-            file: FastAPI UploadFile object
-            output_format: Output format (JPEG, PNG, WEBP)
-            sizes: List of sizes to generate
-            convert_heic: Whether to convert HEIC to JPEG
-            
         Returns:
-            Dict with processed image data ready for upload
+            Dict of size name -> encoded image data and dimensions
         """
-        # Process image
-        processed = await self.process_image(
-            file=file,
-            sizes=sizes,
-            convert_heic=convert_heic,
-            extract_metadata=True,
-            extract_color=True,
-        )
-        
         # Optimize each size
         optimized_images = {}
         for size_name, size_data in processed["processed"].items():
@@ -553,6 +562,47 @@ class ImageProcessingService:
                 "size_bytes": len(optimized.getvalue()),
             }
         
+        return optimized_images
+
+    async def process_and_save_image(
+        self,
+        file: UploadFile,
+        output_format: str = "JPEG",
+        sizes: Optional[List[ImageSize]] = None,
+        convert_heic: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Process image and return optimized versions ready for storage
+        
+        Args:
+            file: FastAPI UploadFile object
+            output_format: Output format (JPEG, PNG, WEBP)
+            sizes: List of sizes to generate
+            convert_heic: Whether to convert HEIC to JPEG
+            
+        Returns:
+            Dict with processed image data ready for upload
+        """
+        pool = get_image_process_pool()
+        if pool is not None:
+            return await self._process_and_save_in_pool(pool, file, output_format, sizes, convert_heic)
+        
+        # Process image
+        processed = await self.process_image(
+            file=file,
+            sizes=sizes,
+            convert_heic=convert_heic,
+            extract_metadata=True,
+            extract_color=True,
+        )
+        
+        # Encoding is CPU-bound as well
+        optimized_images = await asyncio.to_thread(
+            self._optimize_sizes,
+            processed,
+            output_format,
+        )
+        
         return {
             "images": optimized_images,
             "metadata": processed["metadata"],
@@ -560,6 +610,160 @@ class ImageProcessingService:
             "original_info": processed["original"],
         }
 
+    async def _process_and_save_in_pool(
+        self,
+        pool: ProcessPoolExecutor,
+        file: UploadFile,
+        output_format: str,
+        sizes: Optional[List[ImageSize]],
+        convert_heic: bool,
+    ) -> Dict[str, Any]:
+        """
+        process_and_save_image with the CPU work in an image worker process
+
+        Validation runs here, so invalid uploads are rejected without
+        shipping them to a worker. Uploads spooled to disk are read by the
+        worker from the spooled file itself (see _upload_source).
+        """
+        if sizes is None:
+            sizes = [ImageSize.THUMBNAIL, ImageSize.MEDIUM, ImageSize.LARGE]
+        
+        validation = self.validate_image(file)
+        
+        is_heic = self.is_heic_file(file)
+        if is_heic and convert_heic:
+            if not self.heic_supported:
+                raise HTTPException(
+                    status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                    detail="HEIC conversion not supported. Please install pillow-heif.",
+                )
+            validation["format"] = "JPEG"
+            validation["converted_from"] = "HEIC"
+        
+        optimized_images, metadata, dominant_color = await asyncio.get_running_loop().run_in_executor(
+            pool,
+            _process_upload,
+            _upload_source(file.file),
+            sizes,
+            output_format,
+            validation["format"],
+            is_heic and convert_heic,
+        )
+        
+        return {
+            "images": optimized_images,
+            "metadata": metadata,
+            "dominant_color": dominant_color,
+            "original_info": {
+                "format": validation["format"],
+                "width": validation["width"],
+                "height": validation["height"],
+                "mode": validation["mode"],
+                "size_bytes": validation["size_bytes"],
+            },
+        }
+
+
+def _upload_source(source: BinaryIO) -> Union[str, bytes]:
+    """
+    What an image worker process reads an upload from
+
+    Uploads spooled to disk are passed as the /proc path of their file
+    descriptor, which the worker opens itself, so the file is neither read
+    into memory nor copied. Uploads still in memory (at most the spool
+    size) are passed as bytes.
+
+    Args:
+        source: Spooled file of the upload
+
+    Returns:
+        Path to open, or the content
+    """
+    source.seek(0)
+    # Same check as starlette's UploadFile: spooled files that have not
+    # rolled over to disk are still in memory
+    if getattr(source, "_rolled", True):
+        try:
+            fd = source.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            fd = None
+        if fd is not None:
+            path = f"/proc/{os.getpid()}/fd/{fd}"
+            if os.path.exists(path):
+                return path
+    return source.read()
+
+
+def _process_upload(
+    upload: Union[str, bytes],
+    sizes: List[ImageSize],
+    output_format: str,
+    original_format: str,
+    convert_heic: bool,
+) -> Tuple[Dict[str, Any], Dict[str, Any], Optional[str]]:
+    """
+    Decode, resize and encode an uploaded image (runs in an image worker process)
+
+    Returns:
+        Tuple of (encoded images by size, EXIF metadata, dominant color)
+    """
+    service = get_image_processing_service()
+    # A path is reopened here with its own file offset (see _upload_source)
+    with open(upload, "rb") if isinstance(upload, str) else io.BytesIO(upload) as upload_file:
+        source: BinaryIO = upload_file
+        if convert_heic:
+            source = service._heic_to_jpeg(source)
+        
+        processed_images, metadata, dominant_color = service._process_content(source, sizes, True, True)
+        optimized_images = service._optimize_sizes(
+            {"processed": processed_images, "original": {"format": original_format}},
+            output_format,
+        )
+    return optimized_images, metadata, dominant_color
+
+
+# Worker processes for image processing (see settings.IMAGE_PROCESS_WORKERS)
+_image_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_image_process_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Get the image worker process pool
+
+    Returns:
+        ProcessPoolExecutor, or None if images are processed in threads
+    """
+    return _image_process_pool
+
+
+def init_image_process_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Start the image worker processes if IMAGE_PROCESS_WORKERS is set
+
+    Decoding, resizing and encoding then run outside the API process, so
+    they use other cores instead of competing with requests for its GIL.
+
+    Returns:
+        ProcessPoolExecutor, or None if images are processed in threads
+    """
+    global _image_process_pool
+    if _image_process_pool is None and settings.IMAGE_PROCESS_WORKERS > 0:
+        # Spawned (not forked) workers, so they do not inherit the event
+        # loop, client connections or locks of this process
+        _image_process_pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _image_process_pool
+
+
+def close_image_process_pool() -> None:
+    """Stop the image worker processes"""
+    global _image_process_pool
+    if _image_process_pool is not None:
+        _image_process_pool.shutdown(wait=False, cancel_futures=True)
+        _image_process_pool = None
+
 
 # Create singleton instance
 _image_processing_service: Optional[ImageProcessingService] = None
@@ -2,27 +2,45 @@
 Logging configuration
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
 
 
 def setup_logging():
-    """Setup application logging"""
+    """
+    Setup application logging
+
+    Loggers only put records on a queue; a background listener thread writes
+    them to stdout and the log file, so a slow pipe or disk never blocks the
+    event loop.
+    """
     
     # Create logs directory if it doesn't exist
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
     
-    # Configure root logger
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler(log_dir / "app.log"),
-        ],
-    )
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    handlers = [
+        logging.StreamHandler(sys.stdout),
+        logging.FileHandler(log_dir / "app.log"),
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    # Flush queued records on exit
+    atexit.register(listener.stop)
+
+    # Configure root logger (the listener's handlers do the formatting)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
     
     # Set specific log levels
     logging.getLogger("uvicorn").setLevel(logging.INFO)
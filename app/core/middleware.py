@@ -0,0 +1,67 @@
+"""
+ASGI middleware
+
+UploadLimitMiddleware rejects oversized or non-multipart upload requests from
+their headers alone, before the request body is read or parsed.
+"""
+
+from typing import Dict
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+# Allowance for multipart boundaries and part headers on top of the file size
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadLimitMiddleware:
+    """Header-based size and type checks for upload endpoints"""
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        """
+        Initialize middleware
+
+        Args:
+            app: Wrapped ASGI application
+            limits: Maximum file size in bytes, keyed by request path
+        """
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        max_size = self.limits.get(scope["path"])
+        if max_size is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_type = headers.get(b"content-type", b"").decode("latin-1")
+        if not content_type.startswith("multipart/form-data"):
+            response = JSONResponse(
+                status_code=415,
+                content={"detail": "Expected a multipart/form-data upload"},
+            )
+            await response(scope, receive, send)
+            return
+
+        content_length = headers.get(b"content-length")
+        if content_length is not None:
+            try:
+                too_large = int(content_length) > max_size + MULTIPART_OVERHEAD
+            except ValueError:
+                too_large = False
+            if too_large:
+                size_mb = max_size / 1024 / 1024
+                response = JSONResponse(
+                    status_code=413,
+                    content={"detail": f"File size exceeds limit of {size_mb:.1f}MB"},
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
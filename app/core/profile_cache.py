@@ -0,0 +1,79 @@
+"""
+Login profile cache
+
+In-process TTL LRU of the profile columns returned by the login endpoints,
+keyed by lowercased login email, so repeated logins of the same user (e.g.
+SPA re-auth) skip the profile SELECT. Users of an entry must check that its
+"id" is the authenticated user.
+
+Entries are dropped when the user updates, deactivates or deletes their
+profile through this worker; changes made elsewhere (other workers, the
+dashboard) are picked up when the entry expires.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+PROFILE_CACHE_SIZE = 10000
+PROFILE_CACHE_TTL_SECONDS = 600
+
+
+class ProfileCache:
+    """TTL LRU of login profiles"""
+
+    def __init__(self, maxsize: int = PROFILE_CACHE_SIZE, ttl: float = PROFILE_CACHE_TTL_SECONDS):
+        """
+        Initialize cache
+
+        Args:
+            maxsize: Maximum number of profiles kept in this worker
+            ttl: Seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # email -> (expires_at, profile), in LRU order
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, email: str) -> Optional[Dict[str, Any]]:
+        """Return the cached profile of a login email if it has not expired"""
+        email = email.lower()
+        item = self._entries.get(email)
+        if item is None:
+            return None
+        expires_at, profile = item
+        if expires_at <= time.monotonic():
+            del self._entries[email]
+            return None
+        self._entries.move_to_end(email)
+        return profile
+
+    def put(self, email: str, profile: Dict[str, Any]) -> None:
+        """Store the profile of a login email"""
+        email = email.lower()
+        self._entries[email] = (time.monotonic() + self.ttl, profile)
+        self._entries.move_to_end(email)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def drop(self, email: str) -> None:
+        """Remove the profile of a login email"""
+        self._entries.pop(email.lower(), None)
+
+
+# Create singleton instance
+_profile_cache: Optional[ProfileCache] = None
+
+
+def get_profile_cache() -> ProfileCache:
+    """
+    Get login profile cache instance (singleton)
+
+    Returns:
+        ProfileCache instance
+    """
+    global _profile_cache
+    if _profile_cache is None:
+        _profile_cache = ProfileCache()
+    return _profile_cache
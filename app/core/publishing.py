@@ -0,0 +1,121 @@
+"""
+Artwork Publishing Batcher
+
+Coalesces concurrent publish/unpublish requests (e.g. a bulk publish from the
+artist dashboard) into a single call to the change_artworks_publishing
+database function, instead of one Supabase round-trip per request.
+
+Batches go straight to Postgres over the asyncpg pool when it is configured
+(see app.core.database), and through the PostgREST RPC endpoint of the async
+Supabase client otherwise.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import orjson
+from supabase import Client
+
+from app.core.batching import MicroBatcher
+from app.core.database import get_db_pool
+from app.core.supabase import get_supabase_admin_async_client, get_supabase_admin_client
+
+
+# Requests arriving within the window are sent together
+MAX_BATCH_SIZE = 50
+BATCH_WINDOW_SECONDS = 0.002
+
+
+class PublishingBatcher(MicroBatcher[Dict[str, str], Dict[str, Any]]):
+    """
+    Coalesces concurrent artwork status changes into batches
+
+    Each request enqueues its change and awaits a future; a background task
+    collects up to MAX_BATCH_SIZE changes within BATCH_WINDOW_SECONDS and
+    applies them with one database call. Every change still runs in its own
+    database subtransaction and gets its own result.
+    """
+
+    def __init__(self, client: Optional[Client] = None):
+        """
+        Initialize batcher
+
+        Args:
+            client: Optional Supabase client (uses admin client if not provided)
+        """
+        super().__init__(MAX_BATCH_SIZE, BATCH_WINDOW_SECONDS)
+        self.client = client or get_supabase_admin_client()
+
+    async def change(self, action: str, artwork_id: str, user_id: str) -> Dict[str, Any]:
+        """
+        Publish or unpublish an artwork as part of the next batch
+
+        Args:
+            action: "publish" or "unpublish"
+            artwork_id: Artwork ID
+            user_id: ID of the artist making the change
+
+        Returns:
+            {"artwork": row with "artists" and "artwork_images" embedded} on
+            success, or {"code": SQLSTATE, "message": ..., "details": ...}
+        """
+        return await self.submit({"action": action, "id": artwork_id, "user": user_id})
+
+    async def change_many(self, action: str, artwork_ids: List[str], user_id: str) -> List[Dict[str, Any]]:
+        """
+        Publish or unpublish many artworks of one artist with one database call
+
+        Bypasses the queue: the changes already form a batch.
+
+        Args:
+            action: "publish" or "unpublish"
+            artwork_ids: Artwork IDs
+            user_id: ID of the artist making the change
+
+        Returns:
+            One result per artwork ID, in order (same shape as change())
+        """
+        requests = [{"action": action, "id": artwork_id, "user": user_id} for artwork_id in artwork_ids]
+        results = await self.execute_batch(requests)
+        if len(results) != len(requests):
+            raise RuntimeError("Unexpected number of publishing results")
+        return results
+
+    async def execute_batch(self, requests: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Apply a batch of changes with one database call"""
+        pool = get_db_pool()
+        if pool is not None:
+            async with pool.acquire() as conn:
+                results = await conn.fetchval(
+                    "SELECT change_artworks_publishing($1::jsonb)::text",
+                    orjson.dumps(requests).decode(),
+                )
+            return orjson.loads(results)
+
+        async_client = await get_supabase_admin_async_client()
+        if async_client is not None:
+            response = await async_client.rpc("change_artworks_publishing", {"p_requests": requests}).execute()
+            return response.data or []
+        return await asyncio.to_thread(self._execute_rpc, requests)
+
+    def _execute_rpc(self, requests: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Apply a batch of changes with the sync client (blocking; for supabase releases without an async client)"""
+        response = self.client.rpc("change_artworks_publishing", {"p_requests": requests}).execute()
+        return response.data or []
+
+
+# Create singleton instance
+_publishing_batcher: Optional[PublishingBatcher] = None
+
+
+def get_publishing_batcher() -> PublishingBatcher:
+    """
+    Get publishing batcher instance (singleton)
+
+    Returns:
+        PublishingBatcher instance
+    """
+    global _publishing_batcher
+    if _publishing_batcher is None:
+        _publishing_batcher = PublishingBatcher()
+    return _publishing_batcher
@@ -0,0 +1,100 @@
+"""
+Rate limiting
+
+Sliding-window request limits kept in Redis, so every worker shares the same
+counters. Each limit is a sorted set of request timestamps; one Lua script
+drops the timestamps that left the window, checks every limit of a request
+and records the request, atomically.
+
+Redis errors are logged and the request is allowed (failing open), like the
+other Redis-backed helpers.
+"""
+
+import logging
+import time
+import uuid
+from typing import Optional, Sequence, Tuple
+
+from app.core.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+# KEYS: one sorted set per limit
+# ARGV: now, member, then (window seconds, max requests) per key
+# Returns 0 if the request was recorded, or the 1-based index of the first
+# exceeded limit
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+for i, key in ipairs(KEYS) do
+    local window = tonumber(ARGV[1 + 2 * i])
+    local limit = tonumber(ARGV[2 + 2 * i])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        return i
+    end
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[2])
+    redis.call('EXPIRE', key, tonumber(ARGV[1 + 2 * i]))
+end
+return 0
+"""
+
+
+class RateLimiter:
+    """Sliding-window rate limits backed by Redis"""
+
+    def __init__(self):
+        """Initialize rate limiter"""
+        self._script = None
+        self._script_client = None
+
+    async def allow(self, limits: Sequence[Tuple[str, int, int]]) -> bool:
+        """
+        Record a request if it is within all of its limits
+
+        A rejected request is not recorded, so it does not use up any of its
+        limits.
+
+        Args:
+            limits: (Redis key, max requests, window seconds) per limit
+
+        Returns:
+            True if the request is allowed, False if a limit is exceeded
+        """
+        args = [time.time(), uuid.uuid4().hex]
+        for _, max_requests, window_seconds in limits:
+            args.extend((window_seconds, max_requests))
+
+        try:
+            exceeded = await self._get_script()(keys=[key for key, _, _ in limits], args=args)
+        except Exception as e:
+            logger.warning(f"Rate limit check failed: {e}")
+            return True
+        return exceeded == 0
+
+    def _get_script(self):
+        """Sliding window script registered on the shared Redis client"""
+        redis_client = get_redis()
+        if self._script is None or self._script_client is not redis_client:
+            self._script = redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+            self._script_client = redis_client
+        return self._script
+
+
+# Create singleton instance
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get rate limiter instance (singleton)
+
+    Returns:
+        RateLimiter instance
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
@@ -2,14 +2,21 @@
 Redis client configuration
 """
 
+from typing import Optional
+
 import redis.asyncio as redis
 from app.core.config import settings
 
 
+# Response caching must never hold up a request for long when Redis is slow
+# or unreachable
+REDIS_TIMEOUT_SECONDS = 0.5
+
+
 async def get_redis_client():
     """
     Get Redis client instance
-    
+
     Returns:
         Redis: Redis client
     """
@@ -20,5 +27,33 @@ async def get_redis_client():
     )
 
 
-# Create Redis client (will be initialized on startup)
-redis_client = None
+# Shared client (created on first use, closed on shutdown)
+redis_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """
+    Get the shared Redis client (singleton)
+
+    The client returns raw bytes so cached response bodies can be sent
+    without decoding. Connections are opened lazily by its pool.
+
+    Returns:
+        Redis: Redis client
+    """
+    global redis_client
+    if redis_client is None:
+        redis_client = redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=REDIS_TIMEOUT_SECONDS,
+            socket_timeout=REDIS_TIMEOUT_SECONDS,
+        )
+    return redis_client
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client and its connection pool"""
+    global redis_client
+    if redis_client is not None:
+        await redis_client.close()
+        redis_client = None
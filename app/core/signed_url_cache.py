@@ -0,0 +1,85 @@
+"""
+Signed URL cache
+
+In-process TTL LRU of the signed storage URLs returned by the file URL
+endpoint, keyed by (bucket, file path, expiry), so repeated requests for the
+same file skip the Supabase Storage round-trip. An entry is dropped a margin
+before its URL expires, so a URL served from the cache (or revalidated with
+its ETag) is always valid for at least that margin.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+SIGNED_URL_CACHE_SIZE = 10000
+# Seconds a cached URL must still be valid for when it is served
+SIGNED_URL_EXPIRY_MARGIN_SECONDS = 60
+
+SignedUrlKey = Tuple[str, str, int]
+
+
+class SignedUrlCache:
+    """TTL LRU of signed storage URLs"""
+
+    def __init__(self, maxsize: int = SIGNED_URL_CACHE_SIZE, margin: float = SIGNED_URL_EXPIRY_MARGIN_SECONDS):
+        """
+        Initialize cache
+
+        Args:
+            maxsize: Maximum number of URLs kept in this worker
+            margin: Seconds before a URL's expiry at which its entry expires
+        """
+        self.maxsize = maxsize
+        self.margin = margin
+        # (bucket, file_path, expires_in) -> (expires_at, url, etag), in LRU order
+        self._entries: "OrderedDict[SignedUrlKey, Tuple[float, str, str]]" = OrderedDict()
+
+    def get(self, key: SignedUrlKey) -> Optional[Tuple[str, str]]:
+        """Return the cached (url, etag) of a key if the entry has not expired"""
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, url, etag = item
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return url, etag
+
+    def put(self, key: SignedUrlKey, url: str, etag: str) -> None:
+        """
+        Store a signed URL
+
+        URLs that expire within the margin are not cached.
+
+        Args:
+            key: (bucket, file_path, expires_in) the URL was signed for
+            url: Signed URL
+            etag: ETag of the URL
+        """
+        ttl = key[2] - self.margin
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, url, etag)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+# Create singleton instance
+_signed_url_cache: Optional[SignedUrlCache] = None
+
+
+def get_signed_url_cache() -> SignedUrlCache:
+    """
+    Get signed URL cache instance (singleton)
+
+    Returns:
+        SignedUrlCache instance
+    """
+    global _signed_url_cache
+    if _signed_url_cache is None:
+        _signed_url_cache = SignedUrlCache()
+    return _signed_url_cache
@@ -0,0 +1,70 @@
+"""
+Single-flight calls
+
+Coalesces concurrent calls for the same key onto one load: the first caller
+(the owner) runs the load, and callers arriving while it is in flight await
+its result instead of starting their own. Results are not kept once the
+load finishes.
+
+If the owner is cancelled (e.g. its client disconnected), its waiters are
+not: the first of them to resume runs the load again and the others await
+that one.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ResultT = TypeVar("ResultT")
+
+
+class SingleFlight(Generic[KeyT, ResultT]):
+    """Coalesces concurrent loads of the same key"""
+
+    def __init__(self):
+        """Initialize single-flight group"""
+        # key -> future of the load in flight
+        self._calls: Dict[KeyT, asyncio.Future] = {}
+
+    async def run(self, key: KeyT, load: Callable[[], Awaitable[ResultT]]) -> ResultT:
+        """
+        Run a load, or await the one already in flight for the key
+
+        Args:
+            key: Key identifying the load
+            load: Coroutine function performing the load
+
+        Returns:
+            Result of the load
+
+        Raises:
+            Exception: Whatever the load raised
+        """
+        while True:
+            pending = self._calls.get(key)
+            if pending is None:
+                break
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Only the owner's cancellation is retried, not this caller's
+                if not pending.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await load()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters get the exception; don't warn if nobody was waiting
+            future.exception()
+            raise
+        finally:
+            del self._calls[key]
@@ -12,10 +12,14 @@ Features:
 - Error handling
 """
 
+import asyncio
+import hashlib
+import io
 import os
 import uuid
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Dict, Any, BinaryIO
+from typing import Optional, Dict, Any, BinaryIO, List, Union
 from datetime import datetime
 import mimetypes
 
@@ -42,9 +46,38 @@ FILE_SIZE_LIMITS = {
     "documents": 10485760, # 10MB
 }
 
+# Leading bytes identifying each image format
+IMAGE_SIGNATURES = {
+    "image/jpeg": (b"\xff\xd8\xff",),
+    "image/png": (b"\x89PNG\r\n\x1a\n",),
+    "image/webp": (b"RIFF",),
+}
+
 # Default bucket
 DEFAULT_BUCKET = "artworks"
 
+# Chunk size for streaming uploads (1MB)
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+@dataclass(slots=True)
+class BytesIOUploadFile:
+    """
+    In-memory file that StorageService accepts in place of an UploadFile
+    
+    Used to upload processed images, which only exist as BytesIO buffers.
+    """
+
+    file: BinaryIO
+    filename: str
+    content_type: str = "image/jpeg"
+
+    async def read(self) -> bytes:
+        return self.file.read()
+
+    async def seek(self, position: int) -> int:
+        return self.file.seek(position)
+
 
 class StorageService:
     """Service for managing file storage in Supabase Storage"""
@@ -145,6 +178,36 @@ class StorageService:
             "filename": file.filename,
         }
 
+    def validate_image_signature(self, file: UploadFile, content_type: str) -> None:
+        """
+        Check that the file starts with the magic bytes of its declared type
+        
+        Only the first 12 bytes are read.
+        
+        Args:
+            file: FastAPI UploadFile object
+            content_type: Declared MIME type
+            
+        Raises:
+            HTTPException: If the content does not match the declared type
+        """
+        signatures = IMAGE_SIGNATURES.get(content_type)
+        if signatures is None:
+            return
+
+        file.file.seek(0)
+        head = file.file.read(12)
+        file.file.seek(0)
+
+        matches = any(head.startswith(signature) for signature in signatures)
+        if content_type == "image/webp":
+            matches = matches and head[8:12] == b"WEBP"
+        if not matches:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"File content is not a valid {content_type} image",
+            )
+
     def sanitize_filename(self, filename: str) -> str:
         """
         Sanitize filename to prevent security issues
@@ -238,32 +301,16 @@ class StorageService:
         file_path = self.generate_file_path(bucket, user_id, filename, subfolder)
 
         try:
-            # Read file content
-            file_content = await file.read()
-
-            # Upload to Supabase Storage
-            # Supabase Storage API: upload(path, file, file_options)
-            response = self.client.storage.from_(bucket).upload(
+            # The Supabase client is synchronous, so run the upload in a
+            # worker thread to keep the event loop free for other requests
+            url = await asyncio.to_thread(
+                self._store_upload,
+                bucket,
                 file_path,
-                file_content,
-                file_options={
-                    "content-type": validation["content_type"],
-                    "upsert": False,  # Don't overwrite existing files
-                },
+                file.file,
+                validation["content_type"],
             )
 
-            # Get public URL
-            if bucket in ["artworks", "profiles", "spaces"]:
-                # Public buckets
-                url = self.client.storage.from_(bucket).get_public_url(file_path)
-            else:
-                # Private buckets - return signed URL (valid for 1 hour)
-                url_data = self.client.storage.from_(bucket).create_signed_url(
-                    file_path,
-                    expires_in=3600,
-                )
-                url = url_data.get("signedURL", "")
-
             return {
                 "success": True,
                 "path": file_path,
@@ -293,6 +340,166 @@ class StorageService:
                     detail=f"Failed to upload file: {error_msg}",
                 )
 
+    async def upload_file_deduplicated(
+        self,
+        file: UploadFile,
+        bucket: str,
+        user_id: str,
+    ) -> Dict[str, Any]:
+        """
+        Upload file to Supabase Storage under a content-addressed path
+        
+        The upload's spooled file is hashed in chunks, then uploaded from the
+        same file (see _store_upload), so memory use is bounded by the chunk
+        size and the content is not copied. The hash is used as the object
+        name: uploading the same content again returns the existing URL
+        instead of storing a second copy.
+        
+        Args:
+            file: FastAPI UploadFile object
+            bucket: Target bucket name
+            user_id: User ID (for path organization)
+            
+        Returns:
+            Dict with upload results (path, url, size, etc.)
+            
+        Raises:
+            HTTPException: If upload fails
+        """
+        # Validate file
+        validation = self.validate_file(file, bucket)
+        self.validate_image_signature(file, validation["content_type"])
+        
+        ext = Path(self.sanitize_filename(file.filename or "")).suffix.lower()
+        
+        try:
+            digest = await asyncio.to_thread(self._hash_file, file.file)
+            file_path = f"{user_id}/{digest}{ext}"
+            
+            try:
+                url = await asyncio.to_thread(
+                    self._store_upload,
+                    bucket,
+                    file_path,
+                    file.file,
+                    validation["content_type"],
+                )
+            except Exception as e:
+                if "already exists" not in str(e).lower():
+                    raise
+                # Same content was uploaded before - reuse it
+                url = self.get_file_url(bucket, file_path)
+            
+            return {
+                "success": True,
+                "path": file_path,
+                "url": url,
+                "bucket": bucket,
+                "size": validation["size"],
+                "content_type": validation["content_type"],
+                "filename": Path(file_path).name,
+            }
+        
+        except Exception as e:
+            error_msg = str(e)
+            if "permission" in error_msg.lower() or "unauthorized" in error_msg.lower():
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Permission denied. Check storage policies.",
+                )
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to upload file: {error_msg}",
+            )
+
+    def _hash_file(self, source: BinaryIO) -> str:
+        """
+        Hash a file in chunks and rewind it (blocking)
+        
+        Args:
+            source: Readable binary file object
+            
+        Returns:
+            Hex digest of the content
+        """
+        hasher = hashlib.blake2b(digest_size=16)
+        source.seek(0)
+        while chunk := source.read(UPLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+        source.seek(0)
+        return hasher.hexdigest()
+
+    def _store_upload(
+        self,
+        bucket: str,
+        file_path: str,
+        source: BinaryIO,
+        content_type: str,
+    ) -> str:
+        """
+        Upload an uploaded or in-memory file and resolve its URL (blocking)
+        
+        Uploads that were spooled to disk are streamed in chunks from a
+        duplicate of their file descriptor instead of being read into
+        memory; in-memory files are passed as bytes (reading a BytesIO from
+        the start does not copy it).
+        """
+        source.seek(0)
+        # Same check as starlette's UploadFile: spooled files that have not
+        # rolled over to disk are still in memory
+        if getattr(source, "_rolled", True):
+            try:
+                fd = source.fileno()
+            except (AttributeError, OSError, io.UnsupportedOperation):
+                fd = None
+            if fd is not None:
+                # The duplicate shares the file offset, which is at the start
+                with open(os.dup(fd), "rb") as stream:
+                    return self._store_file(bucket, file_path, stream, content_type)
+        return self._store_file(bucket, file_path, source.read(), content_type)
+
+    def _store_file(
+        self,
+        bucket: str,
+        file_path: str,
+        file_content: Union[bytes, BinaryIO],
+        content_type: str,
+    ) -> str:
+        """
+        Upload file content and resolve its URL (blocking)
+        
+        Args:
+            bucket: Target bucket name
+            file_path: Path to file in bucket
+            file_content: File content (bytes or a binary file opened for reading)
+            content_type: MIME type of the content
+            
+        Returns:
+            Public URL, or signed URL for private buckets
+        """
+        # Upload to Supabase Storage
+        # Supabase Storage API: upload(path, file, file_options)
+        self.client.storage.from_(bucket).upload(
+            file_path,
+            file_content,
+            file_options={
+                "content-type": content_type,
+                "upsert": False,  # Don't overwrite existing files
+            },
+        )
+
+        # Get public URL
+        if bucket in ["artworks", "profiles", "spaces"]:
+            # Public buckets
+            return self.client.storage.from_(bucket).get_public_url(file_path)
+
+        # Private buckets - return signed URL (valid for 1 hour)
+        url_data = self.client.storage.from_(bucket).create_signed_url(
+            file_path,
+            expires_in=3600,
+        )
+        return url_data.get("signedURL", "")
+
     async def delete_file(
         self,
         bucket: str,
@@ -324,6 +531,40 @@ class StorageService:
                 detail=f"Failed to delete file: {error_msg}",
             )
 
+    async def delete_files(
+        self,
+        bucket: str,
+        file_paths: List[str],
+    ) -> bool:
+        """
+        Delete several files from Supabase Storage with a single request
+        
+        Args:
+            bucket: Bucket name
+            file_paths: Paths to files in bucket
+            
+        Returns:
+            True if deleted successfully
+            
+        Raises:
+            HTTPException: If deletion fails
+        """
+        if not file_paths:
+            return True
+        
+        try:
+            await asyncio.to_thread(self.client.storage.from_(bucket).remove, file_paths)
+            return True
+        except Exception as e:
+            error_msg = str(e)
+            if "not found" in error_msg.lower():
+                # Files don't exist, consider them deleted
+                return True
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to delete files: {error_msg}",
+            )
+
     def get_file_url(
         self,
         bucket: str,
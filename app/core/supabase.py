@@ -2,13 +2,74 @@
 Supabase client configuration
 """
 
+from dataclasses import fields
+
+import httpx
 from supabase import create_client, Client
 from app.core.config import settings
-from typing import Optional
+from typing import List, Optional
+
+try:
+    # Newer supabase releases split sync/async options; the sync ones accept
+    # a preconfigured httpx client
+    from supabase.lib.client_options import SyncClientOptions as ClientOptions
+except ImportError:
+    from supabase.lib.client_options import ClientOptions
+
+try:
+    from supabase import AsyncClient, acreate_client
+    ASYNC_SUPABASE_AVAILABLE = True
+except ImportError:
+    AsyncClient = None
+    acreate_client = None
+    ASYNC_SUPABASE_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401  (HTTP/2 support for httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection pool of the admin client, which serves most backend queries
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 50
+# Connection pool of the anon client, which only serves the auth endpoints
+ANON_HTTP_MAX_CONNECTIONS = 20
+ANON_HTTP_MAX_KEEPALIVE_CONNECTIONS = 10
 
 # Lazy-loaded singleton instances
 _supabase_client: Optional[Client] = None
 _supabase_admin: Optional[Client] = None
+_supabase_admin_async: Optional["AsyncClient"] = None
+# HTTP connection pools created for the clients (closed on shutdown)
+_http_clients: List[httpx.Client] = []
+
+
+def _client_options(max_connections: int, max_keepalive_connections: int) -> ClientOptions:
+    """
+    Options of a process-wide client
+    
+    The clients are shared by all requests, so they neither persist nor
+    auto-refresh user sessions: a sign-in on the shared client must not
+    start a refresh timer or outlive the request that made it.
+    
+    Where supported, each client also gets its own keep-alive HTTP/2
+    connection pool, so concurrent requests reuse connections (and multiplex
+    over them) instead of paying a TLS handshake each. Pools are not shared
+    between clients because the supabase client sets its auth headers on it.
+    """
+    options = ClientOptions(persist_session=False, auto_refresh_token=False)
+    if "httpx_client" in {field.name for field in fields(ClientOptions)}:
+        options.httpx_client = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            timeout=options.postgrest_client_timeout,
+        )
+        _http_clients.append(options.httpx_client)
+    return options
 
 
 def get_supabase_client() -> Client:
@@ -20,7 +81,11 @@ def get_supabase_client() -> Client:
     """
     global _supabase_client
     if _supabase_client is None:
-        _supabase_client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+        _supabase_client = create_client(
+            settings.SUPABASE_URL,
+            settings.SUPABASE_KEY,
+            options=_client_options(ANON_HTTP_MAX_CONNECTIONS, ANON_HTTP_MAX_KEEPALIVE_CONNECTIONS),
+        )
     return _supabase_client
 
 
@@ -33,10 +98,41 @@ def get_supabase_admin_client() -> Client:
     """
     global _supabase_admin
     if _supabase_admin is None:
-        _supabase_admin = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+        _supabase_admin = create_client(
+            settings.SUPABASE_URL,
+            settings.SUPABASE_SERVICE_ROLE_KEY,
+            options=_client_options(HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS),
+        )
     return _supabase_admin
 
 
+async def get_supabase_admin_async_client() -> Optional["AsyncClient"]:
+    """
+    Get async Supabase admin client with service role key (lazy-loaded singleton)
+    
+    Its queries are awaited on the event loop instead of blocking it (or a
+    threadpool thread) for the duration of each round-trip.
+    
+    Returns:
+        AsyncClient: Async Supabase admin client, or None if the installed
+        supabase package has no async client
+    """
+    global _supabase_admin_async
+    if _supabase_admin_async is None and ASYNC_SUPABASE_AVAILABLE:
+        _supabase_admin_async = await acreate_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return _supabase_admin_async
+
+
+def close_supabase_clients() -> None:
+    """Close the HTTP connection pools of the Supabase clients"""
+    global _supabase_client, _supabase_admin
+    for http_client in _http_clients:
+        http_client.close()
+    _http_clients.clear()
+    _supabase_client = None
+    _supabase_admin = None
+
+
 # For backward compatibility, you can also use:
 # from app.core.supabase import get_supabase_client
 # client = get_supabase_client()
@@ -0,0 +1,119 @@
+"""
+Authenticated user cache
+
+In-process TTL LRU of the users resolved from bearer tokens by
+get_current_user, so a client reusing its access token skips the Supabase
+Auth and profile round-trips on every request. Entries are keyed by a 128-bit
+BLAKE2b digest of the token (raw tokens, about 1 KB each, are not kept) and
+never outlive the token's "exp" claim. Only successfully validated tokens are
+cached.
+
+Entries are dropped when the user logs out or changes their profile through
+this worker; changes made elsewhere (other workers, the dashboard, session
+revocation) are picked up when the entry expires.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+
+TOKEN_CACHE_SIZE = 10000
+TOKEN_CACHE_TTL_SECONDS = 300
+
+
+def token_cache_key(token: str) -> bytes:
+    """Cache key of a bearer token"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+class TokenCache:
+    """TTL LRU of authenticated users by bearer token"""
+
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE, ttl: float = TOKEN_CACHE_TTL_SECONDS):
+        """
+        Initialize cache
+
+        Args:
+            maxsize: Maximum number of tokens kept in this worker
+            ttl: Maximum seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (expires_at, user_id, user), in LRU order
+        self._entries: "OrderedDict[bytes, Tuple[float, str, Any]]" = OrderedDict()
+        # user_id -> keys of the user's tokens
+        self._keys_by_user: Dict[str, Set[bytes]] = {}
+
+    def get(self, token: str) -> Optional[Any]:
+        """Return the cached user of a token if the entry has not expired"""
+        key = token_cache_key(token)
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        if item[0] <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return item[2]
+
+    def put(self, token: str, user_id: str, user: Any, expires_at: Optional[float] = None) -> None:
+        """
+        Store the user of a validated token
+
+        Args:
+            token: Bearer token
+            user_id: Authenticated user ID
+            user: Value to cache (CurrentUser)
+            expires_at: Token "exp" claim (Unix time), if known
+        """
+        ttl = self.ttl
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+
+        key = token_cache_key(token)
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, user_id, user)
+        self._keys_by_user.setdefault(user_id, set()).add(key)
+        if len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    def drop(self, token: str) -> None:
+        """Remove a token"""
+        self._remove(token_cache_key(token))
+
+    def drop_user(self, user_id: str) -> None:
+        """Remove all tokens of a user"""
+        for key in self._keys_by_user.pop(user_id, ()):
+            self._entries.pop(key, None)
+
+    def _remove(self, key: bytes) -> None:
+        """Remove an entry and its user index"""
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        keys = self._keys_by_user.get(item[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[item[1]]
+
+
+# Create singleton instance
+_token_cache: Optional[TokenCache] = None
+
+
+def get_token_cache() -> TokenCache:
+    """
+    Get authenticated user cache instance (singleton)
+
+    Returns:
+        TokenCache instance
+    """
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TokenCache()
+    return _token_cache
@@ -6,11 +6,22 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import sentry_sdk
+import asyncio
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.api.v1.router import api_router
 from app.core.logging_config import setup_logging
+from app.core.middleware import UploadLimitMiddleware
+from app.core.redis_client import close_redis
+from app.core.artwork_cache import get_artwork_cache
+from app.core.database import init_db_pool, close_db_pool
+from app.core.storage import FILE_SIZE_LIMITS, get_storage_service
+from app.core.supabase import get_supabase_client, get_supabase_admin_client, close_supabase_clients
+from app.core.image_processing import get_image_processing_service, init_image_process_pool, close_image_process_pool
+from app.core.publishing import get_publishing_batcher
+from app.ml.recommendation import get_recommendation_engine, get_recommendation_batcher
+from app.ml.space_analysis import get_space_analysis_service
 
 # Setup logging
 setup_logging()
@@ -35,15 +46,52 @@ async def lifespan(app: FastAPI):
     print(f"🔧 Debug Mode: {settings.DEBUG}")
     print(f"📍 API Version: {settings.API_VERSION}")
     
-    # TODO: Initialize ML models here
-    # TODO: Setup Redis connection pool
+    # Create the shared Supabase clients and services up front; every request
+    # reuses these singletons (and their HTTP connection pools)
+    get_image_processing_service()
+    init_image_process_pool()
+    try:
+        get_supabase_client()
+        get_supabase_admin_client()
+        get_storage_service()
+    except Exception as e:
+        # Requests retry client creation on demand
+        print(f"⚠️  Failed to create Supabase clients: {e}")
+    
+    # Direct Postgres pool for hot write paths (optional)
+    try:
+        if await init_db_pool():
+            print("🐘 Direct database pool ready")
+    except Exception as e:
+        # Those paths fall back to the Supabase client
+        print(f"⚠️  Failed to create database pool: {e}")
+    
+    # Load ML state once per worker so the first request does not pay for it
+    space_analysis = get_space_analysis_service()
+    await asyncio.to_thread(space_analysis.warm_up)
+    try:
+        await get_recommendation_engine().refresh()
+    except Exception as e:
+        # Recommendations retry the load on demand
+        print(f"⚠️  Failed to preload artwork catalog: {e}")
+    
+    # Keep this worker's artwork cache in sync with writes made by others
+    get_artwork_cache().start()
+    
     # TODO: Verify Supabase connection
     
     yield
     
     # Shutdown
     print("🛑 Shutting down Micro Gallery Japan API...")
-    # TODO: Cleanup resources
+    await get_recommendation_batcher().close()
+    await get_publishing_batcher().close()
+    await space_analysis.close()
+    await get_artwork_cache().close()
+    await close_redis()
+    await close_db_pool()
+    close_supabase_clients()
+    close_image_process_pool()
 
 
 # Create FastAPI app
@@ -114,6 +162,16 @@ def custom_openapi():
 
 app.openapi = custom_openapi
 
+# Reject oversized or non-multipart uploads before the body is parsed.
+# Added before CORSMiddleware so CORS wraps it and its 413/415 responses
+# carry the CORS headers browsers need to read them
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={
+        f"/api/{settings.API_VERSION}/ai/upload-space-image": FILE_SIZE_LIMITS["spaces"],
+    },
+)
+
 # CORS Configuration
 # Parse CORS_ORIGINS from settings (comma-separated string)
 cors_origins = [
@@ -0,0 +1,203 @@
+"""
+Color feature utilities
+
+Helpers for turning hex color strings into numeric feature vectors used by
+the recommendation engine, and for extracting palettes from image pixels.
+
+Colors are parsed once at the API boundary into packed uint32 arrays
+(0x00RRGGBB); everything downstream works on those arrays.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Palette embeddings are soft histograms over a coarse RGB grid
+# (4 levels per channel -> 64 bins)
+COLOR_LEVELS = 4
+EMBEDDING_DIM = COLOR_LEVELS ** 3
+
+_levels = (np.arange(COLOR_LEVELS, dtype=np.float32) + 0.5) / COLOR_LEVELS
+BIN_CENTERS = np.stack(
+    np.meshgrid(_levels, _levels, _levels, indexing="ij"), axis=-1
+).reshape(-1, 3)
+
+# Width of the Gaussian used to spread a color over neighbouring bins
+_SIGMA = 1.0 / COLOR_LEVELS
+_INV_TWO_SIGMA_SQ = np.float32(1.0 / (2.0 * _SIGMA * _SIGMA))
+
+# Hex digit value for every byte (-1 for bytes that are not hex digits), so
+# parsing is a table lookup instead of a generic int() parse per color
+_HEX_LUT = np.full(256, -1, dtype=np.int32)
+for _digit in "0123456789abcdef":
+    _HEX_LUT[ord(_digit)] = _HEX_LUT[ord(_digit.upper())] = int(_digit, 16)
+_HEX_SHIFTS = np.arange(20, -1, -4, dtype=np.int32)
+
+# Palette extraction quantizes pixels to 5 bits per channel (32^3 bins)
+_HIST_BITS = 5
+_HIST_SHIFT = 8 - _HIST_BITS
+_HIST_BINS = 1 << (3 * _HIST_BITS)
+_HIST_MASK = (1 << _HIST_BITS) - 1
+# Minimum distance (0-255 RGB space) between two extracted palette colors
+_MIN_PALETTE_DISTANCE = 48
+
+
+def decode_hex_colors(colors: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parse hex color strings into packed uint32 values
+
+    All well-formed colors are decoded together: their characters are
+    joined into one (k, 6) byte matrix and mapped through a hex digit lookup
+    table in a single vectorized pass.
+
+    Args:
+        colors: Colors in "#RRGGBB" or "RRGGBB" format (None allowed)
+
+    Returns:
+        (packed, valid): uint32 array of 0x00RRGGBB values aligned with
+        colors, and a boolean mask of which entries parsed successfully
+    """
+    packed = np.zeros(len(colors), dtype=np.uint32)
+    valid = np.zeros(len(colors), dtype=bool)
+
+    digits = [(color or "").strip().lstrip("#") for color in colors]
+    candidates = [i for i, d in enumerate(digits) if len(d) == 6 and d.isascii()]
+    if not candidates:
+        return packed, valid
+
+    raw = np.frombuffer(
+        "".join(digits[i] for i in candidates).encode("ascii"), dtype=np.uint8
+    ).reshape(-1, 6)
+    values = _HEX_LUT[raw]
+    ok = (values >= 0).all(axis=1)
+
+    indices = np.asarray(candidates)[ok]
+    packed[indices] = (values[ok] << _HEX_SHIFTS).sum(axis=1)
+    valid[indices] = True
+    return packed, valid
+
+
+def pack_colors(colors: Sequence[str]) -> np.ndarray:
+    """
+    Parse hex color strings into a packed uint32 array
+
+    Invalid colors are dropped.
+
+    Args:
+        colors: Hex color strings
+
+    Returns:
+        uint32 array of 0x00RRGGBB values
+    """
+    packed, valid = decode_hex_colors(colors)
+    return packed[valid]
+
+
+def unpack_rgb(packed: np.ndarray) -> np.ndarray:
+    """
+    Split packed colors into channels
+
+    Args:
+        packed: uint32 array of 0x00RRGGBB values
+
+    Returns:
+        uint8 array of shape (k, 3) with RGB channels
+    """
+    # Little-endian byte order within each value is B, G, R, 0
+    channels = np.ascontiguousarray(packed, dtype="<u4").view(np.uint8).reshape(-1, 4)
+    return channels[:, 2::-1]
+
+
+def _color_kernels(packed: np.ndarray) -> np.ndarray:
+    """Gaussian weight of every color over every bin center: (k, 64)"""
+    points = unpack_rgb(packed).astype(np.float32) / 255.0
+    distances = ((points[:, None, :] - BIN_CENTERS[None, :, :]) ** 2).sum(axis=2)
+    return np.exp(-distances * _INV_TWO_SIGMA_SQ)
+
+
+def palette_embedding(packed: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Build an L2-normalized embedding for a color palette
+
+    Args:
+        packed: uint32 array of 0x00RRGGBB colors (see pack_colors)
+
+    Returns:
+        float32 vector of length EMBEDDING_DIM, or None if the palette is empty
+    """
+    if packed.size == 0:
+        return None
+
+    embedding = _color_kernels(packed).sum(axis=0)
+    norm = np.linalg.norm(embedding)
+    if norm == 0:
+        return None
+    return (embedding / norm).astype(np.float32)
+
+
+def color_embeddings(packed: np.ndarray) -> np.ndarray:
+    """
+    Build one single-color palette embedding per color
+
+    Equivalent to calling palette_embedding on each color separately, but
+    computed for all colors in one vectorized pass.
+
+    Args:
+        packed: uint32 array of 0x00RRGGBB colors
+
+    Returns:
+        float32 matrix of shape (k, EMBEDDING_DIM) with L2-normalized rows
+    """
+    kernels = _color_kernels(packed)
+    kernels /= np.linalg.norm(kernels, axis=1, keepdims=True)
+    return kernels.astype(np.float32)
+
+
+def extract_palette(pixels: np.ndarray, count: int = 5) -> List[str]:
+    """
+    Extract the dominant colors of an image
+
+    Pixels are binned into a 32x32x32 color histogram in a single vectorized
+    pass; the most populated bins are then picked greedily, skipping bins
+    too close to a color that was already chosen.
+
+    Args:
+        pixels: uint8 array of shape (..., 3) with RGB pixels
+        count: Maximum number of colors to return
+
+    Returns:
+        List of hex color codes (e.g., "#FF5733"), most dominant first
+    """
+    rgb = pixels.reshape(-1, 3)
+    if rgb.size == 0:
+        return []
+
+    quantized = (rgb >> _HIST_SHIFT).astype(np.int32)
+    index = (quantized[:, 0] << (2 * _HIST_BITS)) | (quantized[:, 1] << _HIST_BITS) | quantized[:, 2]
+    histogram = np.bincount(index, minlength=_HIST_BINS)
+
+    # Only the most populated bins can make it into the palette
+    top = min(count * 16, _HIST_BINS - 1)
+    candidates = np.argpartition(-histogram, top)[:top]
+    candidates = candidates[np.argsort(-histogram[candidates])]
+    candidates = candidates[histogram[candidates] > 0]
+
+    half_bin = 1 << (_HIST_SHIFT - 1)
+    centers = np.stack(
+        [
+            ((candidates >> (2 * _HIST_BITS)) & _HIST_MASK) << _HIST_SHIFT,
+            ((candidates >> _HIST_BITS) & _HIST_MASK) << _HIST_SHIFT,
+            (candidates & _HIST_MASK) << _HIST_SHIFT,
+        ],
+        axis=1,
+    ) + half_bin
+
+    chosen: List[np.ndarray] = []
+    for center in centers:
+        if all(np.linalg.norm(center - other) >= _MIN_PALETTE_DISTANCE for other in chosen):
+            chosen.append(center)
+            if len(chosen) == count:
+                break
+
+    return ["#{:02X}{:02X}{:02X}".format(*(int(c) for c in color)) for color in chosen]
@@ -0,0 +1,410 @@
+"""
+Artwork Recommendation Engine
+
+Scores the published artwork catalog against a query color palette.
+
+The catalog is kept as one contiguous int8 matrix (one L2-normalized palette
+embedding per row, quantized with a per-row scale), so scoring every artwork
+is a matrix product over the catalog followed by a partial sort for the top-k.
+Rows are dequantized block by block during the scan, which moves a quarter of
+the bytes a float32 catalog would while still using the float32 BLAS kernel.
+
+Concurrent requests are coalesced by RecommendationBatcher: queries arriving
+within a few milliseconds of each other are stacked and scored together with
+one matrix-matrix product instead of one matrix-vector product each.
+
+When ENABLE_GPU is set, torch is installed and a CUDA device is available,
+catalogs of at least GPU_CATALOG_THRESHOLD artworks are also kept resident on
+the GPU as a float16 tensor and scored there; otherwise NumPy is used.
+
+Without a GPU, catalogs of at least ANN_CATALOG_THRESHOLD artworks are
+searched with a FAISS HNSW graph (approximate, sublinear per query) when
+faiss is installed. The index is persisted under ML_MODEL_PATH, keyed by a
+hash of the catalog, so a restart with an unchanged catalog skips the build.
+"""
+
+import asyncio
+import glob
+import hashlib
+import os
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core.batching import MicroBatcher
+from app.core.config import settings
+from app.core.single_flight import SingleFlight
+from app.core.supabase import get_supabase_admin_client
+from app.ml.colors import EMBEDDING_DIM, color_embeddings, decode_hex_colors
+
+
+# Seconds before the catalog is reloaded from the database
+CATALOG_TTL_SECONDS = 300
+
+# Artworks fetched per catalog request; PostgREST caps every response at its
+# max-rows setting (1000 by default), so the catalog is read page by page
+CATALOG_PAGE_SIZE = 1000
+
+# Micro-batching: how many queries to score together, and how long the
+# first query of a batch waits for others to arrive
+MAX_BATCH_SIZE = 32
+BATCH_WINDOW_SECONDS = 0.003
+
+# Rows dequantized per step of the catalog scan (8192 x 64 float32 = 2 MiB)
+SCAN_BLOCK_ROWS = 8192
+
+# HNSW graph parameters: neighbours per node, and candidate list sizes used
+# while building and searching (higher = better recall, slower)
+HNSW_NEIGHBORS = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# torch is optional; without it (or without CUDA) scoring stays on the CPU
+try:
+    import torch
+except ImportError:
+    torch = None
+
+# faiss is optional; without it large catalogs use the exact scan
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+
+def quantize_rows(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize embeddings to int8 with one symmetric scale per row
+
+    Args:
+        embeddings: float32 matrix of shape (count, dim)
+
+    Returns:
+        (quantized, scales) where embeddings ~= quantized * scales[:, None]
+    """
+    scales = np.abs(embeddings).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.round(embeddings / scales[:, None]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+class RecommendationEngine:
+    """In-memory similarity search over the published artwork catalog"""
+
+    def __init__(self):
+        """Initialize an empty catalog"""
+        self.artwork_ids: List[str] = []
+        self.quantized = np.zeros((0, EMBEDDING_DIM), dtype=np.int8)
+        self.scales = np.zeros(0, dtype=np.float32)
+        self.loaded_at: Optional[float] = None
+        # float16 copy of the embeddings on the GPU, for large catalogs only
+        self.gpu_embeddings = None
+        # FAISS HNSW index, for large catalogs when no GPU is used
+        self.ann_index = None
+        # Reload in flight, so concurrent requests finding the catalog stale
+        # share one load
+        self._reloads: SingleFlight[str, None] = SingleFlight()
+
+    @property
+    def gpu_available(self) -> bool:
+        """Whether GPU scoring is enabled and a CUDA device is present"""
+        return settings.ENABLE_GPU and torch is not None and torch.cuda.is_available()
+
+    @property
+    def is_stale(self) -> bool:
+        """Whether the catalog needs to be (re)loaded"""
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > CATALOG_TTL_SECONDS
+
+    async def refresh(self) -> None:
+        """Reload the catalog in a thread if it is stale"""
+        if self.is_stale:
+            await self._reloads.run("catalog", lambda: asyncio.to_thread(self.load_catalog))
+
+    def load_catalog(self) -> None:
+        """
+        Load published artworks and build the embedding matrix (blocking)
+        """
+        admin_client = get_supabase_admin_client()
+        artworks = []
+        # Pages are ordered by ID so none is skipped or repeated; reading
+        # until an empty page also works if max-rows is below the page size
+        while True:
+            response = (
+                admin_client.table("artworks")
+                .select("id, dominant_color")
+                .eq("status", "published")
+                .order("id")
+                .range(len(artworks), len(artworks) + CATALOG_PAGE_SIZE - 1)
+                .execute()
+            )
+            if not response.data:
+                break
+            artworks.extend(response.data)
+
+        # Parse every dominant color to a packed uint32 at once, then embed
+        # the whole catalog in one vectorized pass
+        packed, valid = decode_hex_colors([a.get("dominant_color") for a in artworks])
+        artwork_ids = [a["id"] for a, ok in zip(artworks, valid) if ok]
+
+        if artwork_ids:
+            embeddings = color_embeddings(packed[valid])
+        else:
+            embeddings = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+
+        self.set_catalog(artwork_ids, embeddings)
+
+    def set_catalog(self, artwork_ids: List[str], embeddings: np.ndarray) -> None:
+        """
+        Replace the catalog
+
+        Rows are L2-normalized here, once per load, so that every scoring
+        path (int8 scan, GPU, HNSW inner product) is a plain dot product
+        that equals cosine similarity for normalized queries.
+
+        Args:
+            artwork_ids: Artwork ID for each embedding row
+            embeddings: float32 matrix of embeddings
+        """
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        embeddings = np.ascontiguousarray(embeddings / norms, dtype=np.float32)
+
+        quantized, scales = quantize_rows(embeddings)
+
+        gpu_embeddings = None
+        ann_index = None
+        if len(artwork_ids) >= settings.GPU_CATALOG_THRESHOLD and self.gpu_available:
+            gpu_embeddings = torch.from_numpy(embeddings).half().cuda()
+        elif len(artwork_ids) >= settings.ANN_CATALOG_THRESHOLD and faiss is not None:
+            ann_index = self._load_or_build_ann_index(artwork_ids, embeddings)
+
+        # Swap all references at once so concurrent readers never see a
+        # mismatched ids/embeddings pair
+        (
+            self.artwork_ids,
+            self.quantized,
+            self.scales,
+            self.gpu_embeddings,
+            self.ann_index,
+        ) = (artwork_ids, quantized, scales, gpu_embeddings, ann_index)
+        self.loaded_at = time.monotonic()
+
+    def _load_or_build_ann_index(self, artwork_ids: List[str], embeddings: np.ndarray):
+        """
+        Load the HNSW index for this catalog from disk, or build and save it
+
+        Args:
+            artwork_ids: Artwork ID for each embedding row
+            embeddings: float32 matrix of L2-normalized embeddings
+
+        Returns:
+            faiss.IndexHNSWFlat using the inner-product metric
+        """
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update("\n".join(artwork_ids).encode())
+        hasher.update(embeddings.tobytes())
+        index_path = os.path.join(settings.ML_MODEL_PATH, f"artwork-hnsw-{hasher.hexdigest()}.faiss")
+
+        if os.path.exists(index_path):
+            index = faiss.read_index(index_path)
+        else:
+            index = faiss.IndexHNSWFlat(EMBEDDING_DIM, HNSW_NEIGHBORS, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            index.add(np.ascontiguousarray(embeddings, dtype=np.float32))
+            try:
+                # Replace the index of the previous catalog
+                for old_path in glob.glob(os.path.join(settings.ML_MODEL_PATH, "artwork-hnsw-*.faiss")):
+                    os.remove(old_path)
+                faiss.write_index(index, index_path)
+            except OSError:
+                # Persisting is only an optimization for the next start
+                pass
+
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        return index
+
+    def recommend(self, query: np.ndarray, limit: int) -> List[Tuple[str, float]]:
+        """
+        Find the catalog artworks most similar to a query embedding
+
+        Args:
+            query: L2-normalized query embedding
+            limit: Maximum number of results
+
+        Returns:
+            List of (artwork_id, score) tuples, best match first
+        """
+        return self.recommend_many([query], [limit])[0]
+
+    def recommend_many(
+        self,
+        queries: List[np.ndarray],
+        limits: List[int],
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Find the most similar artworks for a batch of query embeddings
+
+        Args:
+            queries: L2-normalized query embeddings
+            limits: Maximum number of results for each query
+
+        Returns:
+            One list of (artwork_id, score) tuples per query, best match first
+        """
+        artwork_ids, quantized, scales, gpu_embeddings, ann_index = (
+            self.artwork_ids,
+            self.quantized,
+            self.scales,
+            self.gpu_embeddings,
+            self.ann_index,
+        )
+        count = len(artwork_ids)
+        k = min(max(limits), count)
+        if k <= 0:
+            return [[] for _ in queries]
+
+        if gpu_embeddings is not None:
+            return self._recommend_many_gpu(gpu_embeddings, artwork_ids, queries, limits, k)
+        if ann_index is not None:
+            return self._recommend_many_ann(ann_index, artwork_ids, queries, limits, k)
+
+        # Rows are normalized, so the matrix product gives the cosine
+        # similarity of every artwork for every query: (batch, count)
+        batch = np.stack(queries)
+        scores = np.empty((len(queries), count), dtype=np.float32)
+        for start in range(0, count, SCAN_BLOCK_ROWS):
+            end = start + SCAN_BLOCK_ROWS
+            block = quantized[start:end].astype(np.float32)
+            np.multiply(batch @ block.T, scales[start:end], out=scores[:, start:end])
+
+        if k < count:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(count), (len(queries), count))
+
+        results = []
+        for row, limit in enumerate(limits):
+            row_top = top[row]
+            row_scores = scores[row, row_top]
+            order = np.argsort(-row_scores)[: max(limit, 0)]
+            results.append(
+                [(artwork_ids[row_top[i]], float(row_scores[i])) for i in order]
+            )
+        return results
+
+    def _recommend_many_gpu(
+        self,
+        gpu_embeddings,
+        artwork_ids: List[str],
+        queries: List[np.ndarray],
+        limits: List[int],
+        k: int,
+    ) -> List[List[Tuple[str, float]]]:
+        """Score a batch of queries against the GPU-resident catalog"""
+        batch = torch.from_numpy(np.stack(queries)).half().cuda()
+        scores = batch @ gpu_embeddings.T
+        values, indices = torch.topk(scores, k, dim=1)
+        values, indices = values.float().cpu().numpy(), indices.cpu().numpy()
+
+        return [
+            [
+                (artwork_ids[index], float(score))
+                for index, score in zip(indices[row, :limit], values[row, :limit])
+            ]
+            for row, limit in enumerate(max(limit, 0) for limit in limits)
+        ]
+
+    def _recommend_many_ann(
+        self,
+        ann_index,
+        artwork_ids: List[str],
+        queries: List[np.ndarray],
+        limits: List[int],
+        k: int,
+    ) -> List[List[Tuple[str, float]]]:
+        """Search a batch of queries in the HNSW index"""
+        batch = np.ascontiguousarray(np.stack(queries), dtype=np.float32)
+        scores, indices = ann_index.search(batch, k)
+
+        # The graph search can come back with fewer than k hits, padded with -1
+        return [
+            [
+                (artwork_ids[index], float(score))
+                for index, score in zip(indices[row, :limit], scores[row, :limit])
+                if index >= 0
+            ]
+            for row, limit in enumerate(max(limit, 0) for limit in limits)
+        ]
+
+
+class RecommendationBatcher(MicroBatcher[Tuple[np.ndarray, int], List[Tuple[str, float]]]):
+    """
+    Coalesces concurrent recommendation queries into batches
+
+    Each request enqueues its query and awaits a future; a background task
+    collects up to MAX_BATCH_SIZE queries within BATCH_WINDOW_SECONDS and
+    scores them in one call to RecommendationEngine.recommend_many.
+    """
+
+    def __init__(self, engine: RecommendationEngine):
+        """
+        Initialize batcher
+
+        Args:
+            engine: Engine used to score batches
+        """
+        super().__init__(MAX_BATCH_SIZE, BATCH_WINDOW_SECONDS)
+        self.engine = engine
+
+    async def recommend(self, query: np.ndarray, limit: int) -> List[Tuple[str, float]]:
+        """
+        Score a query as part of the next batch
+
+        Args:
+            query: L2-normalized query embedding
+            limit: Maximum number of results
+
+        Returns:
+            List of (artwork_id, score) tuples, best match first
+        """
+        return await self.submit((query, limit))
+
+    async def execute_batch(self, items: List[Tuple[np.ndarray, int]]) -> List[List[Tuple[str, float]]]:
+        """Score a batch of queries with one matrix product"""
+        return await asyncio.to_thread(
+            self.engine.recommend_many,
+            [query for query, _ in items],
+            [limit for _, limit in items],
+        )
+
+
+# Create singleton instances
+_recommendation_engine: Optional[RecommendationEngine] = None
+_recommendation_batcher: Optional[RecommendationBatcher] = None
+
+
+def get_recommendation_engine() -> RecommendationEngine:
+    """
+    Get recommendation engine instance (singleton)
+
+    Returns:
+        RecommendationEngine instance
+    """
+    global _recommendation_engine
+    if _recommendation_engine is None:
+        _recommendation_engine = RecommendationEngine()
+    return _recommendation_engine
+
+
+def get_recommendation_batcher() -> RecommendationBatcher:
+    """
+    Get recommendation batcher instance (singleton)
+
+    Returns:
+        RecommendationBatcher bound to the shared RecommendationEngine
+    """
+    global _recommendation_batcher
+    if _recommendation_batcher is None:
+        _recommendation_batcher = RecommendationBatcher(get_recommendation_engine())
+    return _recommendation_batcher
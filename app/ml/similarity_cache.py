@@ -0,0 +1,88 @@
+"""
+Similarity LRU cache
+
+An in-process cache keyed by feature vectors instead of exact keys: a lookup
+hits when a stored key lies within a distance threshold of the query, so
+near-duplicate inputs reuse an earlier result.
+"""
+
+from typing import Any, List, Optional
+
+import numpy as np
+
+
+class SimilarityLRUCache:
+    """
+    Approximate-match cache with least-recently-used eviction
+
+    Keys live in one (capacity, dim) float32 matrix so a lookup is a single
+    vectorized distance computation. The cache is not thread-safe; it is
+    meant to be used from the event loop, where get/put never interleave.
+    """
+
+    def __init__(self, capacity: int, dim: int, threshold: float):
+        """
+        Initialize cache
+
+        Args:
+            capacity: Maximum number of entries
+            dim: Key vector dimension
+            threshold: Maximum L2 distance for a lookup to count as a hit
+        """
+        self.capacity = capacity
+        self.threshold = threshold
+        self.keys = np.zeros((capacity, dim), dtype=np.float32)
+        self.values: List[Any] = [None] * capacity
+        # Logical clock of the last access per slot (for LRU eviction)
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.size = 0
+        self._clock = 0
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def get(self, key: np.ndarray) -> Optional[Any]:
+        """
+        Look up the value stored under the nearest key
+
+        Args:
+            key: Query vector
+
+        Returns:
+            Cached value, or None if no key is within the threshold
+        """
+        if self.size == 0:
+            return None
+
+        distances = np.linalg.norm(self.keys[: self.size] - key, axis=1)
+        slot = int(distances.argmin())
+        if distances[slot] > self.threshold:
+            return None
+
+        self.last_used[slot] = self._tick()
+        return self.values[slot]
+
+    def put(self, key: np.ndarray, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry when full
+
+        Args:
+            key: Key vector
+            value: Value to cache
+        """
+        if self.size < self.capacity:
+            slot = self.size
+            self.size += 1
+        else:
+            slot = int(self.last_used.argmin())
+
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.last_used[slot] = self._tick()
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        self.values = [None] * self.capacity
+        self.last_used[:] = 0
+        self.size = 0
@@ -0,0 +1,241 @@
+"""
+Space Analysis Service
+
+Fetches a space photo from Supabase Storage and derives the attributes used
+for artwork matching (dominant colors, lighting, style, mood).
+
+Results are cached at two levels: an exact LRU keyed by a hash of the image
+URL, which skips the download entirely for repeated URLs (space uploads are
+content-addressed, so a URL always names the same bytes), and a similarity
+LRU keyed by a small perceptual embedding of the image, so re-uploads and
+near-duplicate photos of the same space skip the analysis step.
+"""
+
+import asyncio
+import hashlib
+import io
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import httpx
+import numpy as np
+import orjson
+from PIL import Image
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.ml.colors import extract_palette
+from app.ml.similarity_cache import SimilarityLRUCache
+
+
+# Perceptual embedding: the image downscaled to an 8x8 RGB grid
+EMBEDDING_GRID = 8
+EMBEDDING_DIM = EMBEDDING_GRID * EMBEDDING_GRID * 3
+
+# Embeddings are scaled so their L2 distance is the RMS pixel difference;
+# 0.03 is roughly 8/255 per channel, well above JPEG re-encoding noise
+SIMILARITY_THRESHOLD = 0.03
+SIMILARITY_CACHE_SIZE = 4096
+URL_CACHE_SIZE = 10000
+
+FETCH_TIMEOUT_SECONDS = 10.0
+
+# Analysis works on a downscaled copy of the photo
+ANALYSIS_MAX_DIMENSION = 256
+PALETTE_SIZE = 5
+
+
+class SpaceAnalysisService:
+    """Service for analyzing space photos"""
+
+    def __init__(self):
+        """Initialize space analysis service"""
+        self.cache = SimilarityLRUCache(
+            capacity=SIMILARITY_CACHE_SIZE,
+            dim=EMBEDDING_DIM,
+            threshold=SIMILARITY_THRESHOLD,
+        )
+        # Exact-match cache: URL digest -> JSON body, in LRU order
+        self.url_cache: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._storage_url = f"{settings.SUPABASE_URL.rstrip('/')}/storage/v1/object/"
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Shared HTTP client for fetching images"""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(timeout=FETCH_TIMEOUT_SECONDS)
+        return self._http_client
+
+    async def fetch_image(self, image_url: str) -> bytes:
+        """
+        Download a space image from Supabase Storage
+
+        Only URLs in this project's storage are accepted so the endpoint
+        cannot be used to make requests to arbitrary hosts.
+
+        Args:
+            image_url: Storage URL of the image
+
+        Returns:
+            Raw image bytes
+
+        Raises:
+            HTTPException: If the URL is not allowed or the download fails
+        """
+        if not image_url.startswith(self._storage_url):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Space image URL must point to Supabase Storage",
+            )
+
+        try:
+            async with self.http_client.stream("GET", image_url) as response:
+                response.raise_for_status()
+                content = bytearray()
+                async for chunk in response.aiter_bytes():
+                    content.extend(chunk)
+                    if len(content) > settings.MAX_FILE_SIZE:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail="Space image is too large",
+                        )
+                return bytes(content)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Failed to fetch space image: {str(e)}",
+            )
+
+    def decode_image(self, content: bytes) -> Image.Image:
+        """
+        Decode image bytes into an RGB PIL image
+
+        Raises:
+            HTTPException: If the content is not a valid image
+        """
+        try:
+            image = Image.open(io.BytesIO(content))
+            image.load()
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid image file: {str(e)}",
+            )
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        return image
+
+    def perceptual_embedding(self, image: Image.Image) -> np.ndarray:
+        """
+        Compute a low-dimensional perceptual embedding of an image
+
+        Args:
+            image: RGB PIL image
+
+        Returns:
+            float32 vector of length EMBEDDING_DIM
+        """
+        small = image.resize((EMBEDDING_GRID, EMBEDDING_GRID), Image.Resampling.BILINEAR)
+        pixels = np.asarray(small, dtype=np.float32).reshape(-1)
+        return pixels / (255.0 * np.sqrt(EMBEDDING_DIM, dtype=np.float32))
+
+    def analyze_image(self, image: Image.Image) -> Dict[str, Any]:
+        """
+        Analyze a space image
+
+        TODO: Implement remaining space analysis
+        - Lighting detection
+        - Style classification
+
+        Args:
+            image: RGB PIL image
+
+        Returns:
+            Dict matching SpaceAnalysisResponse
+        """
+        # Color statistics are stable under downscaling, so work on a
+        # bounded-size copy instead of every pixel of the original photo
+        sample = image.copy()
+        sample.thumbnail((ANALYSIS_MAX_DIMENSION, ANALYSIS_MAX_DIMENSION))
+        pixels = np.asarray(sample, dtype=np.uint8)
+
+        return {
+            "dominant_colors": extract_palette(pixels, count=PALETTE_SIZE),
+            "lighting": "bright",
+            "style": "modern",
+            "mood": "calm",
+            "confidence": 0.85,
+        }
+
+    def warm_up(self) -> None:
+        """
+        Run one analysis on a synthetic image (blocking)
+
+        Loads the PIL format plugins and exercises the resize and histogram
+        code paths so the first real request does not pay for them.
+        """
+        Image.init()
+        image = Image.new("RGB", (64, 64), (128, 128, 128))
+        self.perceptual_embedding(image)
+        self.analyze_image(image)
+
+    async def close(self) -> None:
+        """Close the shared HTTP client"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    def _prepare(self, content: bytes) -> tuple:
+        """Decode an image and compute its embedding (blocking)"""
+        image = self.decode_image(content)
+        return image, self.perceptual_embedding(image)
+
+    async def analyze_url(self, image_url: str) -> bytes:
+        """
+        Analyze the image at a storage URL
+
+        Args:
+            image_url: Storage URL of the space image
+
+        Returns:
+            JSON-encoded SpaceAnalysisResponse body
+        """
+        url_key = hashlib.blake2b(image_url.encode(), digest_size=16).digest()
+        body = self.url_cache.get(url_key)
+        if body is not None:
+            self.url_cache.move_to_end(url_key)
+            return body
+
+        content = await self.fetch_image(image_url)
+        image, embedding = await asyncio.to_thread(self._prepare, content)
+
+        body = self.cache.get(embedding)
+        if body is None:
+            analysis = await asyncio.to_thread(self.analyze_image, image)
+            body = orjson.dumps(analysis)
+            self.cache.put(embedding, body)
+
+        self.url_cache[url_key] = body
+        if len(self.url_cache) > URL_CACHE_SIZE:
+            self.url_cache.popitem(last=False)
+        return body
+
+
+# Create singleton instance
+_space_analysis_service: Optional[SpaceAnalysisService] = None
+
+
+def get_space_analysis_service() -> SpaceAnalysisService:
+    """
+    Get space analysis service instance (singleton)
+
+    Returns:
+        SpaceAnalysisService instance
+    """
+    global _space_analysis_service
+    if _space_analysis_service is None:
+        _space_analysis_service = SpaceAnalysisService()
+    return _space_analysis_service
@@ -0,0 +1,20 @@
+-- Migration: Create increment_artwork_views function
+-- Created: 2026-01-19
+-- Description: Atomic view counter increment for the artwork detail API
+
+BEGIN;
+
+-- Increments view_count in a single UPDATE, so concurrent views are never
+-- lost and the API needs no read-modify-write round-trip
+CREATE OR REPLACE FUNCTION increment_artwork_views(p_id UUID)
+RETURNS INTEGER AS $$
+    UPDATE artworks
+    SET view_count = COALESCE(view_count, 0) + 1
+    WHERE id = p_id
+    RETURNING view_count;
+$$ LANGUAGE sql;
+
+-- Only the backend (service role) may call it
+REVOKE EXECUTE ON FUNCTION increment_artwork_views(UUID) FROM PUBLIC, anon, authenticated;
+
+COMMIT;
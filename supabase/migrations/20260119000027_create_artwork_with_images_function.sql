@@ -0,0 +1,49 @@
+-- Migration: Create create_artwork_with_images function
+-- Created: 2026-01-19
+-- Description: Atomic artwork + images insert for the artwork creation API
+
+BEGIN;
+
+-- Inserts an artwork and its images in one transaction, so a failed image
+-- insert never leaves a half-created artwork behind, and the API needs a
+-- single round-trip. Returns the artwork row with its images embedded under
+-- "artwork_images" (same shape as a PostgREST embed).
+CREATE OR REPLACE FUNCTION create_artwork_with_images(p_artwork JSONB, p_images JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    v_artwork artworks;
+    v_images JSONB;
+BEGIN
+    INSERT INTO artworks (
+        custom_id, artist_id, title, description, story, price, lease_price,
+        dimensions, size_class, year, medium, support, weight, has_frame,
+        coating, status, main_image_url, thumbnail_urls, dominant_color,
+        packaging_info, maintenance_info
+    )
+    SELECT
+        a.custom_id, a.artist_id, a.title, a.description, a.story, a.price, a.lease_price,
+        a.dimensions, a.size_class, a.year, a.medium, a.support, a.weight,
+        COALESCE(a.has_frame, false), a.coating, COALESCE(a.status, 'draft'),
+        a.main_image_url, a.thumbnail_urls, a.dominant_color,
+        a.packaging_info, a.maintenance_info
+    FROM jsonb_populate_record(NULL::artworks, p_artwork) AS a
+    RETURNING * INTO v_artwork;
+
+    WITH inserted AS (
+        INSERT INTO artwork_images (artwork_id, image_url, image_order, is_main, alt_text)
+        SELECT v_artwork.id, i.image_url, COALESCE(i.image_order, 0), COALESCE(i.is_main, false), i.alt_text
+        FROM jsonb_populate_recordset(NULL::artwork_images, COALESCE(p_images, '[]'::JSONB)) AS i
+        RETURNING *
+    )
+    SELECT COALESCE(jsonb_agg(to_jsonb(inserted) ORDER BY inserted.image_order), '[]'::JSONB)
+    INTO v_images
+    FROM inserted;
+
+    RETURN to_jsonb(v_artwork) || jsonb_build_object('artwork_images', v_images);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the backend (service role) may call it
+REVOKE EXECUTE ON FUNCTION create_artwork_with_images(JSONB, JSONB) FROM PUBLIC, anon, authenticated;
+
+COMMIT;
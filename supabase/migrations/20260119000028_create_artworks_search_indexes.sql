@@ -0,0 +1,20 @@
+-- Migration: Create trigram search indexes on artworks
+-- Created: 2026-01-19
+-- Description: Index the substring (ILIKE '%...%') search of the artwork listing API
+
+BEGIN;
+
+-- Trigram indexes let ILIKE '%term%' use an index instead of scanning the
+-- whole table. Full-text search (tsvector) is not used because titles and
+-- descriptions are mostly Japanese, which has no spaces between words, so
+-- word-based matching would miss substring matches the API returns today.
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA extensions;
+
+CREATE INDEX IF NOT EXISTS idx_artworks_title_trgm
+    ON artworks USING gin (title extensions.gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_artworks_description_trgm
+    ON artworks USING gin (description extensions.gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_artworks_medium_trgm
+    ON artworks USING gin (medium extensions.gin_trgm_ops);
+
+COMMIT;
@@ -0,0 +1,110 @@
+-- Migration: Create artwork publishing functions
+-- Created: 2026-01-19
+-- Description: Single-call publish/unpublish for the artwork publishing API
+
+BEGIN;
+
+-- Artwork row with its artist and images embedded under the same keys a
+-- PostgREST select("*, artists(...), artwork_images(...)") would use
+CREATE OR REPLACE FUNCTION artwork_with_relations(p_artwork artworks)
+RETURNS JSONB AS $$
+    SELECT to_jsonb(p_artwork) || jsonb_build_object(
+        'artists', (
+            SELECT jsonb_build_object('id', ar.id, 'name', ar.name, 'profile_image_url', ar.profile_image_url)
+            FROM artists ar
+            WHERE ar.id = p_artwork.artist_id
+        ),
+        'artwork_images', COALESCE((
+            SELECT jsonb_agg(
+                jsonb_build_object(
+                    'id', ai.id,
+                    'image_url', ai.image_url,
+                    'image_order', ai.image_order,
+                    'is_main', ai.is_main,
+                    'alt_text', ai.alt_text
+                )
+                ORDER BY ai.image_order
+            )
+            FROM artwork_images ai
+            WHERE ai.artwork_id = p_artwork.id
+        ), '[]'::JSONB)
+    );
+$$ LANGUAGE sql STABLE;
+
+-- Ownership, completeness and status checks run against the locked row, so
+-- there is no read-then-update race and the API needs one round-trip.
+-- Failures raise P0001 with a machine-readable message:
+--   NOT_FOUND, FORBIDDEN, MISSING_FIELDS (DETAIL lists the fields),
+--   ALREADY_PUBLISHED
+CREATE OR REPLACE FUNCTION publish_artwork(p_id UUID, p_user UUID)
+RETURNS JSONB AS $$
+DECLARE
+    v_artwork artworks;
+    v_missing TEXT[];
+BEGIN
+    SELECT * INTO v_artwork FROM artworks WHERE id = p_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'NOT_FOUND' USING ERRCODE = 'P0001';
+    END IF;
+
+    IF v_artwork.artist_id <> p_user THEN
+        RAISE EXCEPTION 'FORBIDDEN' USING ERRCODE = 'P0001';
+    END IF;
+
+    v_missing := array_remove(ARRAY[
+        CASE WHEN COALESCE(v_artwork.title, '') = '' THEN 'title' END,
+        CASE WHEN COALESCE(v_artwork.price, 0) = 0 THEN 'price' END,
+        CASE WHEN COALESCE(v_artwork.main_image_url, '') = '' THEN 'main_image_url' END
+    ], NULL);
+    IF cardinality(v_missing) > 0 THEN
+        RAISE EXCEPTION 'MISSING_FIELDS' USING ERRCODE = 'P0001', DETAIL = array_to_string(v_missing, ', ');
+    END IF;
+
+    IF v_artwork.status = 'published' THEN
+        RAISE EXCEPTION 'ALREADY_PUBLISHED' USING ERRCODE = 'P0001';
+    END IF;
+
+    UPDATE artworks
+    SET status = 'published', published_at = NOW()
+    WHERE id = p_id
+    RETURNING * INTO v_artwork;
+
+    RETURN artwork_with_relations(v_artwork);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Same contract as publish_artwork; raises NOT_FOUND, FORBIDDEN or
+-- ALREADY_DRAFT
+CREATE OR REPLACE FUNCTION unpublish_artwork(p_id UUID, p_user UUID)
+RETURNS JSONB AS $$
+DECLARE
+    v_artwork artworks;
+BEGIN
+    SELECT * INTO v_artwork FROM artworks WHERE id = p_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'NOT_FOUND' USING ERRCODE = 'P0001';
+    END IF;
+
+    IF v_artwork.artist_id <> p_user THEN
+        RAISE EXCEPTION 'FORBIDDEN' USING ERRCODE = 'P0001';
+    END IF;
+
+    IF v_artwork.status = 'draft' THEN
+        RAISE EXCEPTION 'ALREADY_DRAFT' USING ERRCODE = 'P0001';
+    END IF;
+
+    UPDATE artworks
+    SET status = 'draft'
+    WHERE id = p_id
+    RETURNING * INTO v_artwork;
+
+    RETURN artwork_with_relations(v_artwork);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the backend (service role) may call them
+REVOKE EXECUTE ON FUNCTION artwork_with_relations(artworks) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION publish_artwork(UUID, UUID) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION unpublish_artwork(UUID, UUID) FROM PUBLIC, anon, authenticated;
+
+COMMIT;
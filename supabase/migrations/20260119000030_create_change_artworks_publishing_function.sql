@@ -0,0 +1,51 @@
+-- Migration: Create change_artworks_publishing function
+-- Created: 2026-01-19
+-- Description: Batched publish/unpublish for concurrent publishing requests
+
+BEGIN;
+
+-- Applies a batch of publish/unpublish requests in one call.
+-- p_requests: [{"action": "publish" | "unpublish", "id": <uuid>, "user": <uuid>}, ...]
+-- Returns one result per request, in order: {"artwork": <artwork_with_relations>}
+-- on success, or {"code": <SQLSTATE>, "message": ..., "details": ...} on
+-- failure. Each request runs in its own subtransaction, so one failure does
+-- not affect the others.
+CREATE OR REPLACE FUNCTION change_artworks_publishing(p_requests JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    v_request JSONB;
+    v_results JSONB := '[]'::JSONB;
+    v_artwork JSONB;
+    v_code TEXT;
+    v_message TEXT;
+    v_details TEXT;
+BEGIN
+    FOR v_request IN SELECT value FROM jsonb_array_elements(p_requests) LOOP
+        BEGIN
+            IF v_request->>'action' = 'publish' THEN
+                v_artwork := publish_artwork((v_request->>'id')::UUID, (v_request->>'user')::UUID);
+            ELSE
+                v_artwork := unpublish_artwork((v_request->>'id')::UUID, (v_request->>'user')::UUID);
+            END IF;
+            v_results := v_results || jsonb_build_array(jsonb_build_object('artwork', v_artwork));
+        EXCEPTION WHEN OTHERS THEN
+            GET STACKED DIAGNOSTICS
+                v_code = RETURNED_SQLSTATE,
+                v_message = MESSAGE_TEXT,
+                v_details = PG_EXCEPTION_DETAIL;
+            v_results := v_results || jsonb_build_array(jsonb_build_object(
+                'code', v_code,
+                'message', v_message,
+                'details', NULLIF(v_details, '')
+            ));
+        END;
+    END LOOP;
+
+    RETURN v_results;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the backend (service role) may call it
+REVOKE EXECUTE ON FUNCTION change_artworks_publishing(JSONB) FROM PUBLIC, anon, authenticated;
+
+COMMIT;
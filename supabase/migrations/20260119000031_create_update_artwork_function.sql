@@ -0,0 +1,56 @@
+-- Migration: Create update_artwork_with_relations function
+-- Created: 2026-01-19
+-- Description: Single-call artwork update for the artwork update API
+
+BEGIN;
+
+-- Applies the keys present in p_changes to the locked artwork row after
+-- checking ownership, and returns the updated row with its artist and images
+-- embedded (see artwork_with_relations), so the API needs one round-trip
+-- instead of ownership check + update + artist + images.
+-- Failures raise P0001 with a machine-readable message: NOT_FOUND, FORBIDDEN
+CREATE OR REPLACE FUNCTION update_artwork_with_relations(p_id UUID, p_user UUID, p_changes JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    v_artwork artworks;
+    v_changed artworks;
+BEGIN
+    SELECT * INTO v_artwork FROM artworks WHERE id = p_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'NOT_FOUND' USING ERRCODE = 'P0001';
+    END IF;
+
+    IF v_artwork.artist_id <> p_user THEN
+        RAISE EXCEPTION 'FORBIDDEN' USING ERRCODE = 'P0001';
+    END IF;
+
+    -- Columns missing from p_changes keep their current value
+    v_changed := jsonb_populate_record(v_artwork, p_changes);
+
+    UPDATE artworks
+    SET title = v_changed.title,
+        description = v_changed.description,
+        story = v_changed.story,
+        price = v_changed.price,
+        lease_price = v_changed.lease_price,
+        dimensions = v_changed.dimensions,
+        size_class = v_changed.size_class,
+        year = v_changed.year,
+        medium = v_changed.medium,
+        support = v_changed.support,
+        weight = v_changed.weight,
+        has_frame = v_changed.has_frame,
+        coating = v_changed.coating,
+        packaging_info = v_changed.packaging_info,
+        maintenance_info = v_changed.maintenance_info
+    WHERE id = p_id
+    RETURNING * INTO v_artwork;
+
+    RETURN artwork_with_relations(v_artwork);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the backend (service role) may call it
+REVOKE EXECUTE ON FUNCTION update_artwork_with_relations(UUID, UUID, JSONB) FROM PUBLIC, anon, authenticated;
+
+COMMIT;
@@ -0,0 +1,106 @@
+-- Migration: Create profile on signup trigger
+-- Created: 2026-01-19
+-- Description: Creates the role profile in the same transaction as the auth user
+
+BEGIN;
+
+-- The signup API passes the profile in the user metadata of sign_up
+-- ({"user_type": ..., "name": ..., "profile": {...}}). Creating it here
+-- instead of with a second request after sign_up saves a round-trip, and a
+-- failing profile insert rolls back the auth user, so no auth user is left
+-- without a profile. Users created without "profile" in their metadata
+-- (legacy signup, dashboard, admin API) are not touched.
+-- Status columns keep their defaults; metadata is client-supplied, and
+-- anyone with the anon key can call sign_up directly, so the required
+-- fields are checked here rather than trusted from the API. The profile is
+-- removed from the metadata afterwards, so it is not copied into every JWT.
+CREATE OR REPLACE FUNCTION create_profile_for_new_user()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_profile JSONB := NEW.raw_user_meta_data->'profile';
+    v_missing TEXT[];
+BEGIN
+    IF v_profile IS NULL THEN
+        RETURN NEW;
+    END IF;
+    IF jsonb_typeof(v_profile) <> 'object' THEN
+        RAISE EXCEPTION 'INVALID_PROFILE' USING ERRCODE = 'P0001';
+    END IF;
+
+    v_missing := array_remove(
+        CASE NEW.raw_user_meta_data->>'user_type'
+            WHEN 'artist' THEN ARRAY[
+                CASE WHEN COALESCE(btrim(v_profile->>'name'), '') = '' THEN 'name' END,
+                CASE WHEN v_profile->'agreement_copyright' IS DISTINCT FROM 'true'::JSONB THEN 'agreement_copyright' END,
+                CASE WHEN v_profile->'agreement_ai' IS DISTINCT FROM 'true'::JSONB THEN 'agreement_ai' END,
+                CASE WHEN v_profile->'agreement_commercial' IS DISTINCT FROM 'true'::JSONB THEN 'agreement_commercial' END,
+                CASE WHEN v_profile->'agreement_report' IS DISTINCT FROM 'true'::JSONB THEN 'agreement_report' END
+            ]
+            WHEN 'customer' THEN ARRAY[
+                CASE WHEN COALESCE(btrim(v_profile->>'name'), '') = '' THEN 'name' END
+            ]
+            WHEN 'corporate' THEN ARRAY[
+                CASE WHEN COALESCE(btrim(v_profile->>'company_name'), '') = '' THEN 'company_name' END,
+                CASE WHEN COALESCE(btrim(v_profile->>'contact_name'), '') = '' THEN 'contact_name' END
+            ]
+            ELSE ARRAY[]::TEXT[]
+        END,
+        NULL
+    );
+    IF cardinality(v_missing) > 0 THEN
+        RAISE EXCEPTION 'MISSING_FIELDS' USING ERRCODE = 'P0001', DETAIL = array_to_string(v_missing, ', ');
+    END IF;
+
+    CASE NEW.raw_user_meta_data->>'user_type'
+        WHEN 'artist' THEN
+            INSERT INTO public.artists (
+                id, name, email, birth_date, phone,
+                agreement_copyright, agreement_ai, agreement_commercial, agreement_report
+            )
+            VALUES (
+                NEW.id,
+                v_profile->>'name',
+                NEW.email,
+                (v_profile->>'birth_date')::DATE,
+                v_profile->>'phone',
+                (v_profile->>'agreement_copyright')::BOOLEAN,
+                (v_profile->>'agreement_ai')::BOOLEAN,
+                (v_profile->>'agreement_commercial')::BOOLEAN,
+                (v_profile->>'agreement_report')::BOOLEAN
+            );
+        WHEN 'customer' THEN
+            INSERT INTO public.customers (id, name, email)
+            VALUES (NEW.id, v_profile->>'name', NEW.email);
+        WHEN 'corporate' THEN
+            INSERT INTO public.corporates (id, company_name, contact_name, email, postal_code, address, phone)
+            VALUES (
+                NEW.id,
+                v_profile->>'company_name',
+                v_profile->>'contact_name',
+                NEW.email,
+                v_profile->>'postal_code',
+                v_profile->>'address',
+                v_profile->>'phone'
+            );
+        ELSE
+            RAISE EXCEPTION 'UNKNOWN_USER_TYPE' USING ERRCODE = 'P0001';
+    END CASE;
+
+    -- AFTER INSERT only, so this update does not fire the trigger again
+    UPDATE auth.users
+    SET raw_user_meta_data = raw_user_meta_data - 'profile'
+    WHERE id = NEW.id;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS create_profile_on_signup ON auth.users;
+CREATE TRIGGER create_profile_on_signup
+    AFTER INSERT ON auth.users
+    FOR EACH ROW EXECUTE FUNCTION create_profile_for_new_user();
+
+-- Only the trigger may call it
+REVOKE EXECUTE ON FUNCTION create_profile_for_new_user() FROM PUBLIC, anon, authenticated;
+
+COMMIT;
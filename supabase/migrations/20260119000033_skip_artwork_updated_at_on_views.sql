@@ -0,0 +1,21 @@
+-- Migration: Keep artwork updated_at on view count increments
+-- Created: 2026-01-19
+-- Description: updated_at versions the artwork detail (ETag); views do not
+
+BEGIN;
+
+-- increment_artwork_views runs on every non-owner view. Bumping updated_at
+-- there changed the artwork's ETag on every view, so conditional requests
+-- almost never matched. Updates that only change view_count now keep
+-- updated_at; any other change still bumps it.
+DROP TRIGGER IF EXISTS update_artworks_updated_at ON artworks;
+CREATE TRIGGER update_artworks_updated_at
+    BEFORE UPDATE ON artworks
+    FOR EACH ROW
+    WHEN (
+        to_jsonb(NEW) - 'view_count' - 'updated_at'
+        IS DISTINCT FROM to_jsonb(OLD) - 'view_count' - 'updated_at'
+    )
+    EXECUTE FUNCTION update_updated_at_column();
+
+COMMIT;
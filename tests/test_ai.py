@@ -0,0 +1,145 @@
+"""
+Test AI & ML endpoints and helpers
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.ml.colors import color_embeddings, extract_palette, pack_colors, palette_embedding
+from app.ml import recommendation
+from app.ml.recommendation import RecommendationBatcher, RecommendationEngine
+from app.ml.similarity_cache import SimilarityLRUCache
+
+client = TestClient(app)
+
+
+def make_engine(colors):
+    """Build an engine with an in-memory catalog (one artwork per color)"""
+    engine = RecommendationEngine()
+    engine.set_catalog(
+        [f"artwork-{i}" for i in range(len(colors))],
+        color_embeddings(pack_colors(colors)),
+    )
+    return engine
+
+
+def test_recommend_ranks_closest_colors_first():
+    """Test recommendations are ordered by color similarity"""
+    engine = make_engine(["#0000FF", "#FF0000", "#808080", "#F01010"])
+    results = engine.recommend(palette_embedding(pack_colors(["#FF0505"])), limit=2)
+    assert [artwork_id for artwork_id, _ in results] == ["artwork-1", "artwork-3"]
+    assert results[0][1] >= results[1][1]
+
+
+def test_recommend_without_palette_returns_empty():
+    """Test recommend endpoint with no palette and no space"""
+    response = client.post("/api/v1/ai/recommend-artworks")
+    assert response.status_code == 200
+    assert response.json() == {"recommendations": []}
+
+
+def test_similarity_cache_hits_near_duplicates_and_evicts_lru():
+    """Test similarity cache approximate hits and LRU eviction"""
+    cache = SimilarityLRUCache(capacity=2, dim=3, threshold=0.1)
+    a = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    b = np.array([0.0, 1.0, 0.0], dtype=np.float32)
+    c = np.array([0.0, 0.0, 1.0], dtype=np.float32)
+
+    cache.put(a, "a")
+    cache.put(b, "b")
+    assert cache.get(a + 0.01) == "a"
+    assert cache.get(np.array([0.5, 0.5, 0.0], dtype=np.float32)) is None
+
+    # "b" is now the least recently used entry
+    cache.put(c, "c")
+    assert cache.get(b) is None
+    assert cache.get(a) == "a"
+    assert cache.get(c) == "c"
+
+
+def test_extract_palette_orders_colors_by_coverage():
+    """Test dominant color extraction"""
+    pixels = np.zeros((100, 100, 3), dtype=np.uint8)
+    pixels[:60] = (250, 250, 250)
+    pixels[60:90] = (10, 20, 200)
+    pixels[90:] = (255, 0, 0)
+    assert extract_palette(pixels) == ["#FCFCFC", "#0C14CC", "#FC0404"]
+
+
+async def test_batcher_scores_concurrent_queries_together():
+    """Test batched recommendations match unbatched results"""
+    engine = make_engine(["#0000FF", "#FF0000", "#808080", "#F01010", "#00FF00"])
+    batcher = RecommendationBatcher(engine)
+    palettes = [["#FF0505"], ["#0505F0"], ["#10F010"]]
+    queries = [palette_embedding(pack_colors(p)) for p in palettes]
+
+    results = await asyncio.gather(*(batcher.recommend(q, 2) for q in queries))
+    await batcher.close()
+
+    for batched, single in zip(results, [engine.recommend(q, 2) for q in queries]):
+        assert [artwork_id for artwork_id, _ in batched] == [artwork_id for artwork_id, _ in single]
+        assert [score for _, score in batched] == pytest.approx([score for _, score in single])
+
+
+def test_upload_space_image_rejects_by_headers():
+    """Test oversized and non-multipart uploads are rejected before parsing"""
+    url = "/api/v1/ai/upload-space-image"
+    response = client.post(url, content=b"{}", headers={"Content-Type": "application/json"})
+    assert response.status_code == 415
+
+    response = client.post(
+        url,
+        content=b"x",
+        headers={
+            "Content-Type": "multipart/form-data; boundary=x",
+            "Content-Length": str(100 * 1024 * 1024),
+        },
+    )
+    assert response.status_code == 413
+
+
+def test_load_catalog_reads_every_page(monkeypatch):
+    """Test the catalog is not truncated to one PostgREST response"""
+    rows = [{"id": f"artwork-{i:04d}", "dominant_color": "#FF0000"} for i in range(2500)]
+
+    def page(start, end):
+        # Responses are capped below the requested page size, like max-rows
+        end = min(end, start + 799)
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=rows[start:end + 1]))
+
+    admin = MagicMock()
+    admin.table.return_value.select.return_value.eq.return_value.order.return_value.range.side_effect = page
+    monkeypatch.setattr(recommendation, "get_supabase_admin_client", lambda: admin)
+
+    engine = RecommendationEngine()
+    engine.load_catalog()
+
+    assert engine.artwork_ids == [row["id"] for row in rows]
+
+
+async def test_concurrent_refreshes_share_one_load(monkeypatch):
+    """Test requests finding the catalog stale reload it once"""
+    engine = RecommendationEngine()
+    release = threading.Event()
+    loads = 0
+
+    def load_catalog():
+        nonlocal loads
+        loads += 1
+        release.wait(2)
+        engine.set_catalog(["artwork-0"], color_embeddings(pack_colors(["#FF0000"])))
+
+    monkeypatch.setattr(engine, "load_catalog", load_catalog)
+    refreshes = [asyncio.ensure_future(engine.refresh()) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(*refreshes)
+
+    assert loads == 1
+    assert not engine.is_stale
@@ -0,0 +1,98 @@
+"""
+Test artwork endpoints and helpers
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.v1.endpoints import artworks
+from app.core.artwork_cache import ArtworkCache
+from app.core.dependencies import CurrentUser, get_current_user
+from app.core.publishing import PublishingBatcher
+
+
+async def test_artwork_cache_does_not_keep_loads_that_raced_an_invalidation():
+    """Test an entry loaded before an invalidation is not cached locally"""
+    cache = ArtworkCache()
+    loading = asyncio.Event()
+    release = asyncio.Event()
+
+    async def stale_loader():
+        loading.set()
+        await release.wait()
+        return {"body": b"published"}
+
+    load = asyncio.create_task(cache.get_or_load("artwork-1", stale_loader))
+    await loading.wait()
+    cache.drop_local("artwork-1")
+    release.set()
+
+    # The caller still gets what it loaded, but the next read loads again
+    assert await load == {"body": b"published"}
+    assert cache.get_local("artwork-1") is None
+
+    async def fresh_loader():
+        return {"body": b"unpublished"}
+
+    assert await cache.get_or_load("artwork-1", fresh_loader) == {"body": b"unpublished"}
+    assert cache.get_local("artwork-1") == {"body": b"unpublished"}
+
+
+async def test_artwork_cache_fill_needs_a_generation():
+    """Test nothing is written to Redis without a generation read beforehand"""
+    assert await ArtworkCache().fill("artwork-1", None, {"body": b"x"}, 300) is False
+
+
+async def test_publishing_batcher_coalesces_concurrent_changes():
+    """Test concurrent changes are applied with one call and get their own results"""
+    batcher = PublishingBatcher(client=MagicMock())
+    batches = []
+
+    async def execute_batch(requests):
+        batches.append(requests)
+        return [{"artwork": {"id": request["id"]}} for request in requests]
+
+    batcher.execute_batch = execute_batch
+    results = await asyncio.gather(*(batcher.change("publish", f"artwork-{i}", "artist-1") for i in range(3)))
+    await batcher.close()
+
+    assert len(batches) == 1
+    assert [result["artwork"]["id"] for result in results] == ["artwork-0", "artwork-1", "artwork-2"]
+
+
+async def test_publishing_batcher_fails_every_change_of_a_failed_batch():
+    """Test a failed batch raises in every request of the batch"""
+    batcher = PublishingBatcher(client=MagicMock())
+
+    async def execute_batch(requests):
+        return []
+
+    batcher.execute_batch = execute_batch
+    results = await asyncio.gather(
+        batcher.change("publish", "artwork-1", "artist-1"),
+        batcher.change("unpublish", "artwork-2", "artist-1"),
+        return_exceptions=True,
+    )
+    await batcher.close()
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_delete_prefetch_waits_for_authentication(monkeypatch):
+    """Test unauthenticated and non-artist deletes never read the artwork"""
+    fetch = MagicMock(return_value=None)
+    monkeypatch.setattr(artworks, "fetch_artwork_for_delete", fetch)
+    client = TestClient(app)
+
+    assert client.delete("/api/v1/artworks/artwork-1").status_code == 401
+
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser("user-1", "c@example.com", "customer", {})
+    try:
+        response = client.delete("/api/v1/artworks/artwork-1", headers={"Authorization": "Bearer token"})
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+    assert response.status_code == 403
+
+    fetch.assert_not_called()
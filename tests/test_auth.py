@@ -0,0 +1,143 @@
+"""
+Test authentication endpoints
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.v1.endpoints import auth
+from app.core import rate_limit
+from app.core.dependencies import CurrentUser, get_current_user
+from app.core.rate_limit import RateLimiter
+
+client = TestClient(app)
+
+
+def test_artist_signup_requires_every_agreement(monkeypatch):
+    """Test artist signup is rejected before sign_up unless every agreement is accepted"""
+    supabase = MagicMock()
+    monkeypatch.setattr(auth, "get_supabase_client", lambda: supabase)
+
+    response = client.post("/api/v1/auth/signup/artist", json={
+        "name": "Artist",
+        "email": "artist@example.com",
+        "password": "password123",
+        "agreements": {"copyright": True, "ai": True, "commercial": False, "report": True},
+    })
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "All agreements must be accepted"
+    supabase.auth.sign_up.assert_not_called()
+
+
+def test_change_password_always_verifies_current_password(monkeypatch):
+    """Test a valid bearer token alone cannot change the password"""
+    supabase = MagicMock()
+    supabase.auth.sign_in_with_password.side_effect = auth.AuthApiError(
+        "Invalid login credentials", 400, auth.INVALID_CREDENTIALS,
+    )
+    admin = MagicMock()
+    monkeypatch.setattr(auth, "get_supabase_client", lambda: supabase)
+    monkeypatch.setattr(auth, "get_supabase_admin_client", lambda: admin)
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser("user-1", "user@example.com", "customer", {})
+    try:
+        response = client.post(
+            "/api/v1/auth/change-password",
+            headers={"Authorization": "Bearer fresh-token"},
+            json={"current_password": "wrong-password", "new_password": "new-password"},
+        )
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+    assert response.status_code == 401
+    supabase.auth.sign_in_with_password.assert_called_once_with(
+        {"email": "user@example.com", "password": "wrong-password"}
+    )
+    admin.auth.admin.update_user_by_id.assert_not_called()
+
+
+class FakeSlidingWindowRedis:
+    """Redis stub whose registered script applies SLIDING_WINDOW_SCRIPT in Python"""
+
+    def __init__(self):
+        # key -> {member: score}
+        self.sorted_sets = {}
+
+    def register_script(self, script):
+        assert script == rate_limit.SLIDING_WINDOW_SCRIPT
+
+        async def run(keys, args):
+            now, member = float(args[0]), args[1]
+            for i, key in enumerate(keys):
+                window, limit = args[2 + 2 * i], args[3 + 2 * i]
+                entries = self.sorted_sets.setdefault(key, {})
+                for old, score in list(entries.items()):
+                    if score <= now - window:
+                        del entries[old]
+                if len(entries) >= limit:
+                    return i + 1
+            for key in keys:
+                self.sorted_sets[key][member] = now
+            return 0
+
+        return run
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    """Fresh rate limiter backed by the Redis stub"""
+    redis = FakeSlidingWindowRedis()
+    monkeypatch.setattr(rate_limit, "get_redis", lambda: redis)
+    monkeypatch.setattr(auth, "get_rate_limiter", lambda limiter=RateLimiter(): limiter)
+    monkeypatch.setattr(auth, "get_supabase_client", MagicMock)
+    return redis
+
+
+def forgot_password(email):
+    """Request a password reset email"""
+    return client.post("/api/v1/auth/forgot-password", json={"email": email})
+
+
+def test_email_rate_limit_per_email(redis):
+    """Test one address gets EMAIL_SEND_LIMIT_PER_EMAIL emails per window"""
+    for _ in range(auth.EMAIL_SEND_LIMIT_PER_EMAIL):
+        assert forgot_password("user@example.com").status_code == 200
+
+    response = forgot_password("user@example.com")
+    assert response.status_code == 429
+    assert response.json()["detail"] == auth.EMAIL_RATE_LIMIT_MESSAGE
+    assert forgot_password("other@example.com").status_code == 200
+
+
+def test_email_rate_limit_per_ip(redis):
+    """Test one client gets EMAIL_SEND_LIMIT_PER_IP emails per window across addresses"""
+    for i in range(auth.EMAIL_SEND_LIMIT_PER_IP):
+        assert forgot_password(f"user{i}@example.com").status_code == 200
+
+    assert forgot_password("new@example.com").status_code == 429
+
+
+def test_rejected_requests_are_not_recorded(redis):
+    """Test a request over one limit does not count against its other limits"""
+    for _ in range(auth.EMAIL_SEND_LIMIT_PER_EMAIL + 3):
+        forgot_password("user@example.com")
+
+    ip_key = "ratelimit:auth-email:ip:testclient"
+    assert len(redis.sorted_sets[ip_key]) == auth.EMAIL_SEND_LIMIT_PER_EMAIL
+    for i in range(auth.EMAIL_SEND_LIMIT_PER_IP - auth.EMAIL_SEND_LIMIT_PER_EMAIL):
+        assert forgot_password(f"user{i}@example.com").status_code == 200
+
+
+def test_rate_limit_fails_open_on_redis_errors(redis, monkeypatch):
+    """Test requests are allowed when Redis is unavailable"""
+    def unavailable(script):
+        async def run(keys, args):
+            raise ConnectionError("Redis unavailable")
+        return run
+
+    monkeypatch.setattr(redis, "register_script", unavailable)
+
+    for _ in range(auth.EMAIL_SEND_LIMIT_PER_EMAIL + 1):
+        assert forgot_password("user@example.com").status_code == 200
@@ -0,0 +1,53 @@
+"""
+Test request micro-batching
+"""
+
+import asyncio
+
+import pytest
+from app.core.batching import MicroBatcher
+
+
+class DoublingBatcher(MicroBatcher[int, int]):
+    """Batcher doubling its items, optionally blocking until released"""
+
+    def __init__(self, max_batch_size=4):
+        super().__init__(max_batch_size, 0.001)
+        self.batches = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def execute_batch(self, items):
+        self.batches.append(items)
+        await self.release.wait()
+        return [item * 2 for item in items]
+
+
+def test_batch_function_is_abstract():
+    """Test a batcher without execute_batch cannot be created"""
+    with pytest.raises(TypeError):
+        MicroBatcher(4, 0.001)
+
+
+async def test_concurrent_items_run_in_one_batch():
+    """Test items submitted together are executed together"""
+    batcher = DoublingBatcher()
+
+    assert await asyncio.gather(*(batcher.submit(i) for i in range(3))) == [0, 2, 4]
+    assert batcher.batches == [[0, 1, 2]]
+    await batcher.close()
+
+
+async def test_close_fails_pending_requests():
+    """Test requests in the running batch and in the queue fail on close"""
+    batcher = DoublingBatcher(max_batch_size=1)
+    batcher.release.clear()
+
+    requests = [asyncio.ensure_future(batcher.submit(i)) for i in range(2)]
+    await asyncio.sleep(0.01)
+    assert batcher.batches == [[0]]
+
+    await batcher.close()
+
+    for result in await asyncio.wait_for(asyncio.gather(*requests, return_exceptions=True), 1):
+        assert isinstance(result, RuntimeError)
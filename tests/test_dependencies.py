@@ -0,0 +1,117 @@
+"""
+Test authentication dependencies and the authenticated user cache
+"""
+
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from app.main import app
+from app.core import dependencies, token_cache
+from app.core.token_cache import TokenCache
+
+client = TestClient(app)
+
+
+def make_token(user_id="user-1", lifetime=3600):
+    """Build an access token with the claims get_current_user reads"""
+    now = time.time()
+    return jwt.encode(
+        {"sub": user_id, "exp": int(now + lifetime)},
+        "secret",
+    )
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Fresh authenticated user cache used by get_current_user"""
+    cache = TokenCache()
+    monkeypatch.setattr(dependencies, "get_token_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def admin_client(monkeypatch):
+    """Supabase admin client resolving tokens to an artist"""
+    admin = MagicMock()
+    admin.auth.get_user.return_value.user = SimpleNamespace(
+        id="user-1",
+        email="artist@example.com",
+        user_metadata={"user_type": "artist"},
+        email_confirmed_at=None,
+    )
+    admin.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [
+        {"id": "user-1", "name": "Artist", "updated_at": "2026-01-01T00:00:00+00:00"}
+    ]
+    monkeypatch.setattr(dependencies, "get_supabase_admin_client", lambda: admin)
+    return admin
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable clock of the token cache"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(token_cache, "time", SimpleNamespace(
+        time=lambda: now.value, monotonic=lambda: now.value,
+    ))
+    return now
+
+
+def test_cached_token_skips_supabase(cache, admin_client):
+    """Test a validated token is served from the cache on the next request"""
+    headers = {"Authorization": f"Bearer {make_token()}"}
+
+    for _ in range(2):
+        response = client.get("/api/v1/users/me", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["name"] == "Artist"
+
+    admin_client.auth.get_user.assert_called_once()
+    admin_client.table.assert_called_once_with("artists")
+
+
+def test_invalid_token_is_not_cached(cache, admin_client):
+    """Test rejected tokens are validated again on every request"""
+    admin_client.auth.get_user.side_effect = RuntimeError("invalid JWT")
+    headers = {"Authorization": f"Bearer {make_token()}"}
+
+    for _ in range(2):
+        response = client.get("/api/v1/users/me", headers=headers)
+        assert response.status_code == 401
+
+    assert admin_client.auth.get_user.call_count == 2
+
+
+def test_token_expiry_caps_ttl(clock):
+    """Test an entry never outlives its token's exp claim"""
+    cache = TokenCache(ttl=300)
+    cache.put("short", "user-1", "short user", expires_at=clock.value + 10)
+    cache.put("long", "user-1", "long user", expires_at=clock.value + 3600)
+    cache.put("expired", "user-1", "expired user", expires_at=clock.value - 1)
+    assert cache.get("expired") is None
+
+    clock.value += 11
+    assert cache.get("short") is None
+    assert cache.get("long") == "long user"
+
+    clock.value += 300
+    assert cache.get("long") is None
+
+
+def test_drop_and_drop_user_invalidate_entries():
+    """Test logout drops one token and profile changes drop all of a user's tokens"""
+    cache = TokenCache()
+    cache.put("a1", "user-a", "a")
+    cache.put("a2", "user-a", "a")
+    cache.put("b1", "user-b", "b")
+
+    cache.drop("a1")
+    assert cache.get("a1") is None
+    assert cache.get("a2") == "a"
+
+    cache.drop_user("user-a")
+    assert cache.get("a2") is None
+    assert cache.get("b1") == "b"
@@ -22,3 +22,14 @@ def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json()["status"] == "healthy"
+
+
+def test_upload_limit_errors_carry_cors_headers():
+    """Test browsers can read the upload limit's rejections"""
+    response = client.post(
+        "/api/v1/ai/upload-space-image",
+        headers={"Origin": "http://localhost:3000", "Content-Type": "application/json"},
+        content=b"{}",
+    )
+    assert response.status_code == 415
+    assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
@@ -0,0 +1,95 @@
+"""
+Test single-flight calls
+"""
+
+import asyncio
+
+import pytest
+from app.core.single_flight import SingleFlight
+
+
+async def test_concurrent_calls_share_one_load():
+    """Test callers arriving during a load get its result"""
+    flight = SingleFlight()
+    release = asyncio.Event()
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        await release.wait()
+        return "result"
+
+    calls = [asyncio.ensure_future(flight.run("key", load)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*calls) == ["result"] * 3
+    assert loads == 1
+
+
+async def test_waiters_get_the_owners_exception():
+    """Test a failed load fails every caller with its exception"""
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        raise ValueError("load failed")
+
+    calls = [asyncio.ensure_future(flight.run("key", load)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+
+    for result in await asyncio.gather(*calls, return_exceptions=True):
+        assert isinstance(result, ValueError)
+
+
+async def test_waiters_retry_when_the_owner_is_cancelled():
+    """Test cancelling the owner makes a waiter run the load instead of failing"""
+    flight = SingleFlight()
+    release = asyncio.Event()
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        await release.wait()
+        return loads
+
+    owner = asyncio.ensure_future(flight.run("key", load))
+    await asyncio.sleep(0)
+    waiters = [asyncio.ensure_future(flight.run("key", load)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    owner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+    # Let one waiter start the load again and the other join it
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [2, 2]
+    assert loads == 2
+
+
+async def test_cancelled_waiter_does_not_cancel_the_load():
+    """Test a waiter's own cancellation leaves the owner's load running"""
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        return "result"
+
+    owner = asyncio.ensure_future(flight.run("key", load))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(flight.run("key", load))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    release.set()
+
+    assert await owner == "result"
@@ -0,0 +1,103 @@
+"""
+Test file upload endpoints
+"""
+
+import hashlib
+import io
+import tempfile
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from PIL import Image
+from starlette.datastructures import Headers
+from app.main import app
+from app.api.v1.endpoints import uploads
+from app.core.dependencies import CurrentUser, get_current_user, storage_service_dep
+from app.core.image_processing import ImageSize, _process_upload, _upload_source
+from app.core.signed_url_cache import SignedUrlCache
+from app.core.storage import StorageService
+
+client = TestClient(app)
+AUTH = {"Authorization": "Bearer user-token"}
+
+
+@pytest.fixture
+def storage_service():
+    """Authenticate requests as user "abc" and stub the storage service"""
+    service = MagicMock()
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser("abc", "abc@example.com", "artist", {})
+    app.dependency_overrides[storage_service_dep] = lambda: service
+    yield service
+    app.dependency_overrides.pop(get_current_user, None)
+    app.dependency_overrides.pop(storage_service_dep, None)
+
+
+def test_signed_file_url_is_cached_and_revalidated(storage_service, monkeypatch):
+    """Test signed URLs are reused and answer If-None-Match with 304"""
+    monkeypatch.setattr(uploads, "get_signed_url_cache", lambda cache=SignedUrlCache(): cache)
+    storage_service.get_file_url.return_value = "https://storage.example/signed?token=1"
+    url = "/api/v1/uploads/url/documents/abc/contract.pdf"
+
+    response = client.get(url, headers=AUTH)
+    assert response.status_code == 200
+    assert response.json()["url"] == "https://storage.example/signed?token=1"
+    etag = response.headers["ETag"]
+
+    response = client.get(url, headers={**AUTH, "If-None-Match": etag})
+    assert response.status_code == 304
+    storage_service.get_file_url.assert_called_once()
+
+
+@pytest.mark.parametrize("file_path", ["abcd/x.png", "abc/%2E%2E/abcd/x.png"])
+def test_delete_file_rejects_other_users_files(storage_service, file_path):
+    """Test user abc cannot delete the files of user abcd, also through a dot segment"""
+    # ".." is percent-encoded, as HTTP clients collapse literal dot segments
+    response = client.delete(f"/api/v1/uploads/delete/artworks/{file_path}", headers=AUTH)
+
+    assert response.status_code == 403
+    storage_service.delete_file.assert_not_called()
+
+
+@pytest.mark.parametrize("rolled", [False, True])
+def test_image_worker_reads_spooled_upload_without_buffering(rolled):
+    """Test uploads spooled to disk reach image workers as a path, not bytes"""
+    image = io.BytesIO()
+    Image.new("RGB", (64, 32), "#FF0000").save(image, "PNG")
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(image.getvalue())
+    if rolled:
+        spooled.rollover()
+
+    upload = _upload_source(spooled)
+    assert isinstance(upload, str) == rolled
+
+    images, _, dominant_color = _process_upload(upload, [ImageSize.THUMBNAIL], "JPEG", "PNG", False)
+    assert images["thumbnail"]["width"] == 64
+    assert dominant_color is not None
+
+
+async def test_deduplicated_upload_streams_from_the_spooled_file():
+    """Test content-addressed uploads hash and send the upload's own file"""
+    image = io.BytesIO()
+    Image.new("RGB", (64, 32), "#FF0000").save(image, "PNG")
+    content = image.getvalue()
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(content)
+    spooled.rollover()
+    upload = UploadFile(spooled, size=len(content), filename="wall.png",
+                        headers=Headers({"content-type": "image/png"}))
+
+    supabase = MagicMock()
+    sent = []
+    supabase.storage.from_.return_value.upload.side_effect = (
+        lambda path, stream, file_options: sent.append(stream.read())
+    )
+    supabase.storage.from_.return_value.get_public_url.return_value = "https://storage.example/wall.png"
+
+    result = await StorageService(supabase).upload_file_deduplicated(upload, "spaces", "abc")
+
+    digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+    assert result["path"] == f"abc/{digest}.png"
+    assert sent == [content]
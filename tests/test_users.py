@@ -0,0 +1,88 @@
+"""
+Test user management endpoints
+"""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.v1.endpoints import users
+from app.core.dependencies import CurrentUser, get_current_user
+
+client = TestClient(app)
+AUTH = {"Authorization": "Bearer user-token"}
+
+
+@pytest.fixture
+def current_user():
+    """Authenticate requests as an artist"""
+    user = CurrentUser("user-1", "artist@example.com", "artist", {
+        "id": "user-1",
+        "name": "Artist",
+        "updated_at": "2026-01-01T00:00:00+00:00",
+    })
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield user
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.fixture
+def admin_client(monkeypatch):
+    """Supabase admin client used by the user endpoints"""
+    admin = MagicMock()
+    monkeypatch.setattr(users, "get_supabase_admin_client", lambda: admin)
+    return admin
+
+
+def test_get_profile_revalidates_with_etag(current_user):
+    """Test /users/me answers 304 until the profile changes"""
+    response = client.get("/api/v1/users/me", headers=AUTH)
+    assert response.status_code == 200
+    assert response.json()["name"] == "Artist"
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    response = client.get("/api/v1/users/me", headers={**AUTH, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    current_user.profile["updated_at"] = "2026-01-02T00:00:00+00:00"
+    response = client.get("/api/v1/users/me", headers={**AUTH, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_delete_account_overlaps_cleanup_and_signs_out_caller(current_user, admin_client):
+    """Test auth user deletion and sign out run together, with the caller's token"""
+    # Each call waits for the other, so the test only passes if they overlap
+    barrier = threading.Barrier(2, timeout=2)
+
+    def delete_user(user_id):
+        barrier.wait()
+        raise RuntimeError("auth API unavailable")
+
+    admin_client.auth.admin.delete_user.side_effect = delete_user
+    admin_client.auth.admin.sign_out.side_effect = lambda jwt, scope: barrier.wait()
+
+    response = client.post("/api/v1/users/me/delete", headers=AUTH)
+
+    # A failed auth user deletion is logged, not reported
+    assert response.status_code == 200
+    assert not barrier.broken
+    admin_client.table.assert_called_once_with("artists")
+    admin_client.auth.admin.delete_user.assert_called_once_with("user-1")
+    admin_client.auth.admin.sign_out.assert_called_once_with("user-token", "global")
+
+
+def test_deactivate_account_signs_out_caller(current_user, admin_client):
+    """Test deactivation suspends the profile and revokes the caller's sessions"""
+    update = admin_client.table.return_value.update
+    update.return_value.eq.return_value.execute.return_value.data = [{"id": "user-1"}]
+
+    response = client.post("/api/v1/users/me/deactivate", headers=AUTH)
+
+    assert response.status_code == 200
+    assert update.call_args.args[0]["status"] == "suspended"
+    admin_client.auth.admin.sign_out.assert_called_once_with("user-token", "global")